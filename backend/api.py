@@ -6,28 +6,32 @@ while keeping existing LLM/RAG business logic intact.
 
 from __future__ import annotations
 
-import base64
+import asyncio
 import hashlib
 import json
 import logging
 import os
+import re
 import secrets
+import sys
 import tempfile
 import threading
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from importlib.metadata import PackageNotFoundError, version
-from typing import Any
+from typing import Annotated, Any
 
-from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field, EmailStr, StrictStr
 from psycopg2 import pool
 from psycopg2.extras import Json, RealDictCursor
 from dotenv import load_dotenv
 from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
 
 # Suppress verbose logging from dependencies
 logging.getLogger("sentence_transformers").setLevel(logging.WARNING)
@@ -37,12 +41,33 @@ logging.getLogger("urllib3").setLevel(logging.WARNING)
 logger = logging.getLogger("claimflow.api")
 
 from llm.integration_example import answer_query
-from llm.finance_assistant import generate_finance_response
+from llm.finance_assistant import canned_finance_responses, generate_finance_response
+from llm.gemini_client import BLOCKED_RESPONSE, CLARIFICATION_RESPONSE, OUT_OF_SCOPE_RESPONSE
 from llm.intent_classifier import IntentClassifier
-from utils.document_processor import analyze_claim_document, get_document_summary, process_document
-from utils.language_detector import detect_language, get_language_name, get_tts_language_code
-from voice.stt import speech_to_text_with_retry
-from voice.tts import text_to_speech
+from llm.intent_model import preload_intent_models
+from llm.savings_engine import SavingsEngine
+from utils.document_processor import (
+    EXTRACTOR_VERSION,
+    PDF_OCR_ENABLED,
+    analyze_bill_tables,
+    analyze_claim_document,
+    get_document_summary,
+    process_document,
+)
+from utils.bill_tables import format_bill_rows
+from utils.chunker import iter_chunks
+from utils.language_detector import (
+    detect_language,
+    detect_language_details,
+    get_language_name,
+    get_tts_language_code,
+    preload_language_detector,
+)
+from voice.stt import preload_whisper_model, transcribe_audio
+from voice.audio_store import AUDIO_RENDER_WAIT_SECONDS, get_audio_store, parse_byte_range
+from voice.tts import iter_speech_segments, prerender_speech
+from voice.tts_backends import get_backends, preload_backends
+from voice.tts_cache import get_tts_cache
 
 SUPPORTED_LANGUAGES = {
     "English": "en",
@@ -86,7 +111,20 @@ RATE_LIMIT_AUTH_PER_MIN = int(os.getenv("RATE_LIMIT_AUTH_PER_MIN", "20"))
 RATE_LIMIT_CHAT_PER_MIN = int(os.getenv("RATE_LIMIT_CHAT_PER_MIN", "60"))
 RATE_LIMIT_UPLOAD_PER_MIN = int(os.getenv("RATE_LIMIT_UPLOAD_PER_MIN", "15"))
 RATE_LIMIT_VOICE_PER_MIN = int(os.getenv("RATE_LIMIT_VOICE_PER_MIN", "20"))
+RATE_LIMIT_SAVINGS_PER_MIN = int(os.getenv("RATE_LIMIT_SAVINGS_PER_MIN", "240"))
 VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma_local")
+UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", "2"))
+MAX_UPLOAD_MB = float(os.getenv("MAX_UPLOAD_MB", "20"))
+MAX_VOICE_MB = float(os.getenv("MAX_VOICE_MB", "10"))
+UPLOAD_CHUNK_BYTES = int(os.getenv("UPLOAD_CHUNK_BYTES", str(256 * 1024)))
+UPLOAD_MAX_PENDING_JOBS = int(os.getenv("UPLOAD_MAX_PENDING_JOBS", "20"))
+UPLOAD_EVENTS_POLL_SECONDS = float(os.getenv("UPLOAD_EVENTS_POLL_SECONDS", "0.5"))
+UPLOAD_STALE_JOB_MINUTES = int(os.getenv("UPLOAD_STALE_JOB_MINUTES", "30"))
+DOCUMENT_CACHE_ENABLED = os.getenv("DOCUMENT_CACHE_ENABLED", "true").strip().lower() in {"1", "true", "yes", "on"}
+DOCUMENT_CACHE_MAX_MB = float(os.getenv("DOCUMENT_CACHE_MAX_MB", "256"))
+STT_PRELOAD = os.getenv("STT_PRELOAD", "true").strip().lower() in {"1", "true", "yes", "on"}
+WS_VOICE_IDLE_SECONDS = float(os.getenv("WS_VOICE_IDLE_SECONDS", "300"))
+TTS_PRERENDER = os.getenv("TTS_PRERENDER", "true").strip().lower() in {"1", "true", "yes", "on"}
 
 allowed_origins_raw = os.getenv(
     "ALLOWED_ORIGINS",
@@ -168,6 +206,38 @@ db_pool: pool.SimpleConnectionPool | None = None
 rate_limit_state: dict[str, list[float]] = {}
 rate_limit_lock = threading.Lock()
 
+# Document ingestion runs off the request thread; the semaphore bounds queued + running jobs.
+document_job_executor = ThreadPoolExecutor(max_workers=UPLOAD_WORKERS, thread_name_prefix="document-job")
+document_job_slots = threading.BoundedSemaphore(UPLOAD_MAX_PENDING_JOBS)
+DOCUMENT_JOB_TERMINAL_STATUSES = {"completed", "failed"}
+
+# Chunking happens here rather than in the extractor, so it versions the cache too.
+DOCUMENT_CHUNKER_VERSION = "2"
+DOCUMENT_CACHE_VERSION = f"{EXTRACTOR_VERSION}.{DOCUMENT_CHUNKER_VERSION}"
+DOCUMENT_CACHE_MAX_BYTES = int(DOCUMENT_CACHE_MAX_MB * 1024 * 1024)
+
+MAX_UPLOAD_BYTES = int(MAX_UPLOAD_MB * 1024 * 1024)
+MAX_VOICE_BYTES = int(MAX_VOICE_MB * 1024 * 1024)
+# Multipart boundaries and small form fields on top of the file itself.
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+BODY_LIMIT_BY_PATH = {
+    "/upload": MAX_UPLOAD_BYTES,
+    "/upload-document": MAX_UPLOAD_BYTES,
+    "/voice": MAX_VOICE_BYTES,
+    "/voice-input": MAX_VOICE_BYTES,
+}
+DOCUMENT_FILE_KINDS = {".pdf": {"pdf"}, ".jpg": {"jpeg"}, ".jpeg": {"jpeg"}, ".png": {"png"}}
+AUDIO_FILE_KINDS = {"wav", "webm", "ogg", "mp3", "mp4", "flac"}
+# The extension is only known to the endpoint, so the stream check accepts any document kind.
+UPLOAD_KINDS_BY_PATH = {
+    "/upload": set().union(*DOCUMENT_FILE_KINDS.values()),
+    "/upload-document": set().union(*DOCUMENT_FILE_KINDS.values()),
+    "/voice": AUDIO_FILE_KINDS,
+    "/voice-input": AUDIO_FILE_KINDS,
+}
+# Rest of a multipart part header that carries a filename, up to the blank line before the content.
+MULTIPART_FILE_HEADER = re.compile(rb"filename\*?=[^\r\n]*\r\n(?:[^\r\n]+\r\n)*\r\n")
+
 
 class ChatRequest(BaseModel):
     message: str = Field(min_length=1)
@@ -177,11 +247,35 @@ class ChatRequest(BaseModel):
     include_audio: bool = False
 
 
+class TTSRequest(BaseModel):
+    text: str = Field(min_length=1, max_length=5000)
+    language: str | None = None
+
+
+SavingsAmount = Annotated[float, Field(ge=0, le=1e12)]
+SavingsRate = Annotated[float, Field(gt=-100, le=100)]
+SavingsYears = Annotated[float, Field(ge=0, le=100)]
+SavingsFrequency = Annotated[int, Field(ge=1, le=365)]
+
+
+class SavingsScenarioRequest(BaseModel):
+    principal: SavingsAmount | list[SavingsAmount] = 0.0
+    monthly_contribution: SavingsAmount | list[SavingsAmount] = 0.0
+    rate: SavingsRate | list[SavingsRate] = 8.0
+    years: SavingsYears | list[SavingsYears] = 10
+    frequency: SavingsFrequency | list[SavingsFrequency] = 12
+    inflation: float = Field(default=0.0, gt=-100, le=100)
+    tax_rate: float = Field(default=0.0, ge=0, le=100)
+    grid: bool = False
+    # When set, return year-end values for years 0..path_years instead of final values.
+    path_years: int | None = Field(default=None, ge=0, le=100)
+
+
 class ChatResponse(BaseModel):
     session_id: str
     response: str
     language: str
-    audio_base64: str | None = None
+    audio_url: str | None = None
     transcript: str | None = None
     transcript_translated: str | None = None
 
@@ -189,8 +283,10 @@ class ChatResponse(BaseModel):
 class SessionState(BaseModel):
     messages: list[dict[str, str]] = Field(default_factory=list)
     document_text: str = ""
-    document_chunks: list[str] = Field(default_factory=list)
+    document_chunks: list[dict[str, Any]] = Field(default_factory=list)
+    document_bill: dict[str, Any] | None = None
     uploaded_document: str | None = None
+    pending_document: str | None = None
     last_detected_language: str = "English"
 
 
@@ -220,10 +316,119 @@ class AuthResponse(BaseModel):
     session_token: str | None = None
 
 
+class _UploadRejected(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class UploadLimitMiddleware:
+    """Cut off upload bodies that pass the size cap or do not start with an allowed file type.
+
+    Works on the raw ASGI receive channel, so bytes are counted as they arrive -
+    chunked bodies without Content-Length included - and the request is answered
+    with 413/415 mid-stream instead of after the multipart parser has spooled it.
+    The endpoints repeat both checks on the parsed upload.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path")
+        if scope["type"] != "http" or scope["method"] != "POST" or path not in BODY_LIMIT_BY_PATH:
+            await self.app(scope, receive, send)
+            return
+
+        limit = BODY_LIMIT_BY_PATH[path]
+        allowed_kinds = UPLOAD_KINDS_BY_PATH[path]
+        max_body = limit + MULTIPART_OVERHEAD_BYTES
+        too_large = f"File too large. Maximum size is {limit // (1024 * 1024)} MB."
+
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > max_body:
+            await JSONResponse(status_code=413, content={"detail": too_large})(scope, receive, send)
+            return
+
+        received = 0
+        head = bytearray()
+        sniffing = True
+        rejection: _UploadRejected | None = None
+        response_started = False
+
+        async def checked_receive():
+            nonlocal received, sniffing, rejection
+            if rejection is not None:
+                raise rejection
+            message = await receive()
+            if message["type"] != "http.request":
+                return message
+
+            body = message.get("body", b"")
+            received += len(body)
+            if received > max_body:
+                rejection = _UploadRejected(413, too_large)
+            elif sniffing:
+                # Once the body is complete there is nothing left to cut off; the endpoint sniffs it.
+                if not message.get("more_body", False):
+                    sniffing = False
+                else:
+                    head.extend(body)
+                    match = MULTIPART_FILE_HEADER.search(head)
+                    if match and len(head) - match.end() >= 16:
+                        sniffing = False
+                        if _sniff_file_kind(bytes(head[match.end() : match.end() + 16])) not in allowed_kinds:
+                            rejection = _UploadRejected(
+                                415, "File content does not match a supported file type."
+                            )
+                    elif not match and len(head) > MULTIPART_OVERHEAD_BYTES:
+                        sniffing = False
+                if not sniffing:
+                    head.clear()
+
+            if rejection is not None:
+                raise rejection
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            # Whatever the app makes of the aborted body is replaced by the rejection below.
+            if rejection is not None and not response_started:
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, checked_receive, guarded_send)
+        except Exception:
+            if rejection is None or response_started:
+                raise
+
+        if rejection is not None and not response_started:
+            logger.info(
+                json.dumps(
+                    {
+                        "event": "upload_rejected",
+                        "path": path,
+                        "status_code": rejection.status_code,
+                        "bytes_received": received,
+                    }
+                )
+            )
+            await JSONResponse(status_code=rejection.status_code, content={"detail": rejection.detail})(
+                scope, receive, send
+            )
+
+
 app = FastAPI(title="ClaimFlow AI API", version="1.0.0")
 
 cors_allow_origin_regex = r"^https?://(localhost|127\.0\.0\.1)(:\d+)?$" if APP_ENV != "production" else None
 
+# Added before CORS so it sits inside it and the 413/415 responses still carry CORS headers.
+app.add_middleware(UploadLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=ALLOWED_ORIGINS,
@@ -296,6 +501,91 @@ def enforce_rate_limit(request: Request, bucket: str, limit: int, window_seconds
         rate_limit_state[key] = timestamps
 
 
+def _sniff_file_kind(head: bytes) -> str | None:
+    if head.startswith(b"%PDF-"):
+        return "pdf"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return "wav"
+    if head.startswith(b"\x1a\x45\xdf\xa3"):
+        return "webm"
+    if head.startswith(b"OggS"):
+        return "ogg"
+    if head.startswith(b"fLaC"):
+        return "flac"
+    if head[4:8] == b"ftyp":
+        return "mp4"
+    if head.startswith(b"ID3") or (len(head) > 1 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0):
+        return "mp3"
+    return None
+
+
+def _iter_checked_upload(upload: UploadFile, max_bytes: int, allowed_kinds: set[str]):
+    """Yield an upload in fixed-size chunks, enforcing type (magic bytes) and size."""
+    declared_size = getattr(upload, "size", None)
+    if declared_size is not None and declared_size > max_bytes:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File too large. Maximum size is {max_bytes // (1024 * 1024)} MB.",
+        )
+
+    first_chunk = upload.file.read(UPLOAD_CHUNK_BYTES)
+    if not first_chunk:
+        raise HTTPException(status_code=400, detail="Uploaded file is empty.")
+    if _sniff_file_kind(first_chunk[:16]) not in allowed_kinds:
+        raise HTTPException(status_code=415, detail="File content does not match a supported file type.")
+
+    read = 0
+    chunk = first_chunk
+    while chunk:
+        read += len(chunk)
+        if read > max_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File too large. Maximum size is {max_bytes // (1024 * 1024)} MB.",
+            )
+        yield chunk
+        chunk = upload.file.read(UPLOAD_CHUNK_BYTES)
+
+
+def save_upload_to_temp(
+    upload: UploadFile,
+    suffix: str,
+    max_bytes: int,
+    allowed_kinds: set[str],
+    hasher: Any | None = None,
+) -> str:
+    """Copy an upload to a temp file in fixed-size chunks, enforcing type and size.
+
+    The first chunk is sniffed for magic bytes before anything is written, and
+    the copy stops as soon as max_bytes is exceeded, so memory use stays at one
+    chunk regardless of file size. When a hashlib object is given it is fed
+    every chunk, giving a content hash without a second read.
+    """
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+    try:
+        with temp_file:
+            for chunk in _iter_checked_upload(upload, max_bytes, allowed_kinds):
+                temp_file.write(chunk)
+                if hasher is not None:
+                    hasher.update(chunk)
+    except BaseException:
+        try:
+            os.remove(temp_file.name)
+        except OSError:
+            pass
+        raise
+    return temp_file.name
+
+
+def read_upload_bytes(upload: UploadFile, max_bytes: int, allowed_kinds: set[str]) -> bytes:
+    """Read a small upload (voice clips) into memory with the same type and size checks."""
+    return b"".join(_iter_checked_upload(upload, max_bytes, allowed_kinds))
+
+
 def get_health_warnings() -> list[str]:
     warnings: list[str] = []
 
@@ -362,6 +652,7 @@ def init_db_schema() -> None:
                     last_detected_language TEXT NOT NULL DEFAULT 'English',
                     document_text TEXT NOT NULL DEFAULT '',
                     document_chunks JSONB NOT NULL DEFAULT '[]'::jsonb,
+                    document_bill JSONB,
                     uploaded_document TEXT,
                     created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
                     updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
@@ -379,12 +670,54 @@ def init_db_schema() -> None:
                 );
                 """
             )
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS document_jobs (
+                    job_id UUID PRIMARY KEY,
+                    session_id UUID NOT NULL REFERENCES chat_sessions(session_id) ON DELETE CASCADE,
+                    file_name TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'queued'
+                        CHECK (status IN ('queued', 'processing', 'completed', 'failed')),
+                    stage TEXT NOT NULL DEFAULT 'queued',
+                    progress INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    result JSONB,
+                    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+                );
+                """
+            )
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS document_extraction_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    content_sha256 TEXT NOT NULL,
+                    ocr_lang TEXT NOT NULL,
+                    extractor_version TEXT NOT NULL,
+                    document_text TEXT NOT NULL,
+                    page_texts JSONB NOT NULL DEFAULT '[]'::jsonb,
+                    analysis JSONB NOT NULL,
+                    summary TEXT NOT NULL DEFAULT '',
+                    document_chunks JSONB NOT NULL DEFAULT '[]'::jsonb,
+                    byte_size INTEGER NOT NULL,
+                    hit_count INTEGER NOT NULL DEFAULT 0,
+                    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                    last_used_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+                );
+                """
+            )
             cur.execute(
                 "CREATE INDEX IF NOT EXISTS idx_chat_messages_session_id_id ON chat_messages(session_id, id);"
             )
+            cur.execute(
+                "CREATE INDEX IF NOT EXISTS idx_document_jobs_session_created ON document_jobs(session_id, created_at DESC);"
+            )
             cur.execute(
                 "ALTER TABLE chat_sessions ADD COLUMN IF NOT EXISTS user_email TEXT REFERENCES users(email) ON DELETE SET NULL;"
             )
+            cur.execute(
+                "ALTER TABLE chat_sessions ADD COLUMN IF NOT EXISTS document_bill JSONB;"
+            )
             cur.execute(
                 "ALTER TABLE auth_sessions ADD COLUMN IF NOT EXISTS expires_at TIMESTAMPTZ NOT NULL DEFAULT (NOW() + INTERVAL '168 hours');"
             )
@@ -413,9 +746,18 @@ def get_session_state(session_id: str) -> SessionState | None:
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
             cur.execute(
                 """
-                SELECT session_id, last_detected_language, document_text, document_chunks, uploaded_document
-                FROM chat_sessions
-                WHERE session_id = %s
+                SELECT s.session_id, s.last_detected_language, s.document_text, s.document_chunks,
+                       s.document_bill, s.uploaded_document,
+                       (
+                           SELECT j.file_name
+                           FROM document_jobs j
+                           WHERE j.session_id = s.session_id
+                             AND j.status IN ('queued', 'processing')
+                           ORDER BY j.created_at DESC
+                           LIMIT 1
+                       ) AS pending_document
+                FROM chat_sessions s
+                WHERE s.session_id = %s
                 """,
                 (session_id,),
             )
@@ -427,8 +769,13 @@ def get_session_state(session_id: str) -> SessionState | None:
     return SessionState(
         messages=load_messages(session_id),
         document_text=row["document_text"] or "",
-        document_chunks=row["document_chunks"] or [],
+        document_chunks=[
+            chunk if isinstance(chunk, dict) else {"text": chunk, "page": None}
+            for chunk in row["document_chunks"] or []
+        ],
+        document_bill=row["document_bill"],
         uploaded_document=row["uploaded_document"],
+        pending_document=row["pending_document"],
         last_detected_language=row["last_detected_language"] or "English",
     )
 
@@ -461,28 +808,245 @@ def attach_session_to_user(session_id: str, user_email: str) -> None:
         conn.commit()
 
 
-def upsert_session_state(session_id: str, session: SessionState) -> None:
+def update_session_language(session_id: str, language: str) -> None:
+    # Chat turns only touch the language so they never overwrite a document
+    # that a background ingestion job stored in the meantime.
     with get_db_conn() as conn:
         with conn.cursor() as cur:
             cur.execute(
                 """
                 UPDATE chat_sessions
                 SET last_detected_language = %s,
-                    document_text = %s,
+                    updated_at = NOW()
+                WHERE session_id = %s
+                """,
+                (language, session_id),
+            )
+        conn.commit()
+
+
+def update_session_document(
+    session_id: str,
+    document_text: str,
+    document_chunks: list[dict[str, Any]],
+    uploaded_document: str,
+    document_bill: dict[str, Any] | None = None,
+) -> None:
+    with get_db_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE chat_sessions
+                SET document_text = %s,
                     document_chunks = %s,
+                    document_bill = %s,
                     uploaded_document = %s,
                     updated_at = NOW()
                 WHERE session_id = %s
                 """,
                 (
-                    session.last_detected_language,
-                    session.document_text,
-                    Json(session.document_chunks),
-                    session.uploaded_document,
+                    document_text,
+                    Json(document_chunks),
+                    Json(document_bill) if document_bill else None,
+                    uploaded_document,
+                    session_id,
+                ),
+            )
+        conn.commit()
+
+
+def create_document_job(session_id: str, file_name: str, result: dict[str, Any] | None = None) -> str:
+    # A result means the document was served from the extraction cache: the job is born completed.
+    job_id = str(uuid.uuid4())
+    status, progress = ("completed", 100) if result is not None else ("queued", 0)
+    with get_db_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO document_jobs (job_id, session_id, file_name, status, stage, progress, result)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                """,
+                (
+                    job_id,
                     session_id,
+                    file_name,
+                    status,
+                    status,
+                    progress,
+                    Json(result) if result is not None else None,
                 ),
             )
         conn.commit()
+    return job_id
+
+
+def update_document_job(
+    job_id: str,
+    status: str,
+    stage: str,
+    progress: int,
+    error: str | None = None,
+    result: dict[str, Any] | None = None,
+) -> None:
+    with get_db_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE document_jobs
+                SET status = %s,
+                    stage = %s,
+                    progress = %s,
+                    error = %s,
+                    result = %s,
+                    updated_at = NOW()
+                WHERE job_id = %s
+                """,
+                (status, stage, progress, error, Json(result) if result is not None else None, job_id),
+            )
+        conn.commit()
+
+
+def get_document_job(job_id: str) -> dict[str, Any] | None:
+    try:
+        normalized_job_id = str(uuid.UUID(job_id))
+    except ValueError:
+        return None
+
+    with get_db_conn() as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                """
+                SELECT job_id, session_id, file_name, status, stage, progress, error, result,
+                       EXTRACT(EPOCH FROM created_at) AS created_at,
+                       EXTRACT(EPOCH FROM updated_at) AS updated_at
+                FROM document_jobs
+                WHERE job_id = %s
+                """,
+                (normalized_job_id,),
+            )
+            row = cur.fetchone()
+    if not row:
+        return None
+
+    job: dict[str, Any] = {
+        "job_id": str(row["job_id"]),
+        "session_id": str(row["session_id"]),
+        "file_name": row["file_name"],
+        "status": row["status"],
+        "stage": row["stage"],
+        "progress": row["progress"],
+        "error": row["error"],
+        "created_at": float(row["created_at"]),
+        "updated_at": float(row["updated_at"]),
+    }
+    if row["result"]:
+        job.update(row["result"])
+    return job
+
+
+def document_cache_key(content_sha256: str, ocr_lang: str, file_type: str) -> str:
+    # Text-layer PDFs with OCR disabled do not depend on the OCR language.
+    if file_type == "pdf" and not PDF_OCR_ENABLED:
+        ocr_lang = "none"
+    return f"{content_sha256}:{ocr_lang}:{DOCUMENT_CACHE_VERSION}"
+
+
+def get_cached_extraction(cache_key: str) -> dict[str, Any] | None:
+    with get_db_conn() as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                """
+                UPDATE document_extraction_cache
+                SET hit_count = hit_count + 1,
+                    last_used_at = NOW()
+                WHERE cache_key = %s
+                RETURNING document_text, page_texts, analysis, summary, document_chunks
+                """,
+                (cache_key,),
+            )
+            row = cur.fetchone()
+        conn.commit()
+    return dict(row) if row else None
+
+
+def store_cached_extraction(
+    cache_key: str,
+    content_sha256: str,
+    ocr_lang: str,
+    document_text: str,
+    page_texts: list[dict[str, Any]],
+    analysis: dict[str, Any],
+    summary: str,
+    document_chunks: list[dict[str, Any]],
+) -> None:
+    byte_size = len(document_text.encode("utf-8")) + len(
+        json.dumps([page_texts, analysis, summary, document_chunks], ensure_ascii=False).encode("utf-8")
+    )
+    if byte_size > DOCUMENT_CACHE_MAX_BYTES:
+        return
+
+    with get_db_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO document_extraction_cache (
+                    cache_key, content_sha256, ocr_lang, extractor_version, document_text,
+                    page_texts, analysis, summary, document_chunks, byte_size
+                )
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                ON CONFLICT (cache_key) DO UPDATE
+                SET last_used_at = NOW()
+                """,
+                (
+                    cache_key,
+                    content_sha256,
+                    ocr_lang,
+                    DOCUMENT_CACHE_VERSION,
+                    document_text,
+                    Json(page_texts),
+                    Json(analysis),
+                    summary,
+                    Json(document_chunks),
+                    byte_size,
+                ),
+            )
+            # Size-based LRU eviction: drop the least recently used entries beyond the budget.
+            cur.execute(
+                """
+                DELETE FROM document_extraction_cache
+                WHERE cache_key IN (
+                    SELECT cache_key
+                    FROM (
+                        SELECT cache_key,
+                               SUM(byte_size) OVER (ORDER BY last_used_at DESC, cache_key) AS running_bytes
+                        FROM document_extraction_cache
+                    ) ranked
+                    WHERE running_bytes > %s
+                )
+                """,
+                (DOCUMENT_CACHE_MAX_BYTES,),
+            )
+        conn.commit()
+
+
+def fail_stale_document_jobs() -> None:
+    # Temp files of jobs that were running when a worker died are gone; fail them
+    # so clients stop polling and the chat stops reporting the document as pending.
+    with get_db_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE document_jobs
+                SET status = 'failed',
+                    stage = 'failed',
+                    error = 'Processing was interrupted. Please upload the document again.',
+                    updated_at = NOW()
+                WHERE status IN ('queued', 'processing')
+                  AND updated_at < NOW() - (%s * INTERVAL '1 minute')
+                """,
+                (UPLOAD_STALE_JOB_MINUTES,),
+            )
+        conn.commit()
 
 
 def add_message(session_id: str, role: str, content: str) -> None:
@@ -673,44 +1237,39 @@ def get_or_create_session(session_id: str | None, user_email: str | None = None)
     return create_session(user_email=user_email)
 
 
-def chunk_document_text(text: str, chunk_size: int = 900, overlap: int = 150) -> list[str]:
+def chunk_document_text(text: str) -> list[dict[str, Any]]:
+    """Split a document at page, paragraph and table-row boundaries (see utils/chunker.py)."""
     if not text:
         return []
+    return list(iter_chunks(text))
 
-    chunks: list[str] = []
-    start = 0
-    text_len = len(text)
-    while start < text_len:
-        end = min(start + chunk_size, text_len)
-        chunk = text[start:end].strip()
-        if chunk:
-            chunks.append(chunk)
-        if end >= text_len:
-            break
-        start = max(0, end - overlap)
-    return chunks
-
-
-def retrieve_document_chunks(query: str, document_chunks: list[str], k: int = 3) -> list[str]:
+
+def _format_document_chunk(chunk: dict[str, Any]) -> str:
+    if chunk.get("page"):
+        return f"[Page {chunk['page']}] {chunk['text']}"
+    return chunk["text"]
+
+
+def retrieve_document_chunks(query: str, document_chunks: list[dict[str, Any]], k: int = 3) -> list[str]:
     if not query or not document_chunks:
         return []
 
     query_terms = {token.lower() for token in query.split() if len(token.strip()) > 2}
     if not query_terms:
-        return document_chunks[:k]
+        return [_format_document_chunk(chunk) for chunk in document_chunks[:k]]
 
-    scored: list[tuple[int, str]] = []
-    for chunk in document_chunks:
-        chunk_terms = {token.lower() for token in chunk.split()}
+    scored: list[tuple[int, int, dict[str, Any]]] = []
+    for index, chunk in enumerate(document_chunks):
+        chunk_terms = {token.lower() for token in chunk["text"].split()}
         overlap_score = len(query_terms.intersection(chunk_terms))
         if overlap_score > 0:
-            scored.append((overlap_score, chunk))
+            scored.append((overlap_score, index, chunk))
 
     if not scored:
-        return document_chunks[:k]
+        return [_format_document_chunk(chunk) for chunk in document_chunks[:k]]
 
     scored.sort(key=lambda item: item[0], reverse=True)
-    return [chunk for _, chunk in scored[:k]]
+    return [_format_document_chunk(chunk) for _, _, chunk in scored[:k]]
 
 
 def _language_name_from_preference(preferred_language: str | None) -> tuple[str | None, str | None]:
@@ -794,9 +1353,21 @@ IMPORTANT LANGUAGE INSTRUCTIONS:
 6. Do not mention internal system behavior."""
 
     document_instruction = ""
-    if session.document_text:
-        top_chunks = retrieve_document_chunks(user_input, session.document_chunks, k=3)
-        selected_context = "\n\n".join(top_chunks) if top_chunks else session.document_text[:1000]
+    if session.pending_document and not session.document_text:
+        document_instruction = f"""
+
+DOCUMENT STATUS:
+The user's document "{session.pending_document}" is still being processed.
+If they ask about it, tell them it will be ready in a moment and to ask again shortly."""
+    elif session.document_text:
+        bill_rows = format_bill_rows(session.document_bill) if session.document_bill else ""
+        if bill_rows:
+            # Structured line items replace most of the raw bill text; one snippet keeps the header details.
+            top_chunks = retrieve_document_chunks(user_input, session.document_chunks, k=1)
+            selected_context = "\n\n".join([bill_rows, *top_chunks])
+        else:
+            top_chunks = retrieve_document_chunks(user_input, session.document_chunks, k=3)
+            selected_context = "\n\n".join(top_chunks) if top_chunks else session.document_text[:1000]
         document_instruction = f"""
 
 DOCUMENT CONTEXT:
@@ -851,59 +1422,7 @@ def _find_repeated_query_response(messages: list[dict[str, str]], user_input: st
 
 def _classify_chat_domain(user_input: str) -> str:
     """Classify query into insurance, finance, mixed, or unknown domains."""
-    text = (user_input or "").lower()
-
-    insurance_keywords = {
-        "insurance", "claim", "policy", "premium", "coverage", "deductible",
-        "reimbursement", "settlement", "hospital claim", "accident claim",
-        "health insurance", "car insurance", "life insurance",
-    }
-    finance_keywords = {
-        "budget", "budgeting", "investment", "invest", "stock", "mutual fund",
-        "portfolio", "risk", "retirement", "financial planning", "savings",
-        "cash flow", "asset allocation", "emergency fund", "debt",
-    }
-
-    insurance_score = sum(1 for word in insurance_keywords if word in text)
-    finance_score = sum(1 for word in finance_keywords if word in text)
-
-    if insurance_score > 0 and finance_score > 0:
-        return "mixed"
-    if insurance_score > 0:
-        return "insurance"
-    if finance_score > 0:
-        return "finance"
-
-    intent_name, _ = IntentClassifier.classify(user_input)
-    if intent_name in {"insurance_claim", "insurance_general"}:
-        return "insurance"
-    if intent_name == "financial_literacy":
-        return "finance"
-    return "unknown"
-
-
-def _infer_transliterated_voice_language(user_text: str) -> str | None:
-    """Detect likely Indic language from transliterated latin text."""
-    text = (user_text or "").lower()
-    if not text:
-        return None
-
-    patterns = {
-        "hi": ["namaste", "kaise", "mujhe", "kya", "nahi", "hai", "hain"],
-        "te": ["namaskaram", "nenu", "ela", "cheyyali", "naaku", "meeru"],
-        "ta": ["vanakkam", "eppadi", "naan", "ungal", "enakku"],
-        "kn": ["namaskara", "hegide", "nanu", "nanage", "hege"],
-    }
-
-    best_lang = None
-    best_score = 0
-    for lang_code, tokens in patterns.items():
-        score = sum(1 for token in tokens if token in text)
-        if score > best_score:
-            best_lang = lang_code
-            best_score = score
-
-    return best_lang if best_score >= 2 else None
+    return IntentClassifier.classify_domain(user_input)
 
 
 def _is_service_error_response(text: str) -> bool:
@@ -950,6 +1469,19 @@ def _insurance_fallback_response(language_code: str) -> str:
     )
 
 
+_EMPTY_INSURANCE_RESPONSE = "I could not generate an insurance response. Please try again."
+_EMPTY_CHAT_RESPONSE = (
+    "Summary\nI could not generate a reliable finance response right now.\n\n"
+    "Explanation\nPlease try again in a few seconds.\n\n"
+    "Actionable Steps\n"
+    "1. Retry your question.\n"
+    "2. Add details such as amount, timeline, and risk level.\n"
+    "3. If it persists, check API quota and connectivity.\n\n"
+    "Example\n"
+    "Not needed for this query."
+)
+
+
 def generate_chat_response(user_input: str, session: SessionState, preferred_language: str | None = None) -> tuple[str, str]:
     # Resolve preferred language first so finance assistant can respond consistently.
     if preferred_language:
@@ -1000,11 +1532,12 @@ def generate_chat_response(user_input: str, session: SessionState, preferred_lan
             context_k=3,
             verbose=False,
             conversation_history=session.messages,
+            lang=detected_lang,
         )
         if _is_service_error_response(response):
             response = _insurance_fallback_response(detected_lang)
         if not response:
-            response = "I could not generate an insurance response. Please try again."
+            response = _EMPTY_INSURANCE_RESPONSE
         logger.info(
             json.dumps(
                 {
@@ -1035,31 +1568,48 @@ def generate_chat_response(user_input: str, session: SessionState, preferred_lan
         )
 
     if not response:
-        response = (
-            "Summary\nI could not generate a reliable finance response right now.\n\n"
-            "Explanation\nPlease try again in a few seconds.\n\n"
-            "Actionable Steps\n"
-            "1. Retry your question.\n"
-            "2. Add details such as amount, timeline, and risk level.\n"
-            "3. If it persists, check API quota and connectivity.\n\n"
-            "Example\n"
-            "Not needed for this query."
-        )
+        response = _EMPTY_CHAT_RESPONSE
     return response, detected_lang
 
 
-def maybe_build_tts_audio(text: str, language_code: str) -> str | None:
-    audio_file = f"temp_response_{int(time.time())}.mp3"
-    audio_path = text_to_speech(text, audio_file, language=language_code)
-    if not audio_path or not os.path.exists(audio_path):
-        return None
-    with open(audio_path, "rb") as file:
-        audio_b64 = base64.b64encode(file.read()).decode("ascii")
+def start_tts_audio(text: str, language_code: str) -> str | None:
+    """Start synthesizing the reply in the background and return the URL it will be served from."""
+    audio_id = get_audio_store().create(text, language_code)
+    return f"/audio/{audio_id}" if audio_id else None
+
+
+def canned_tts_items() -> list[tuple[str, str]]:
+    """Fixed replies worth pre-rendering: fallbacks and clarification prompts in every language they exist in."""
+    items = [(_insurance_fallback_response(code), code) for code in ("en", "hi", "te", "ta", "kn")]
+    items.extend(canned_finance_responses())
+    items.extend(
+        (text, "en")
+        for text in (
+            BLOCKED_RESPONSE,
+            OUT_OF_SCOPE_RESPONSE,
+            CLARIFICATION_RESPONSE,
+            _EMPTY_INSURANCE_RESPONSE,
+            _EMPTY_CHAT_RESPONSE,
+        )
+    )
+    return items
+
+
+def warm_up_tts() -> None:
+    """Load local voice models, then pre-render the canned replies into the TTS cache."""
+    preload_backends()
+    if not TTS_PRERENDER or get_tts_cache() is None:
+        return
     try:
-        os.remove(audio_path)
-    except OSError:
-        pass
-    return audio_b64
+        counts = prerender_speech(canned_tts_items())
+    except Exception as e:
+        logger.warning(f"TTS pre-render failed: {str(e)[:120]}")
+        return
+    logger.info(
+        json.dumps(
+            {"event": "tts_prerendered", "backends": [backend.name for backend in get_backends()], **counts}
+        )
+    )
 
 
 def parse_preferred_language(preferred_language: str | None) -> str | None:
@@ -1091,12 +1641,20 @@ def parse_preferred_language(preferred_language: str | None) -> str | None:
 @app.get("/health")
 def health() -> dict[str, Any]:
     warnings = get_health_warnings()
-    return {
+    payload: dict[str, Any] = {
         "status": "ok",
         "env": APP_ENV,
         "vector_backend": VECTOR_BACKEND,
         "warnings": warnings,
     }
+    # Only report retrieval cache stats when RAG is already loaded; never trigger the heavy import here.
+    retriever_module = sys.modules.get("rag.retriever")
+    if retriever_module is not None:
+        payload["retrieval_cache"] = retriever_module.get_retrieval_cache_stats()
+    tts_cache = get_tts_cache()
+    if tts_cache is not None:
+        payload["tts_cache"] = tts_cache.stats()
+    return payload
 
 
 def hash_password(password: str) -> str:
@@ -1212,7 +1770,15 @@ def startup_event() -> None:
     _log_auth_backend_versions()
     init_db_pool()
     init_db_schema()
+    fail_stale_document_jobs()
     init_demo_user()
+    if STT_PRELOAD:
+        # Load in the background so startup and health checks are not held up;
+        # a voice request arriving first waits on the same load instead of starting another.
+        threading.Thread(target=preload_whisper_model, name="whisper-preload", daemon=True).start()
+    threading.Thread(target=warm_up_tts, name="tts-warmup", daemon=True).start()
+    threading.Thread(target=preload_language_detector, name="langdetect-preload", daemon=True).start()
+    threading.Thread(target=preload_intent_models, name="intent-model-preload", daemon=True).start()
 
 
 @app.post("/auth/signup", response_model=AuthResponse)
@@ -1391,16 +1957,16 @@ def chat(request: ChatRequest, req: Request) -> ChatResponse:
         )
         session.messages.append({"role": "assistant", "content": response_text})
         add_message(session_id, "assistant", response_text)
-        upsert_session_state(session_id, session)
+        update_session_language(session_id, session.last_detected_language)
 
         # For typed chat, generate voice output only when explicitly requested.
-        audio_base64 = maybe_build_tts_audio(response_text, lang_code) if request.include_audio else None
+        audio_url = start_tts_audio(response_text, lang_code) if request.include_audio else None
 
         return ChatResponse(
             session_id=session_id,
             response=response_text,
             language=LANGUAGE_NAME_BY_CODE.get(lang_code, "English"),
-            audio_base64=audio_base64,
+            audio_url=audio_url,
         )
     except Exception as error:
         logger.exception("chat_endpoint_error: %s", error)
@@ -1417,10 +1983,228 @@ def chat(request: ChatRequest, req: Request) -> ChatResponse:
                 "Please try again in a few seconds."
             ),
             language=request.language if request.language in SUPPORTED_LANGUAGES else "English",
-            audio_base64=None,
+            audio_url=None,
         )
 
 
+@app.post("/savings/scenarios")
+def savings_scenarios(request: SavingsScenarioRequest, req: Request) -> dict[str, Any]:
+    """Batch lump-sum + SIP projections for the savings calculator sliders."""
+    enforce_rate_limit(req, "savings", RATE_LIMIT_SAVINGS_PER_MIN)
+    started = time.perf_counter()
+    try:
+        if request.path_years is not None:
+            result = SavingsEngine.project_paths(
+                request.principal,
+                request.monthly_contribution,
+                request.rate,
+                max_years=request.path_years,
+                frequency=request.frequency,
+                inflation=request.inflation,
+                tax_rate=request.tax_rate,
+            )
+        else:
+            result = SavingsEngine.project_scenarios(
+                request.principal,
+                request.monthly_contribution,
+                request.rate,
+                request.years,
+                request.frequency,
+                inflation=request.inflation,
+                tax_rate=request.tax_rate,
+                grid=request.grid,
+            )
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+
+    payload = SavingsEngine.scenario_payload(result)
+    logger.info(
+        json.dumps(
+            {
+                "event": "savings_scenarios",
+                "scenarios": int(result.final_value.size),
+                "grid": request.grid,
+                "paths": request.path_years is not None,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            }
+        )
+    )
+    return payload
+
+
+@app.post("/tts/stream")
+def tts_stream(request: TTSRequest, req: Request) -> StreamingResponse:
+    """Stream MP3 audio for a reply; the first sentence is sent as soon as it is synthesized."""
+    enforce_rate_limit(req, "tts", RATE_LIMIT_VOICE_PER_MIN)
+    lang_code = parse_preferred_language(request.language) or "en"
+
+    def audio_stream():
+        started = time.perf_counter()
+        sources: list[str] = []
+        first_chunk_ms = None
+        audio_bytes = 0
+        try:
+            for chunk in iter_speech_segments(request.text, lang_code, sources):
+                if first_chunk_ms is None:
+                    first_chunk_ms = round((time.perf_counter() - started) * 1000, 2)
+                audio_bytes += len(chunk)
+                yield chunk
+        finally:
+            logger.info(
+                json.dumps(
+                    {
+                        "event": "tts_streamed",
+                        "language": lang_code,
+                        "segments": len(sources),
+                        "cached_segments": sum(1 for source in sources if source in {"memory", "disk"}),
+                        "failed": "error" in sources,
+                        "audio_bytes": audio_bytes,
+                        "first_chunk_ms": first_chunk_ms,
+                        "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                    }
+                )
+            )
+
+    return StreamingResponse(audio_stream(), media_type="audio/mpeg", headers={"Cache-Control": "no-store"})
+
+
+@app.get("/audio/{audio_id}")
+def get_audio(audio_id: str, req: Request) -> Response:
+    """
+    Serve reply audio created by /chat or /voice.
+
+    While the clip is still rendering it is streamed segment by segment;
+    once complete it is served with a Content-Length and byte-range support.
+    """
+    clip = get_audio_store().get(audio_id)
+    if clip is None:
+        raise HTTPException(status_code=404, detail="Audio not found or expired")
+
+    range_header = req.headers.get("range")
+    headers = {"Cache-Control": "private, max-age=300", "Accept-Ranges": "bytes"}
+
+    # Media elements open with "bytes=0-", which a whole-file stream satisfies.
+    if not clip.done and (not range_header or range_header.replace(" ", "").lower() == "bytes=0-"):
+
+        def audio_stream():
+            sent = 0
+            while True:
+                chunks, done = clip.wait_for_chunks(sent, AUDIO_RENDER_WAIT_SECONDS)
+                if not chunks and not done:
+                    return
+                for chunk in chunks:
+                    yield chunk
+                sent += len(chunks)
+                if done and sent >= len(clip.chunks):
+                    return
+
+        return StreamingResponse(audio_stream(), media_type="audio/mpeg", headers={"Cache-Control": "no-store"})
+
+    if not clip.done and not clip.wait_done(AUDIO_RENDER_WAIT_SECONDS):
+        raise HTTPException(status_code=503, detail="Audio is still being generated")
+    if clip.failed and not clip.chunks:
+        raise HTTPException(status_code=503, detail="Audio generation failed")
+
+    data = clip.data()
+    if range_header:
+        byte_range = parse_byte_range(range_header, len(data))
+        if byte_range is None:
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{len(data)}"})
+        start, end = byte_range
+        return Response(
+            content=data[start:end + 1],
+            status_code=206,
+            media_type="audio/mpeg",
+            headers={**headers, "Content-Range": f"bytes {start}-{end}/{len(data)}"},
+        )
+    return Response(content=data, media_type="audio/mpeg", headers=headers)
+
+
+def run_voice_turn(
+    session_id: str,
+    session: SessionState,
+    audio_bytes: bytes,
+    preferred_language: str | None,
+    on_partial: Any | None = None,
+) -> dict[str, Any]:
+    """
+    Transcribe one voice turn, answer it and record both messages on the session.
+
+    Shared by POST /voice and the /ws/voice session. Raises HTTPException(400)
+    when no speech could be recognized.
+
+    Returns:
+        {"transcript", "transcript_translated", "response", "lang_code"}
+    """
+    preferred_lang = (
+        parse_preferred_language(preferred_language)
+        or SUPPORTED_LANGUAGES.get(session.last_detected_language, "en")
+    )
+    stt_started = time.perf_counter()
+    transcription = transcribe_audio(audio_bytes, preferred_language=preferred_lang, on_partial=on_partial)
+    user_text = transcription["text"]
+    logger.info(
+        json.dumps(
+            {
+                "event": "voice_transcribed",
+                "session_id": session_id,
+                "engine": transcription.get("engine"),
+                "decoder": transcription.get("decoder"),
+                "decode_ms": transcription.get("decode_ms"),
+                "audio_seconds": transcription.get("audio_seconds"),
+                "speech_seconds": transcription.get("speech_seconds"),
+                "segments": transcription.get("segments"),
+                "language": transcription.get("language"),
+                "detected_language": transcription.get("detected_language"),
+                "language_probability": transcription.get("language_probability"),
+                "success": not user_text.startswith("Error:"),
+                "duration_ms": round((time.perf_counter() - stt_started) * 1000, 2),
+            }
+        )
+    )
+    if user_text.startswith("Error:"):
+        preferred_name = LANGUAGE_NAME_BY_CODE.get(preferred_lang, "your selected language")
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"Could not clearly recognize your {preferred_name} voice input. "
+                "Please speak a little slower and try again."
+            ),
+        )
+
+    # Memoized: the transcript translation and chat response reuse this detection.
+    voice_detection = detect_language_details(user_text)
+    detected_voice_lang = get_tts_language_code(voice_detection.code)
+
+    # If user selected English but spoke another supported language, prefer spoken language.
+    effective_preferred_language = preferred_language
+    if parse_preferred_language(preferred_language) in {None, "en"}:
+        effective_lang_code = voice_detection.transliterated or detected_voice_lang
+        if effective_lang_code in {"hi", "te", "ta", "kn"}:
+            effective_preferred_language = LANGUAGE_NAME_BY_CODE.get(effective_lang_code, preferred_language)
+
+    translated_transcript = translate_transcript_for_language(user_text, effective_preferred_language)
+
+    session.messages.append({"role": "user", "content": user_text})
+    add_message(session_id, "user", user_text)
+    # Pass preferred_language to generate_chat_response for language-specific responses
+    response_text, lang_code = generate_chat_response(
+        user_text, 
+        session,
+        preferred_language=effective_preferred_language
+    )
+    session.messages.append({"role": "assistant", "content": response_text})
+    add_message(session_id, "assistant", response_text)
+    update_session_language(session_id, session.last_detected_language)
+
+    return {
+        "transcript": user_text,
+        "transcript_translated": translated_transcript,
+        "response": response_text,
+        "lang_code": lang_code,
+    }
+
+
 @app.post("/voice", response_model=ChatResponse)
 @app.post("/voice-input", response_model=ChatResponse)
 def voice_chat(
@@ -1434,81 +2218,338 @@ def voice_chat(
     user_email = resolve_session_email(session_token)
     session_id, session = get_or_create_session(session_id, user_email=user_email)
 
-    suffix = os.path.splitext(audio.filename or "voice.wav")[1] or ".wav"
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_audio:
-        temp_audio.write(audio.file.read())
-        temp_audio_path = temp_audio.name
+    # Voice clips are decoded in memory; nothing is written to disk.
+    audio_bytes = read_upload_bytes(audio, MAX_VOICE_BYTES, AUDIO_FILE_KINDS)
 
-    try:
-        preferred_lang = (
-            parse_preferred_language(preferred_language)
-            or SUPPORTED_LANGUAGES.get(session.last_detected_language, "en")
+    preferred_lang = (
+        parse_preferred_language(preferred_language)
+        or SUPPORTED_LANGUAGES.get(session.last_detected_language, "en")
+    )
+    preferred_name = LANGUAGE_NAME_BY_CODE.get(preferred_lang, "English")
+    logger.info(
+        "voice_request_received session_id=%s preferred_language_raw=%s preferred_lang_code=%s preferred_lang_name=%s audio_filename=%s content_type=%s",
+        session_id,
+        preferred_language,
+        preferred_lang,
+        preferred_name,
+        audio.filename,
+        audio.content_type,
+    )
+
+    turn = run_voice_turn(session_id, session, audio_bytes, preferred_language)
+    response_text = turn["response"]
+    lang_code = turn["lang_code"]
+    audio_url = start_tts_audio(response_text, lang_code)
+    return ChatResponse(
+        session_id=session_id,
+        response=response_text,
+        language=LANGUAGE_NAME_BY_CODE.get(lang_code, "English"),
+        audio_url=audio_url,
+        transcript=turn["transcript"],
+        transcript_translated=turn["transcript_translated"],
+    )
+
+
+async def _run_ws_voice_turn(
+    websocket: WebSocket,
+    session_id: str,
+    session: SessionState,
+    audio_bytes: bytes,
+    preferred_language: str | None,
+) -> None:
+    loop = asyncio.get_running_loop()
+
+    def send_from_worker(send: Any, payload: Any) -> None:
+        # Called on threadpool workers; waiting for each send keeps frames in order.
+        asyncio.run_coroutine_threadsafe(send(payload), loop).result()
+
+    if not audio_bytes:
+        await websocket.send_json({"type": "error", "status": 400, "detail": "No audio received for this turn."})
+        return
+    if _sniff_file_kind(audio_bytes[:16]) not in AUDIO_FILE_KINDS:
+        await websocket.send_json(
+            {"type": "error", "status": 415, "detail": "Audio does not match a supported file type."}
         )
-        preferred_name = LANGUAGE_NAME_BY_CODE.get(preferred_lang, "English")
-        logger.info(
-            "voice_request_received session_id=%s preferred_language_raw=%s preferred_lang_code=%s preferred_lang_name=%s audio_filename=%s content_type=%s",
+        return
+
+    started = time.perf_counter()
+    try:
+        enforce_rate_limit(websocket, "voice", RATE_LIMIT_VOICE_PER_MIN)
+        turn = await run_in_threadpool(
+            run_voice_turn,
             session_id,
+            session,
+            audio_bytes,
             preferred_language,
-            preferred_lang,
-            preferred_name,
-            audio.filename,
-            audio.content_type,
+            lambda text: send_from_worker(websocket.send_json, {"type": "partial_transcript", "text": text}),
         )
+    except HTTPException as error:
+        await websocket.send_json({"type": "error", "status": error.status_code, "detail": error.detail})
+        return
+    response_ms = round((time.perf_counter() - started) * 1000, 2)
 
-        user_text = speech_to_text_with_retry(temp_audio_path, language=preferred_lang, max_retries=2)
-        if user_text.startswith("Error:"):
-            preferred_name = LANGUAGE_NAME_BY_CODE.get(preferred_lang, "your selected language")
-            raise HTTPException(
-                status_code=400,
-                detail=(
-                    f"Could not clearly recognize your {preferred_name} voice input. "
-                    "Please speak a little slower and try again."
-                ),
-            )
+    await websocket.send_json(
+        {"type": "transcript", "text": turn["transcript"], "translated": turn["transcript_translated"]}
+    )
+    await websocket.send_json(
+        {
+            "type": "response",
+            "text": turn["response"],
+            "language": LANGUAGE_NAME_BY_CODE.get(turn["lang_code"], "English"),
+        }
+    )
 
-        detected_voice_lang, _ = detect_language(user_text)
-        detected_voice_lang = get_tts_language_code(detected_voice_lang)
+    def stream_audio() -> list[str]:
+        sources: list[str] = []
+        for chunk in iter_speech_segments(turn["response"], turn["lang_code"], sources):
+            send_from_worker(websocket.send_bytes, chunk)
+        return sources
 
-        # If user selected English but spoke another supported language, prefer spoken language.
-        effective_preferred_language = preferred_language
-        if parse_preferred_language(preferred_language) in {None, "en"}:
-            inferred_translit_lang = _infer_transliterated_voice_language(user_text)
-            effective_lang_code = inferred_translit_lang or detected_voice_lang
-            if effective_lang_code in {"hi", "te", "ta", "kn"}:
-                effective_preferred_language = LANGUAGE_NAME_BY_CODE.get(effective_lang_code, preferred_language)
+    await websocket.send_json({"type": "audio_start", "format": "audio/mpeg"})
+    sources = await run_in_threadpool(stream_audio)
+    await websocket.send_json({"type": "audio_end", "complete": bool(sources) and "error" not in sources})
+    logger.info(
+        json.dumps(
+            {
+                "event": "ws_voice_turn",
+                "session_id": session_id,
+                "audio_bytes": len(audio_bytes),
+                "response_ms": response_ms,
+                "tts_segments": len(sources),
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            }
+        )
+    )
 
-        translated_transcript = translate_transcript_for_language(user_text, effective_preferred_language)
 
-        session.messages.append({"role": "user", "content": user_text})
-        add_message(session_id, "user", user_text)
-        # Pass preferred_language to generate_chat_response for language-specific responses
-        response_text, lang_code = generate_chat_response(
-            user_text, 
-            session,
-            preferred_language=effective_preferred_language
+@app.websocket("/ws/voice")
+async def voice_session(websocket: WebSocket) -> None:
+    """
+    Duplex voice conversation over one connection.
+
+    Auth and the chat session are resolved once when the conversation starts
+    and kept in memory for every turn. Protocol (JSON text frames unless noted):
+
+    client: {"type": "start", "session_id", "session_token", "preferred_language"} (all optional)
+    server: {"type": "ready", "session_id"}
+    client: binary audio frames of one utterance, then {"type": "end_turn"};
+            {"type": "cancel"} drops buffered audio, {"type": "config", "preferred_language"}
+            switches language, {"type": "stop"} ends the session
+    server: {"type": "partial_transcript", "text"} as segments of a long utterance finish,
+            {"type": "transcript", "text", "translated"}, {"type": "response", "text", "language"},
+            {"type": "audio_start", "format": "audio/mpeg"}, binary MP3 chunks, {"type": "audio_end"},
+            or {"type": "error", "status", "detail"} (the session stays open)
+
+    An utterance larger than MAX_VOICE_MB gets a single 413 error; the rest of its
+    frames are discarded and its end_turn (or cancel) only resets the buffer.
+    """
+    await websocket.accept()
+    try:
+        start = await asyncio.wait_for(websocket.receive_json(), timeout=WS_VOICE_IDLE_SECONDS)
+        if not isinstance(start, dict) or start.get("type") != "start":
+            await websocket.close(code=1008)
+            return
+        user_email = await run_in_threadpool(resolve_session_email, start.get("session_token"))
+        session_id, session = await run_in_threadpool(
+            get_or_create_session,
+            start.get("session_id"),
+            user_email=user_email,
         )
-        session.messages.append({"role": "assistant", "content": response_text})
-        add_message(session_id, "assistant", response_text)
-        upsert_session_state(session_id, session)
+        preferred_language = start.get("preferred_language")
+        await websocket.send_json({"type": "ready", "session_id": session_id})
+        logger.info(json.dumps({"event": "ws_voice_open", "session_id": session_id}))
+
+        buffer = bytearray()
+        overflowed = False
+        while True:
+            message = await asyncio.wait_for(websocket.receive(), timeout=WS_VOICE_IDLE_SECONDS)
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes") is not None:
+                if overflowed:
+                    continue
+                buffer.extend(message["bytes"])
+                if len(buffer) > MAX_VOICE_BYTES:
+                    buffer.clear()
+                    overflowed = True
+                    await websocket.send_json(
+                        {
+                            "type": "error",
+                            "status": 413,
+                            "detail": f"Utterance too large. Maximum size is {MAX_VOICE_BYTES // (1024 * 1024)} MB.",
+                        }
+                    )
+                continue
+
+            try:
+                control = json.loads(message.get("text") or "")
+            except ValueError:
+                control = None
+            kind = control.get("type") if isinstance(control, dict) else None
+            if kind == "end_turn":
+                audio_bytes = bytes(buffer)
+                buffer.clear()
+                if overflowed:
+                    # Already answered with 413; a truncated clip would transcribe as noise.
+                    overflowed = False
+                    continue
+                try:
+                    await _run_ws_voice_turn(websocket, session_id, session, audio_bytes, preferred_language)
+                except WebSocketDisconnect:
+                    raise
+                except Exception:
+                    logger.exception(json.dumps({"event": "ws_voice_turn_error", "session_id": session_id}))
+                    await websocket.send_json(
+                        {"type": "error", "status": 500, "detail": "Could not complete this turn. Please try again."}
+                    )
+            elif kind == "cancel":
+                buffer.clear()
+                overflowed = False
+            elif kind == "config":
+                preferred_language = control.get("preferred_language") or preferred_language
+            elif kind == "stop":
+                await websocket.close()
+                return
+            else:
+                await websocket.send_json({"type": "error", "status": 400, "detail": "Unknown message."})
+    except asyncio.TimeoutError:
+        await websocket.close(code=1000)
+    except ValueError:
+        # The start frame was not JSON.
+        await websocket.close(code=1003)
+    except WebSocketDisconnect:
+        return
 
-        audio_b64 = maybe_build_tts_audio(response_text, lang_code)
-        return ChatResponse(
-            session_id=session_id,
-            response=response_text,
-            language=LANGUAGE_NAME_BY_CODE.get(lang_code, "English"),
-            audio_base64=audio_b64,
-            transcript=user_text,
-            transcript_translated=translated_transcript,
+
+def _run_document_job(
+    job_id: str,
+    session_id: str,
+    temp_path: str,
+    file_type: str,
+    file_name: str,
+    ocr_lang: str,
+    content_sha256: str,
+) -> None:
+    """Extract, analyze and chunk an uploaded document, recording progress on the job row."""
+    last_reported = {"progress": -1}
+
+    def report_pages(pages_done: int, page_count: int) -> None:
+        # Extraction covers 5-75%; only write when progress moves by 5 points.
+        progress = 5 + int(70 * pages_done / max(page_count, 1))
+        if progress - last_reported["progress"] >= 5 or pages_done == page_count:
+            last_reported["progress"] = progress
+            update_document_job(job_id, "processing", f"extracting page {pages_done}/{page_count}", progress)
+
+    started = time.perf_counter()
+    try:
+        update_document_job(job_id, "processing", "extracting", 5)
+        result = process_document(temp_path, file_type, ocr_lang=ocr_lang, progress_callback=report_pages)
+
+        page_metrics = result.get("page_metrics") or []
+        if page_metrics:
+            logger.info(
+                json.dumps(
+                    {
+                        "event": "document_extracted",
+                        "job_id": job_id,
+                        "file_type": file_type,
+                        "ocr_lang": ocr_lang,
+                        "pages": len(page_metrics),
+                        "ocr_pages": sum(1 for page in page_metrics if page.get("engine") == "tesseract"),
+                        "page_metrics": page_metrics,
+                    }
+                )
+            )
+
+        if not result.get("success"):
+            update_document_job(
+                job_id,
+                "failed",
+                "failed",
+                100,
+                error=result.get("error") or "Failed to process document.",
+            )
+            return
+
+        document_text = result.get("text", "")
+        update_document_job(job_id, "processing", "analyzing", 80)
+        analysis = analyze_claim_document(document_text)
+        if file_type == "pdf" and analysis["document_type"] == "bill_invoice":
+            update_document_job(job_id, "processing", "reading bill tables", 85)
+            bill = analyze_bill_tables(temp_path, document_text)
+            if bill:
+                analysis["bill"] = bill
+                logger.info(
+                    json.dumps(
+                        {
+                            "event": "bill_reconciled",
+                            "job_id": job_id,
+                            "line_items": len(bill["line_items"]),
+                            "mismatched_lines": bill["mismatched_lines"],
+                            "reconciled": bill["reconciled"],
+                            "difference": bill["difference"],
+                        }
+                    )
+                )
+        summary = get_document_summary(document_text, max_chars=300)
+
+        update_document_job(job_id, "processing", "indexing", 90)
+        document_chunks = chunk_document_text(document_text)
+        update_session_document(session_id, document_text, document_chunks, file_name, analysis.get("bill"))
+
+        if DOCUMENT_CACHE_ENABLED:
+            try:
+                store_cached_extraction(
+                    document_cache_key(content_sha256, ocr_lang, file_type),
+                    content_sha256,
+                    ocr_lang,
+                    document_text,
+                    result.get("page_texts") or [],
+                    analysis,
+                    summary,
+                    document_chunks,
+                )
+            except Exception:
+                logger.exception(json.dumps({"event": "document_cache_store_error", "job_id": job_id}))
+
+        update_document_job(
+            job_id,
+            "completed",
+            "completed",
+            100,
+            result={
+                "file_name": file_name,
+                "summary": summary,
+                "char_count": len(document_text),
+                "analysis": analysis,
+            },
         )
+        logger.info(
+            json.dumps(
+                {
+                    "event": "document_job_complete",
+                    "job_id": job_id,
+                    "char_count": len(document_text),
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                }
+            )
+        )
+    except Exception:
+        logger.exception(json.dumps({"event": "document_job_error", "job_id": job_id}))
+        try:
+            update_document_job(job_id, "failed", "failed", 100, error="Failed to process document.")
+        except Exception:
+            logger.exception(json.dumps({"event": "document_job_status_error", "job_id": job_id}))
     finally:
+        document_job_slots.release()
         try:
-            os.remove(temp_audio_path)
+            os.remove(temp_path)
         except OSError:
             pass
 
 
-@app.post("/upload")
-@app.post("/upload-document")
+@app.post("/upload", status_code=202)
+@app.post("/upload-document", status_code=202)
 def upload_document(
     req: Request,
     file: UploadFile = File(...),
@@ -1527,39 +2568,128 @@ def upload_document(
     file_type = "pdf" if extension == ".pdf" else "image"
     ocr_lang = OCR_LANG_BY_CODE.get(SUPPORTED_LANGUAGES.get(session.last_detected_language, "en"), "eng")
 
-    with tempfile.NamedTemporaryFile(delete=False, suffix=extension) as temp_file:
-        temp_file.write(file.file.read())
-        temp_path = temp_file.name
+    if not document_job_slots.acquire(blocking=False):
+        raise HTTPException(status_code=503, detail="Document processing is busy. Please retry in a minute.")
 
+    temp_path: str | None = None
+    submitted = False
     try:
-        result = process_document(temp_path, file_type, ocr_lang=ocr_lang)
-    finally:
-        try:
-            os.remove(temp_path)
-        except OSError:
-            pass
-
-    if not result.get("success"):
-        raise HTTPException(status_code=400, detail=result.get("error", "Failed to process document."))
-
-    document_text = result.get("text", "")
-    analysis = analyze_claim_document(document_text)
-    summary = get_document_summary(document_text, max_chars=300)
+        hasher = hashlib.sha256()
+        temp_path = save_upload_to_temp(
+            file,
+            extension,
+            MAX_UPLOAD_BYTES,
+            DOCUMENT_FILE_KINDS[extension],
+            hasher=hasher,
+        )
+        content_sha256 = hasher.hexdigest()
+
+        cached = None
+        if DOCUMENT_CACHE_ENABLED:
+            cached = get_cached_extraction(document_cache_key(content_sha256, ocr_lang, file_type))
+        if cached:
+            update_session_document(
+                session_id,
+                cached["document_text"],
+                cached["document_chunks"],
+                file_name,
+                (cached["analysis"] or {}).get("bill"),
+            )
+            result = {
+                "file_name": file_name,
+                "summary": cached["summary"],
+                "char_count": len(cached["document_text"]),
+                "analysis": cached["analysis"],
+                "cached": True,
+            }
+            job_id = create_document_job(session_id, file_name, result=result)
+            logger.info(
+                json.dumps(
+                    {
+                        "event": "document_cache_hit",
+                        "job_id": job_id,
+                        "content_sha256_12": content_sha256[:12],
+                        "ocr_lang": ocr_lang,
+                    }
+                )
+            )
+            return {
+                "session_id": session_id,
+                "job_id": job_id,
+                "status": "completed",
+                "status_url": f"/upload/{job_id}",
+                "events_url": f"/upload/{job_id}/events",
+                **result,
+            }
 
-    session.document_text = document_text
-    session.document_chunks = chunk_document_text(document_text)
-    session.uploaded_document = file_name
-    upsert_session_state(session_id, session)
+        job_id = create_document_job(session_id, file_name)
+        document_job_executor.submit(
+            _run_document_job,
+            job_id,
+            session_id,
+            temp_path,
+            file_type,
+            file_name,
+            ocr_lang,
+            content_sha256,
+        )
+        submitted = True
+    finally:
+        # Once submitted, the job owns the slot and the temp file.
+        if not submitted:
+            document_job_slots.release()
+            if temp_path:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
 
     return {
         "session_id": session_id,
+        "job_id": job_id,
         "file_name": file_name,
-        "summary": summary,
-        "char_count": len(document_text),
-        "analysis": analysis,
+        "status": "queued",
+        "status_url": f"/upload/{job_id}",
+        "events_url": f"/upload/{job_id}/events",
     }
 
 
+@app.get("/upload/{job_id}")
+def upload_status(job_id: str) -> dict[str, Any]:
+    job = get_document_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Upload job not found")
+    return job
+
+
+@app.get("/upload/{job_id}/events")
+async def upload_events(job_id: str, req: Request) -> StreamingResponse:
+    job = await run_in_threadpool(get_document_job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Upload job not found")
+
+    async def event_stream():
+        current = job
+        last_sent: tuple[str, str, int] | None = None
+        while True:
+            state = (current["status"], current["stage"], current["progress"])
+            if state != last_sent:
+                last_sent = state
+                yield f"event: progress\ndata: {json.dumps(current)}\n\n"
+            if current["status"] in DOCUMENT_JOB_TERMINAL_STATUSES or await req.is_disconnected():
+                return
+            await asyncio.sleep(UPLOAD_EVENTS_POLL_SECONDS)
+            current = await run_in_threadpool(get_document_job, job_id)
+            if current is None:
+                return
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/history/{session_id}")
 def history(session_id: str) -> dict[str, Any]:
     session = get_session_state(session_id)
@@ -1570,4 +2700,5 @@ def history(session_id: str) -> dict[str, Any]:
         "messages": session.messages,
         "last_detected_language": session.last_detected_language,
         "uploaded_document": session.uploaded_document,
+        "pending_document": session.pending_document,
     }
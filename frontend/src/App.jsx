@@ -16,6 +16,7 @@ import {
   deleteSession,
   sendChatMessage, 
   sendVoiceAudio, 
+  resolveAudioUrl,
   uploadDocument,
   signup,
   login,
@@ -42,15 +43,6 @@ function generateLocalSessionId() {
   return `${Date.now()}-${Math.floor(Math.random() * 100000)}`;
 }
 
-function makeAudioBlob(base64Data) {
-  const binary = atob(base64Data);
-  const bytes = new Uint8Array(binary.length);
-  for (let i = 0; i < binary.length; i += 1) {
-    bytes[i] = binary.charCodeAt(i);
-  }
-  return new Blob([bytes], { type: 'audio/mpeg' });
-}
-
 // Helper function to convert base64 to Blob
 function base64ToBlob(base64, mimeType) {
   const binary = atob(base64);
@@ -476,10 +468,9 @@ function App() {
           activeAudioRef.current = null;
         }
 
-        if (data.audio_base64) {
-          const audioResponseBlob = makeAudioBlob(data.audio_base64);
-          const audioUrl = URL.createObjectURL(audioResponseBlob);
-          const audio = new Audio(audioUrl);
+        if (data.audio_url) {
+          // The server streams the reply while it is still being synthesized.
+          const audio = new Audio(resolveAudioUrl(data.audio_url));
           activeAudioRef.current = audio;
 
           audio.onplay = () => {
@@ -487,12 +478,10 @@ function App() {
             setIsSpeaking(true);
           };
           audio.onended = () => {
-            URL.revokeObjectURL(audioUrl);
             setIsSpeaking(false);
             activeAudioRef.current = null;
           };
           audio.onerror = () => {
-            URL.revokeObjectURL(audioUrl);
             setIsSpeaking(false);
             activeAudioRef.current = null;
             console.warn('[TTS] Backend audio playback failed, falling back to browser TTS');
@@ -500,7 +489,6 @@ function App() {
           };
 
           audio.play().catch(() => {
-            URL.revokeObjectURL(audioUrl);
             setIsSpeaking(false);
             activeAudioRef.current = null;
             console.warn('[TTS] Backend audio play() rejected, falling back to browser TTS');
@@ -653,13 +641,12 @@ function App() {
         return nextMessages;
       });
 
-      if (data.audio_base64) {
-        const audioResponseBlob = makeAudioBlob(data.audio_base64);
-        const audioUrl = URL.createObjectURL(audioResponseBlob);
-        const audio = new Audio(audioUrl);
+      if (data.audio_url) {
+        const audio = new Audio(resolveAudioUrl(data.audio_url));
         activeAudioRef.current = audio;
-        audio.onended = () => URL.revokeObjectURL(audioUrl);
-        audio.play().catch(() => URL.revokeObjectURL(audioUrl));
+        audio.play().catch(() => {
+          activeAudioRef.current = null;
+        });
       } else if (window.speechSynthesis) {
         const utterance = new SpeechSynthesisUtterance(data.response);
         utterance.lang = getSpeechLocaleFromLabel(data.language);
@@ -108,6 +108,89 @@ export async function uploadDocument(formData, options = {}) {
     throw new Error(errorData.detail || 'Upload failed');
   }
 
+  const job = await response.json();
+  // Repeat uploads are served from the extraction cache and come back already completed.
+  if (!job.job_id || job.status === 'completed') {
+    return job;
+  }
+
+  const result = await waitForUploadJob(job.job_id, options);
+  return { ...result, session_id: job.session_id };
+}
+
+export async function getUploadStatus(jobId, options = {}) {
+  let response;
+  try {
+    response = await fetch(`${API_BASE_URL}/upload/${encodeURIComponent(jobId)}`, {
+      signal: options.signal,
+    });
+  } catch (err) {
+    if (err?.name === 'AbortError') {
+      throw err;
+    }
+    asUserFriendlyNetworkError(err, 'Failed to check upload status');
+  }
+
+  if (!response.ok) {
+    const errorData = await response.json().catch(() => ({ detail: 'Failed to check upload status' }));
+    throw new Error(errorData.detail || 'Failed to check upload status');
+  }
+
+  return response.json();
+}
+
+export async function waitForUploadJob(jobId, options = {}) {
+  const intervalMs = options.pollIntervalMs || 1000;
+
+  // Processing runs in the background on the server; poll until it finishes.
+  for (;;) {
+    const job = await getUploadStatus(jobId, options);
+    if (options.onProgress) {
+      options.onProgress(job);
+    }
+    if (job.status === 'completed') {
+      return job;
+    }
+    if (job.status === 'failed') {
+      throw new Error(job.error || 'Document processing failed');
+    }
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    if (options.signal?.aborted) {
+      throw new DOMException('Upload status polling aborted', 'AbortError');
+    }
+  }
+}
+
+// Reply audio is served from a short-lived /audio/{id} URL returned with chat and voice responses.
+export function resolveAudioUrl(audioPath) {
+  if (!audioPath) {
+    return null;
+  }
+  return /^https?:\/\//.test(audioPath) ? audioPath : `${API_BASE_URL}${audioPath}`;
+}
+
+// Pass an AbortSignal from slider handlers so a newer position cancels the in-flight request.
+export async function getSavingsScenarios(payload, options = {}) {
+  let response;
+  try {
+    response = await fetch(`${API_BASE_URL}/savings/scenarios`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(payload),
+      signal: options.signal,
+    });
+  } catch (err) {
+    if (err?.name === 'AbortError') {
+      throw err;
+    }
+    asUserFriendlyNetworkError(err, 'Savings calculation failed');
+  }
+
+  if (!response.ok) {
+    const errorData = await response.json().catch(() => ({ detail: 'Savings calculation failed' }));
+    throw new Error(errorData.detail || 'Savings calculation failed');
+  }
+
   return response.json();
 }
 
@@ -20,6 +20,8 @@ from llm.gemini_client import (
     _map_api_error,
     client,
 )
+from llm.intent_model import predict_intent
+from utils.keyword_matcher import KEYWORD_ENGINE, MATCH_PREFIX, scan_query
 
 logger = logging.getLogger("claimflow.finance")
 
@@ -92,26 +94,49 @@ class FinanceIntentAnalyzer:
         "buy or sell", "can i invest", "best option",
     }
 
+    # Insurance stems in native scripts (te, hi, ta, kn) for messages the
+    # ASCII keyword rules cannot parse.
+    NATIVE_INSURANCE_HINTS = {"భీమ", "इंश्य", "காப்பீ", "ವಿಮೆ"}
+
+    EMPTY_QUERY_QUESTION = (
+        "Please share your finance question in one sentence. "
+        "For example, budgeting, investing, stock market, or risk analysis."
+    )
+    OUT_OF_DOMAIN_QUESTION = (
+        "I can help with finance topics only. "
+        "Do you want help with budgeting, investing, stock market, risk analysis, "
+        "or financial planning?"
+    )
+    GOAL_QUESTION = (
+        "Could you clarify your goal and time horizon? "
+        "For example: monthly budget target, investment amount, and risk comfort."
+    )
+
     @classmethod
     def analyze(cls, user_input: str) -> IntentResult:
         text = (user_input or "").strip().lower()
         clean = re.sub(r"[^a-z0-9\s]", " ", text)
         clean = re.sub(r"\s+", " ", clean).strip()
-        words = set(clean.split())
 
-        has_non_latin = any(ord(ch) > 127 for ch in text)
+        has_non_latin = not text.isascii()
+        hits = scan_query(user_input or "")
+        # A confident model prediction replaces the keyword scores; "general" leaves them in charge.
+        prediction = predict_intent("finance_intent", user_input or "", labels=cls.INTENT_KEYWORDS)
 
         if not clean:
             # Avoid forcing clarification when keyword rules cannot parse the message
             # (for example native scripts or encoding-mangled input from clients).
             if text:
                 intent_name = "personal_finance"
-                if has_non_latin and ("భీమ" in text or "इंश्य" in text or "காப்பீ" in text or "ವಿಮೆ" in text):
+                confidence = 0.35
+                if prediction:
+                    intent_name, confidence = prediction.label, prediction.confidence
+                elif has_non_latin and hits.any("finance_hints.native_insurance"):
                     intent_name = "financial_planning"
 
                 return IntentResult(
                     intent=intent_name,
-                    confidence=0.35,
+                    confidence=confidence,
                     needs_clarification=False,
                     clarification_question="",
                     risk_sensitive=False,
@@ -122,60 +147,39 @@ class FinanceIntentAnalyzer:
                 intent="clarification",
                 confidence=0.0,
                 needs_clarification=True,
-                clarification_question=(
-                    "Please share your finance question in one sentence. "
-                    "For example, budgeting, investing, stock market, or risk analysis."
-                ),
+                clarification_question=cls.EMPTY_QUERY_QUESTION,
                 risk_sensitive=False,
                 in_domain=True,
             )
 
-        scores: dict[str, float] = {}
-        for intent, keywords in cls.INTENT_KEYWORDS.items():
-            score = 0.0
-            for keyword in keywords:
-                k = keyword.lower()
-                if " " in k:
-                    if k in clean:
-                        score += 1.0
-                else:
-                    if k in words:
-                        score += 1.0
-                    elif k in clean:
-                        score += 0.6
-            scores[intent] = score
-
+        # Whole words and phrases count 1.0, a word inside a longer one 0.6.
+        scores = {intent: hits.weighted_score(f"finance_intent.{intent}") for intent in cls.INTENT_KEYWORDS}
         best_intent = max(scores, key=scores.get)
         best_score = scores[best_intent]
         total_keywords = max(len(cls.INTENT_KEYWORDS.get(best_intent, [])), 1)
         confidence = min(best_score / max(total_keywords * 0.35, 1), 1.0)
+        if prediction:
+            best_intent, confidence = prediction.label, prediction.confidence
 
-        domain_overlap = sum(1 for hint in cls.DOMAIN_HINTS if hint in clean)
+        domain_overlap = hits.count("finance_hints.domain", MATCH_PREFIX)
         in_domain = domain_overlap > 0 or confidence >= 0.2
 
         risk_sensitive = best_intent in {"investing", "stock_market", "risk_analysis"}
-        if any(hint in clean for hint in cls.RISKY_HINTS):
+        if hits.any("finance_hints.risky", MATCH_PREFIX):
             risk_sensitive = True
 
         needs_clarification = False
         clarification_question = ""
         short_query = len(clean.split()) <= 3
 
-        is_advice_query = any(hint in clean for hint in cls.ADVICE_HINTS) or risk_sensitive
+        is_advice_query = hits.any("finance_hints.advice", MATCH_PREFIX) or risk_sensitive
 
         if not in_domain and is_advice_query:
             needs_clarification = True
-            clarification_question = (
-                "I can help with finance topics only. "
-                "Do you want help with budgeting, investing, stock market, risk analysis, "
-                "or financial planning?"
-            )
+            clarification_question = cls.OUT_OF_DOMAIN_QUESTION
         elif is_advice_query and short_query and confidence < 0.15 and domain_overlap == 0:
             needs_clarification = True
-            clarification_question = (
-                "Could you clarify your goal and time horizon? "
-                "For example: monthly budget target, investment amount, and risk comfort."
-            )
+            clarification_question = cls.GOAL_QUESTION
 
         return IntentResult(
             intent=best_intent,
@@ -187,6 +191,15 @@ class FinanceIntentAnalyzer:
         )
 
 
+KEYWORD_ENGINE.register("finance_intent", FinanceIntentAnalyzer.INTENT_KEYWORDS)
+KEYWORD_ENGINE.register("finance_hints", {
+    "domain": FinanceIntentAnalyzer.DOMAIN_HINTS,
+    "risky": FinanceIntentAnalyzer.RISKY_HINTS,
+    "advice": FinanceIntentAnalyzer.ADVICE_HINTS,
+    "native_insurance": FinanceIntentAnalyzer.NATIVE_INSURANCE_HINTS,
+})
+
+
 class FinancePromptBuilder:
     """Build deterministic, structured prompts for finance guidance."""
 
@@ -427,74 +440,106 @@ def _is_service_error_text(text: str) -> bool:
     )
 
 
+_FINANCE_FALLBACK_RESPONSES = {
+    "en": {
+        "general": (
+            "I can still help while AI service is busy. "
+            "Share your income, expenses, goal, and timeline, and I will provide a practical finance plan."
+        ),
+        "budgeting": (
+            "For budgeting, start with this rule: essentials 50%, goals 30%, savings 20%. "
+            "Track all spending weekly and adjust categories that exceed limits."
+        ),
+        "investing": (
+            "For investing, begin with diversification and small monthly contributions. "
+            "Choose instruments based on risk tolerance, timeline, and emergency fund readiness."
+        ),
+        "stock_market": (
+            "For stock market decisions, avoid guaranteed-return thinking. "
+            "Use diversified exposure, defined risk limits, and long-term horizon before increasing allocation."
+        ),
+        "risk_analysis": (
+            "For risk analysis, first define maximum acceptable loss and investment horizon. "
+            "Then spread allocation across asset classes to reduce concentration risk."
+        ),
+        "financial_planning": (
+            "For financial planning, define goals by time horizon: short, medium, and long term. "
+            "Map monthly savings to each goal and review progress monthly."
+        ),
+    },
+    "hi": {
+        "general": "AI सेवा अभी व्यस्त है। आप आय, खर्च, लक्ष्य और समय अवधि बताइए, मैं व्यावहारिक वित्त योजना दूंगा।",
+        "budgeting": "बजट के लिए 50-30-20 नियम से शुरू करें। खर्च साप्ताहिक ट्रैक करें और लिमिट से ऊपर जाने वाली श्रेणियां तुरंत कम करें।",
+        "investing": "निवेश में विविधीकरण और छोटे मासिक निवेश से शुरू करें। जोखिम क्षमता और समय अवधि के आधार पर विकल्प चुनें।",
+        "stock_market": "शेयर बाजार में गारंटीड रिटर्न सोच से बचें। लंबी अवधि और स्पष्ट जोखिम सीमा के साथ निवेश करें।",
+        "risk_analysis": "रिस्क विश्लेषण में पहले अधिकतम नुकसान सीमा तय करें। फिर अलग-अलग एसेट क्लास में निवेश बांटें।",
+        "financial_planning": "वित्तीय योजना के लिए लक्ष्यों को समय अवधि के अनुसार बांटें और हर महीने प्रगति की समीक्षा करें।",
+    },
+    "te": {
+        "general": "AI సేవ ప్రస్తుతం బిజీగా ఉంది. మీ ఆదాయం, ఖర్చులు, లక్ష్యం, కాలవ్యవధి చెప్తే నేను ప్రాక్టికల్ ఫైనాన్స్ ప్లాన్ ఇస్తాను.",
+        "budgeting": "బడ్జెట్ కోసం 50-30-20 విధానంతో ప్రారంభించండి. ప్రతి వారం ఖర్చులను ట్రాక్ చేసి, ఎక్కువైన ఖర్చులను తగ్గించండి.",
+        "investing": "ఇన్వెస్టింగ్‌ను చిన్న నెలసరి మొత్తాలతో, డైవర్సిఫికేషన్‌తో ప్రారంభించండి. రిస్క్ సామర్థ్యం మరియు టైమ్ హరైజన్ ఆధారంగా ఎంపిక చేయండి.",
+        "stock_market": "స్టాక్ మార్కెట్‌లో గ్యారంటీ రిటర్న్స్ అనుకోవద్దు. దీర్ఘకాల దృష్టి మరియు స్పష్టమైన రిస్క్ లిమిట్స్‌తో ముందుకు వెళ్లండి.",
+        "risk_analysis": "రిస్క్ విశ్లేషణలో ముందుగా అంగీకరించే గరిష్ట నష్టాన్ని నిర్ణయించండి. తర్వాత పెట్టుబడిని విభిన్న ఆస్తుల్లో విభజించండి.",
+        "financial_planning": "ఫైనాన్షియల్ ప్లానింగ్ కోసం లక్ష్యాలను కాలవ్యవధి ప్రకారం విభజించి, ప్రతి నెల ప్రోగ్రెస్‌ను సమీక్షించండి.",
+    },
+    "ta": {
+        "general": "AI சேவை இப்போது பிஸியாக உள்ளது. உங்கள் வருமானம், செலவு, இலக்கு, காலவரை சொன்னால் நான் நடைமுறை நிதி திட்டம் தருகிறேன்.",
+        "budgeting": "பட்ஜெட்டுக்கு 50-30-20 முறையில் தொடங்குங்கள். வாரந்தோறும் செலவை கண்காணித்து, அதிகமாகும் பிரிவுகளை குறையுங்கள்.",
+        "investing": "மாதாந்திர சிறு முதலீடு மற்றும் பரவலாக்கத்துடன் தொடங்குங்கள். உங்கள் அபாய சகிப்பு மற்றும் காலவரைக்கு ஏற்ற கருவிகளைத் தேர்வுசெய்யுங்கள்.",
+        "stock_market": "பங்குச் சந்தையில் உறுதியான வருமானம் என்ற எண்ணத்தை தவிர்க்கவும். நீண்டகால நோக்கு மற்றும் தெளிவான அபாய வரம்புடன் செல்லுங்கள்.",
+        "risk_analysis": "அபாய மதிப்பீட்டில் முதலில் ஏற்கக்கூடிய அதிகபட்ச இழப்பை நிர்ணயிக்கவும். பின்னர் முதலீட்டை பல சொத்து வகைகளில் பகிரவும்.",
+        "financial_planning": "நிதித் திட்டத்தில் இலக்குகளை காலவரையின்படி பிரித்து, மாதந்தோறும் முன்னேற்றத்தை மதிப்பாய்வு செய்யுங்கள்.",
+    },
+    "kn": {
+        "general": "AI ಸೇವೆ ಈಗ ಬ್ಯುಸಿ ಇದೆ. ನಿಮ್ಮ ಆದಾಯ, ಖರ್ಚು, ಗುರಿ ಮತ್ತು ಅವಧಿ ಹೇಳಿದರೆ ನಾನು ಪ್ರಾಯೋಗಿಕ ಹಣಕಾಸು ಯೋಜನೆ ನೀಡುತ್ತೇನೆ.",
+        "budgeting": "ಬಜೆಟ್‌ಗೆ 50-30-20 ವಿಧಾನದಿಂದ ಪ್ರಾರಂಭಿಸಿ. ವಾರವಾರ ಖರ್ಚು ಟ್ರ್ಯಾಕ್ ಮಾಡಿ, ಮಿತಿಯನ್ನು ಮೀರಿದ ಖರ್ಚುಗಳನ್ನು ಕಡಿತಗೊಳಿಸಿ.",
+        "investing": "ಸಣ್ಣ ಮಾಸಿಕ ಹೂಡಿಕೆ ಮತ್ತು ವಿಭಜನೆಯಿಂದ ಆರಂಭಿಸಿ. ನಿಮ್ಮ ಅಪಾಯ ಸಾಮರ್ಥ್ಯ ಮತ್ತು ಅವಧಿಗೆ ತಕ್ಕ ಆಯ್ಕೆಯನ್ನು ಮಾಡಿ.",
+        "stock_market": "ಶೇರು ಮಾರುಕಟ್ಟೆಯಲ್ಲಿ ಖಚಿತ ಲಾಭದ ನಿರೀಕ್ಷೆ ಬೇಡ. ದೀರ್ಘಾವಧಿ ದೃಷ್ಟಿ ಮತ್ತು ಸ್ಪಷ್ಟ ಅಪಾಯ ಮಿತಿಗಳೊಂದಿಗೆ ಹೂಡಿಕೆ ಮಾಡಿ.",
+        "risk_analysis": "ಅಪಾಯ ವಿಶ್ಲೇಷಣೆಯಲ್ಲಿ ಮೊದಲು ಗರಿಷ್ಠ ಒಪ್ಪಬಹುದಾದ ನಷ್ಟವನ್ನು ನಿಗದಿಪಡಿ. ನಂತರ ಹೂಡಿಕೆಯನ್ನು ವಿವಿಧ ಆಸ್ತಿ ವರ್ಗಗಳಿಗೆ ಹಂಚಿ.",
+        "financial_planning": "ಹಣಕಾಸು ಯೋಜನೆಗಾಗಿ ಗುರಿಗಳನ್ನು ಅವಧಿ ಆಧಾರದ ಮೇಲೆ ವಿಭಾಗಿಸಿ, ಪ್ರತಿಮಾಸ ಪ್ರಗತಿಯನ್ನು ಪರಿಶೀಲಿಸಿ.",
+    },
+}
+
+
 def _finance_fallback_response(intent: IntentResult, language_name: str) -> str:
     code = LANGUAGE_FALLBACK_CODE.get((language_name or "").strip().lower(), "en")
 
-    responses = {
-        "en": {
-            "general": (
-                "I can still help while AI service is busy. "
-                "Share your income, expenses, goal, and timeline, and I will provide a practical finance plan."
-            ),
-            "budgeting": (
-                "For budgeting, start with this rule: essentials 50%, goals 30%, savings 20%. "
-                "Track all spending weekly and adjust categories that exceed limits."
-            ),
-            "investing": (
-                "For investing, begin with diversification and small monthly contributions. "
-                "Choose instruments based on risk tolerance, timeline, and emergency fund readiness."
-            ),
-            "stock_market": (
-                "For stock market decisions, avoid guaranteed-return thinking. "
-                "Use diversified exposure, defined risk limits, and long-term horizon before increasing allocation."
-            ),
-            "risk_analysis": (
-                "For risk analysis, first define maximum acceptable loss and investment horizon. "
-                "Then spread allocation across asset classes to reduce concentration risk."
-            ),
-            "financial_planning": (
-                "For financial planning, define goals by time horizon: short, medium, and long term. "
-                "Map monthly savings to each goal and review progress monthly."
-            ),
-        },
-        "hi": {
-            "general": "AI सेवा अभी व्यस्त है। आप आय, खर्च, लक्ष्य और समय अवधि बताइए, मैं व्यावहारिक वित्त योजना दूंगा।",
-            "budgeting": "बजट के लिए 50-30-20 नियम से शुरू करें। खर्च साप्ताहिक ट्रैक करें और लिमिट से ऊपर जाने वाली श्रेणियां तुरंत कम करें।",
-            "investing": "निवेश में विविधीकरण और छोटे मासिक निवेश से शुरू करें। जोखिम क्षमता और समय अवधि के आधार पर विकल्प चुनें।",
-            "stock_market": "शेयर बाजार में गारंटीड रिटर्न सोच से बचें। लंबी अवधि और स्पष्ट जोखिम सीमा के साथ निवेश करें।",
-            "risk_analysis": "रिस्क विश्लेषण में पहले अधिकतम नुकसान सीमा तय करें। फिर अलग-अलग एसेट क्लास में निवेश बांटें।",
-            "financial_planning": "वित्तीय योजना के लिए लक्ष्यों को समय अवधि के अनुसार बांटें और हर महीने प्रगति की समीक्षा करें।",
-        },
-        "te": {
-            "general": "AI సేవ ప్రస్తుతం బిజీగా ఉంది. మీ ఆదాయం, ఖర్చులు, లక్ష్యం, కాలవ్యవధి చెప్తే నేను ప్రాక్టికల్ ఫైనాన్స్ ప్లాన్ ఇస్తాను.",
-            "budgeting": "బడ్జెట్ కోసం 50-30-20 విధానంతో ప్రారంభించండి. ప్రతి వారం ఖర్చులను ట్రాక్ చేసి, ఎక్కువైన ఖర్చులను తగ్గించండి.",
-            "investing": "ఇన్వెస్టింగ్‌ను చిన్న నెలసరి మొత్తాలతో, డైవర్సిఫికేషన్‌తో ప్రారంభించండి. రిస్క్ సామర్థ్యం మరియు టైమ్ హరైజన్ ఆధారంగా ఎంపిక చేయండి.",
-            "stock_market": "స్టాక్ మార్కెట్‌లో గ్యారంటీ రిటర్న్స్ అనుకోవద్దు. దీర్ఘకాల దృష్టి మరియు స్పష్టమైన రిస్క్ లిమిట్స్‌తో ముందుకు వెళ్లండి.",
-            "risk_analysis": "రిస్క్ విశ్లేషణలో ముందుగా అంగీకరించే గరిష్ట నష్టాన్ని నిర్ణయించండి. తర్వాత పెట్టుబడిని విభిన్న ఆస్తుల్లో విభజించండి.",
-            "financial_planning": "ఫైనాన్షియల్ ప్లానింగ్ కోసం లక్ష్యాలను కాలవ్యవధి ప్రకారం విభజించి, ప్రతి నెల ప్రోగ్రెస్‌ను సమీక్షించండి.",
-        },
-        "ta": {
-            "general": "AI சேவை இப்போது பிஸியாக உள்ளது. உங்கள் வருமானம், செலவு, இலக்கு, காலவரை சொன்னால் நான் நடைமுறை நிதி திட்டம் தருகிறேன்.",
-            "budgeting": "பட்ஜெட்டுக்கு 50-30-20 முறையில் தொடங்குங்கள். வாரந்தோறும் செலவை கண்காணித்து, அதிகமாகும் பிரிவுகளை குறையுங்கள்.",
-            "investing": "மாதாந்திர சிறு முதலீடு மற்றும் பரவலாக்கத்துடன் தொடங்குங்கள். உங்கள் அபாய சகிப்பு மற்றும் காலவரைக்கு ஏற்ற கருவிகளைத் தேர்வுசெய்யுங்கள்.",
-            "stock_market": "பங்குச் சந்தையில் உறுதியான வருமானம் என்ற எண்ணத்தை தவிர்க்கவும். நீண்டகால நோக்கு மற்றும் தெளிவான அபாய வரம்புடன் செல்லுங்கள்.",
-            "risk_analysis": "அபாய மதிப்பீட்டில் முதலில் ஏற்கக்கூடிய அதிகபட்ச இழப்பை நிர்ணயிக்கவும். பின்னர் முதலீட்டை பல சொத்து வகைகளில் பகிரவும்.",
-            "financial_planning": "நிதித் திட்டத்தில் இலக்குகளை காலவரையின்படி பிரித்து, மாதந்தோறும் முன்னேற்றத்தை மதிப்பாய்வு செய்யுங்கள்.",
-        },
-        "kn": {
-            "general": "AI ಸೇವೆ ಈಗ ಬ್ಯುಸಿ ಇದೆ. ನಿಮ್ಮ ಆದಾಯ, ಖರ್ಚು, ಗುರಿ ಮತ್ತು ಅವಧಿ ಹೇಳಿದರೆ ನಾನು ಪ್ರಾಯೋಗಿಕ ಹಣಕಾಸು ಯೋಜನೆ ನೀಡುತ್ತೇನೆ.",
-            "budgeting": "ಬಜೆಟ್‌ಗೆ 50-30-20 ವಿಧಾನದಿಂದ ಪ್ರಾರಂಭಿಸಿ. ವಾರವಾರ ಖರ್ಚು ಟ್ರ್ಯಾಕ್ ಮಾಡಿ, ಮಿತಿಯನ್ನು ಮೀರಿದ ಖರ್ಚುಗಳನ್ನು ಕಡಿತಗೊಳಿಸಿ.",
-            "investing": "ಸಣ್ಣ ಮಾಸಿಕ ಹೂಡಿಕೆ ಮತ್ತು ವಿಭಜನೆಯಿಂದ ಆರಂಭಿಸಿ. ನಿಮ್ಮ ಅಪಾಯ ಸಾಮರ್ಥ್ಯ ಮತ್ತು ಅವಧಿಗೆ ತಕ್ಕ ಆಯ್ಕೆಯನ್ನು ಮಾಡಿ.",
-            "stock_market": "ಶೇರು ಮಾರುಕಟ್ಟೆಯಲ್ಲಿ ಖಚಿತ ಲಾಭದ ನಿರೀಕ್ಷೆ ಬೇಡ. ದೀರ್ಘಾವಧಿ ದೃಷ್ಟಿ ಮತ್ತು ಸ್ಪಷ್ಟ ಅಪಾಯ ಮಿತಿಗಳೊಂದಿಗೆ ಹೂಡಿಕೆ ಮಾಡಿ.",
-            "risk_analysis": "ಅಪಾಯ ವಿಶ್ಲೇಷಣೆಯಲ್ಲಿ ಮೊದಲು ಗರಿಷ್ಠ ಒಪ್ಪಬಹುದಾದ ನಷ್ಟವನ್ನು ನಿಗದಿಪಡಿ. ನಂತರ ಹೂಡಿಕೆಯನ್ನು ವಿವಿಧ ಆಸ್ತಿ ವರ್ಗಗಳಿಗೆ ಹಂಚಿ.",
-            "financial_planning": "ಹಣಕಾಸು ಯೋಜನೆಗಾಗಿ ಗುರಿಗಳನ್ನು ಅವಧಿ ಆಧಾರದ ಮೇಲೆ ವಿಭಾಗಿಸಿ, ಪ್ರತಿಮಾಸ ಪ್ರಗತಿಯನ್ನು ಪರಿಶೀಲಿಸಿ.",
-        },
-    }
-
-    lang_pack = responses.get(code, responses["en"])
+    lang_pack = _FINANCE_FALLBACK_RESPONSES.get(code, _FINANCE_FALLBACK_RESPONSES["en"])
     return lang_pack.get(intent.intent, lang_pack["general"])
 
 
+def _clarification_response(question: str) -> str:
+    return (
+        "Summary\n"
+        "I need one more detail before giving a precise finance answer.\n\n"
+        "Explanation\n"
+        f"{question}\n\n"
+        "Actionable Steps\n"
+        "1. Share your goal.\n"
+        "2. Share your time horizon.\n"
+        "3. Share your risk comfort level.\n\n"
+        "Example\n"
+        "Goal: Build an emergency fund in 6 months with low risk."
+    )
+
+
+def canned_finance_responses() -> list[tuple[str, str]]:
+    """Fixed (text, language code) replies of the finance assistant: fallbacks and clarification prompts."""
+    items = [
+        (text, code)
+        for code, lang_pack in _FINANCE_FALLBACK_RESPONSES.items()
+        for text in lang_pack.values()
+    ]
+    for question in (
+        FinanceIntentAnalyzer.EMPTY_QUERY_QUESTION,
+        FinanceIntentAnalyzer.OUT_OF_DOMAIN_QUESTION,
+        FinanceIntentAnalyzer.GOAL_QUESTION,
+    ):
+        items.append((_clarification_response(question), "en"))
+    return items
+
+
 def generate_finance_response(
     user_input: str,
     conversation_history: list[dict[str, str]],
@@ -518,26 +563,15 @@ def generate_finance_response(
     )
 
     if intent.needs_clarification:
-        clarification = (
-            "Summary\n"
-            "I need one more detail before giving a precise finance answer.\n\n"
-            "Explanation\n"
-            f"{intent.clarification_question}\n\n"
-            "Actionable Steps\n"
-            "1. Share your goal.\n"
-            "2. Share your time horizon.\n"
-            "3. Share your risk comfort level.\n\n"
-            "Example\n"
-            "Goal: Build an emergency fund in 6 months with low risk."
-        )
-        return clarification, intent
+        return _clarification_response(intent.clarification_question), intent
 
     context = ""
     try:
         # Lazy import keeps deployment resilient when optional RAG deps are unavailable.
         from rag.retriever import retrieve_context
 
-        context = retrieve_context(user_input, k=4, lang="all")
+        retrieval_lang = LANGUAGE_FALLBACK_CODE.get((language_name or "").strip().lower(), "all")
+        context = retrieve_context(user_input, k=4, lang=retrieval_lang)
     except ImportError as exc:
         logger.warning("finance_context_retrieval_unavailable: %s", str(exc)[:300])
         context = ""
@@ -18,6 +18,9 @@ import time
 from dotenv import load_dotenv
 from google import genai
 
+from llm.guardrails import GUARDRAILS, scan_guardrails
+from utils.keyword_matcher import KEYWORD_ENGINE, MATCH_PREFIX
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -150,6 +153,8 @@ INJECTION_PATTERNS = [
     r"act\s+as\s+(a\s+)?claims\s+officer",
 ]
 
+GUARDRAILS.register({"restricted": RESTRICTED_PATTERNS, "injection": INJECTION_PATTERNS})
+
 INSURANCE_HINTS = [
     "insurance",
     "insur",
@@ -181,28 +186,29 @@ INSURANCE_TYPE_KEYWORDS = {
     "travel": ["travel", "trip", "flight", "baggage", "visa"],
 }
 
+KEYWORD_ENGINE.register("insurance_hints", {"any": INSURANCE_HINTS})
+KEYWORD_ENGINE.register("insurance_type", INSURANCE_TYPE_KEYWORDS)
+
 
 def _is_restricted_request(query: str) -> bool:
-    query_lower = query.lower()
-    return any(re.search(pattern, query_lower) for pattern in RESTRICTED_PATTERNS)
+    return any(violation.category == "restricted" for violation in scan_guardrails(query))
 
 
 def _sanitize_query(query: str) -> str:
-    sanitized = query
-    for pattern in INJECTION_PATTERNS:
-        sanitized = re.sub(pattern, "", sanitized, flags=re.IGNORECASE)
-    return sanitized.strip()
+    if not any(violation.category == "injection" for violation in scan_guardrails(query)):
+        return query.strip()
+    return GUARDRAILS.remove(query, "injection").strip()
 
 
 def _is_insurance_related(query: str, context: str) -> bool:
-    text = f"{query} {context}".lower()
-    return any(hint in text for hint in INSURANCE_HINTS)
+    hits = KEYWORD_ENGINE.scan(f"{query} {context}")
+    return hits.any("insurance_hints.any", MATCH_PREFIX)
 
 
 def _infer_insurance_type(query: str, context: str) -> str:
-    text = f"{query} {context}".lower()
-    for insurance_type, keywords in INSURANCE_TYPE_KEYWORDS.items():
-        if any(keyword in text for keyword in keywords):
+    hits = KEYWORD_ENGINE.scan(f"{query} {context}")
+    for insurance_type in INSURANCE_TYPE_KEYWORDS:
+        if hits.any(f"insurance_type.{insurance_type}", MATCH_PREFIX):
             return insurance_type
     return ""
 
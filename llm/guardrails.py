@@ -0,0 +1,200 @@
+"""
+Guardrail pattern engine.
+Every safety pattern (SafetyFilter's prohibited categories, gemini_client's
+restricted and prompt-injection lists, and the Hindi/Telugu/Tamil/Kannada
+packs in llm/guardrail_patterns/) is compiled into one case-insensitive
+alternation with a named group per category, so a query is scanned once.
+
+google-re2 is used when installed (GUARDRAIL_REGEX_ENGINE=auto|re2|re): it
+matches in linear time, so crafted input cannot trigger catastrophic
+backtracking in patterns like `approve\\s+.*\\bclaim`. Patterns therefore
+stick to the RE2 subset (no lookarounds or backreferences); if they do not
+compile there the engine logs a warning and uses Python's re.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+logger = logging.getLogger(__name__)
+
+GUARDRAIL_REGEX_ENGINE = os.getenv("GUARDRAIL_REGEX_ENGINE", "auto").strip().lower()
+GUARDRAIL_LANGUAGES = [
+    code.strip().lower()
+    for code in os.getenv("GUARDRAIL_LANGUAGES", "hi,te,ta,kn").split(",")
+    if code.strip()
+]
+GUARDRAIL_PATTERN_DIR = os.getenv(
+    "GUARDRAIL_PATTERN_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "guardrail_patterns")
+)
+
+
+class Violation(NamedTuple):
+    category: str
+    start: int
+    end: int
+    text: str
+
+
+def load_pattern_pack(path: str) -> Dict[str, List[str]]:
+    """
+    Read one language pack: {"language": ..., "patterns": {category: [regex, ...]}}.
+
+    Returns:
+        {category: [regex, ...]}, or {} when the file is missing or malformed
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as pack_file:
+            patterns = json.load(pack_file).get("patterns") or {}
+    except (OSError, ValueError, AttributeError) as e:
+        logger.warning(f"Guardrail pattern pack not loaded ({path}): {e}")
+        return {}
+    return {category: [p for p in items if isinstance(p, str) and p] for category, items in patterns.items()}
+
+
+class _CompiledGuardrails(NamedTuple):
+    combined: object
+    # Only the patterns written in ASCII; used for ASCII-only text, which the
+    # language-pack patterns cannot match.
+    combined_ascii: object
+    by_category: Dict[str, object]
+    backend: str
+
+
+class GuardrailEngine:
+    """
+    Pattern lists registered per category, scanned as one alternation.
+
+    Args:
+        pattern_dir: Directory holding <language>.json pattern packs
+        languages: Language packs to merge into the registered categories
+        regex_engine: "auto" (RE2 when installed), "re2" or "re"
+    """
+
+    def __init__(self, pattern_dir: str, languages: Iterable[str], regex_engine: str = "auto"):
+        self.pattern_dir = pattern_dir
+        self.languages = list(languages)
+        self.regex_engine = regex_engine
+        self._patterns: Dict[str, List[str]] = {}
+        self._compiled: Optional[_CompiledGuardrails] = None
+        self._lock = threading.Lock()
+
+    def register(self, categories: Dict[str, Iterable[str]]) -> None:
+        with self._lock:
+            for category, patterns in categories.items():
+                if not category.isidentifier():
+                    raise ValueError(f"Guardrail category must be an identifier: {category!r}")
+                self._patterns.setdefault(category, [])
+                self._patterns[category].extend(patterns)
+            self._compiled = None
+        scan_guardrails.cache_clear()
+
+    def _all_patterns(self) -> Dict[str, List[str]]:
+        merged = {category: list(patterns) for category, patterns in self._patterns.items()}
+        for language in self.languages:
+            pack = load_pattern_pack(os.path.join(self.pattern_dir, f"{language}.json"))
+            for category, patterns in pack.items():
+                if category.isidentifier():
+                    merged.setdefault(category, []).extend(patterns)
+        return {category: patterns for category, patterns in merged.items() if patterns}
+
+    @staticmethod
+    def _alternation(patterns: Dict[str, List[str]]) -> str:
+        # (?i) rather than a flag argument: both re and re2 accept it inline.
+        return "(?i)" + "|".join(
+            f"(?P<{category}>{'|'.join(f'(?:{p})' for p in items)})" for category, items in patterns.items() if items
+        )
+
+    @classmethod
+    def _compile_with(cls, module, patterns: Dict[str, List[str]]) -> _CompiledGuardrails:
+        ascii_patterns = {category: [p for p in items if p.isascii()] for category, items in patterns.items()}
+        return _CompiledGuardrails(
+            combined=module.compile(cls._alternation(patterns)),
+            combined_ascii=module.compile(cls._alternation(ascii_patterns)),
+            by_category={
+                category: module.compile("(?i)" + "|".join(f"(?:{p})" for p in items))
+                for category, items in patterns.items()
+            },
+            backend=module.__name__,
+        )
+
+    def compiled(self) -> _CompiledGuardrails:
+        compiled = self._compiled
+        if compiled is None:
+            with self._lock:
+                if self._compiled is None:
+                    patterns = self._all_patterns()
+                    use_re2 = re2 is not None and self.regex_engine in {"auto", "re2"}
+                    if self.regex_engine == "re2" and re2 is None:
+                        logger.warning("GUARDRAIL_REGEX_ENGINE=re2 but google-re2 is not installed; using re")
+                    compiled_patterns = None
+                    if use_re2:
+                        try:
+                            compiled_patterns = self._compile_with(re2, patterns)
+                        except Exception as e:
+                            logger.warning(f"Guardrail patterns not RE2-compatible, using re: {str(e)[:200]}")
+                    self._compiled = compiled_patterns or self._compile_with(re, patterns)
+                    logger.info(
+                        f"Guardrails compiled with {self._compiled.backend}: "
+                        f"{sum(len(items) for items in patterns.values())} patterns in {len(patterns)} categories"
+                    )
+                compiled = self._compiled
+        return compiled
+
+    @property
+    def backend(self) -> str:
+        return self.compiled().backend
+
+    def scan(self, text: str) -> List[Violation]:
+        """
+        Every violated category in text, each with its first (leftmost) match.
+
+        One pass over the combined alternation finds non-overlapping matches.
+        A category can only be hidden by starting inside an earlier match's
+        span, so on a hit those spans are re-checked for the other categories.
+        """
+        if not text:
+            return []
+        compiled = self.compiled()
+        combined = compiled.combined_ascii if text.isascii() else compiled.combined
+        violations: List[Violation] = []
+        spans = []
+        for match in combined.finditer(text):
+            category = next(name for name, value in match.groupdict().items() if value is not None)
+            spans.append((match.start(), match.end()))
+            if all(violation.category != category for violation in violations):
+                violations.append(Violation(category, match.start(), match.end(), match.group(0)))
+
+        for start, end in spans:
+            for category, pattern in compiled.by_category.items():
+                if any(violation.category == category for violation in violations):
+                    continue
+                match = pattern.search(text, start)
+                if match and match.start() < end:
+                    violations.append(Violation(category, match.start(), match.end(), match.group(0)))
+        return violations
+
+    def remove(self, text: str, category: str) -> str:
+        """Cut every match of category out of text."""
+        pattern = self.compiled().by_category.get(category)
+        if pattern is None or not text:
+            return text
+        return pattern.sub("", text)
+
+
+GUARDRAILS = GuardrailEngine(GUARDRAIL_PATTERN_DIR, GUARDRAIL_LANGUAGES, GUARDRAIL_REGEX_ENGINE)
+
+
+@lru_cache(maxsize=512)
+def scan_guardrails(text: str) -> tuple:
+    """GUARDRAILS.scan, memoized: a query is checked by several callers in one request."""
+    return tuple(GUARDRAILS.scan(text))
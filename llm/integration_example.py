@@ -28,7 +28,7 @@ def _is_rag_enabled() -> bool:
     return os.getenv("ENABLE_RAG", "true").strip().lower() in {"1", "true", "yes", "on"}
 
 
-def answer_query(user_query, context_k=3, verbose=False, conversation_history=None):
+def answer_query(user_query, context_k=3, verbose=False, conversation_history=None, lang='en'):
     """
     Complete pipeline: RAG retrieval + Gemini generation with conversation context.
     
@@ -37,6 +37,7 @@ def answer_query(user_query, context_k=3, verbose=False, conversation_history=No
         context_k: Number of chunks to retrieve (default: 3)
         verbose: Print debug info (default: False)
         conversation_history: List of previous messages for context (default: None)
+        lang: Language code for the retrieved chunk variants (default: 'en')
     
     Returns:
         User-friendly answer
@@ -52,7 +53,7 @@ def answer_query(user_query, context_k=3, verbose=False, conversation_history=No
         if _is_rag_enabled():
             try:
                 from rag.retriever import retrieve_context
-                context = retrieve_context(user_query, k=context_k)
+                context = retrieve_context(user_query, k=context_k, lang=lang)
 
                 if verbose:
                     if context:
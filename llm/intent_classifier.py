@@ -1,9 +1,15 @@
 """
 Intent Classifier Module
 Classifies user queries into categories for routing and validation.
+
+Keyword lists are registered with the shared keyword engine; each query is
+normalized and scanned once and every score is read from the labelled hits.
+When a trained intent model is available (llm/intent_model.py) and confident,
+its label is used ahead of the keyword scores.
 """
 
-import re
+from llm.intent_model import predict_intent
+from utils.keyword_matcher import KEYWORD_ENGINE, MATCH_PREFIX, MATCH_WORD, KeywordHits, scan_query
 
 
 class IntentClassifier:
@@ -22,6 +28,22 @@ class IntentClassifier:
         'insurance', 'claim', 'accident', 'hospital', 'vehicle', 'car', 'bike',
         'policy', 'premium', 'document', 'settlement'
     }
+
+    FINANCE_CONTEXT_HINTS = {'savings', 'investment', 'compound', 'interest', 'money', 'budget'}
+
+    # Chat routing: substring-style hints, matched from the start of a word.
+    CHAT_DOMAIN_KEYWORDS = {
+        'insurance': [
+            'insurance', 'claim', 'policy', 'premium', 'coverage', 'deductible',
+            'reimbursement', 'settlement', 'hospital claim', 'accident claim',
+            'health insurance', 'car insurance', 'life insurance',
+        ],
+        'finance': [
+            'budget', 'budgeting', 'investment', 'invest', 'stock', 'mutual fund',
+            'portfolio', 'risk', 'retirement', 'financial planning', 'savings',
+            'cash flow', 'asset allocation', 'emergency fund', 'debt',
+        ],
+    }
     
     INTENT_KEYWORDS = {
         'insurance_claim': [
@@ -49,6 +71,8 @@ class IntentClassifier:
             'should i invest', 'legal action', 'sue', 'lawyer', 'make decision for me'
         ]
     }
+
+    MODEL_LABELS = frozenset(INTENT_KEYWORDS) | {'general'}
     
     @staticmethod
     def classify(query: str) -> tuple[str, float]:
@@ -61,18 +85,22 @@ class IntentClassifier:
         Returns:
             (intent_category, confidence_score)
         """
-        normalized_query = IntentClassifier._normalize_query(query)
+        hits = scan_query(query or "")
         
         # Check for prohibited intent first
-        prohibited_score = IntentClassifier._calculate_score(normalized_query, 'prohibited')
+        prohibited_score = IntentClassifier._calculate_score(hits, 'prohibited')
         if prohibited_score > 0.3:
             return 'prohibited', prohibited_score
+
+        prediction = predict_intent("intent", query, labels=IntentClassifier.MODEL_LABELS)
+        if prediction:
+            return prediction.label, prediction.confidence
         
         # Calculate scores for each category
         scores = {}
         for intent, keywords in IntentClassifier.INTENT_KEYWORDS.items():
             if intent != 'prohibited':
-                scores[intent] = IntentClassifier._calculate_score(normalized_query, intent)
+                scores[intent] = IntentClassifier._calculate_score(hits, intent)
         
         # Return category with highest score
         if scores:
@@ -81,7 +109,7 @@ class IntentClassifier:
 
             # Heuristic fallback for short/imperfect insurance claim phrasing.
             if best_intent == 'general' or confidence < 0.2:
-                heuristic_intent, heuristic_conf = IntentClassifier._infer_from_context(normalized_query)
+                heuristic_intent, heuristic_conf = IntentClassifier._infer_from_context(hits)
                 if heuristic_intent != 'general':
                     return heuristic_intent, heuristic_conf
             
@@ -94,51 +122,49 @@ class IntentClassifier:
         return 'general', 0.5
     
     @staticmethod
-    def _calculate_score(query: str, intent: str) -> float:
+    def classify_domain(query: str) -> str:
+        """Classify query into insurance, finance, mixed, or unknown domains."""
+        hits = scan_query(query or "")
+        insurance_score = hits.count('chat_domain.insurance', MATCH_PREFIX)
+        finance_score = hits.count('chat_domain.finance', MATCH_PREFIX)
+
+        if insurance_score > 0 and finance_score > 0:
+            return "mixed"
+        if insurance_score > 0:
+            return "insurance"
+        if finance_score > 0:
+            return "finance"
+
+        intent_name, _ = IntentClassifier.classify(query)
+        if intent_name in {"insurance_claim", "insurance_general"}:
+            return "insurance"
+        if intent_name == "financial_literacy":
+            return "finance"
+        return "unknown"
+
+    @staticmethod
+    def _calculate_score(hits: KeywordHits, intent: str) -> float:
         """Calculate relevance score for intent category"""
         keywords = IntentClassifier.INTENT_KEYWORDS.get(intent, [])
         if not keywords:
             return 0.0
 
-        query_tokens = set(query.split())
-        score = 0.0
-        for keyword in keywords:
-            keyword_lower = keyword.lower()
-            if " " in keyword_lower:
-                if keyword_lower in query:
-                    score += 1.0
-                continue
-
-            if keyword_lower in query_tokens:
-                score += 1.0
-            elif keyword_lower in query:
-                score += 0.6
-
+        # Whole words and phrases count 1.0, a word inside a longer one 0.6.
+        score = hits.weighted_score(f"intent.{intent}")
         return min(score / max(len(keywords) * 0.35, 1.0), 1.0)
 
     @staticmethod
     def _normalize_query(query: str) -> str:
         """Normalize shorthand, typos, and punctuation for robust intent inference."""
-        normalized = (query or "").lower()
-
-        for wrong, correct in IntentClassifier.COMMON_NORMALIZATIONS.items():
-            normalized = re.sub(rf"\b{re.escape(wrong)}\b", correct, normalized)
-
-        normalized = re.sub(r"[^a-z0-9\s]", " ", normalized)
-        normalized = re.sub(r"\s+", " ", normalized).strip()
-        return normalized
+        return KEYWORD_ENGINE.normalize(query, "intent")
 
     @staticmethod
-    def _infer_from_context(query: str) -> tuple[str, float]:
+    def _infer_from_context(hits: KeywordHits) -> tuple[str, float]:
         """Infer likely intent from coarse context when keyword scores are weak."""
-        tokens = set(query.split())
-        insurance_overlap = len(tokens.intersection(IntentClassifier.INSURANCE_CONTEXT_HINTS))
-
-        if insurance_overlap >= 2:
+        if hits.count('intent_context.insurance', MATCH_WORD) >= 2:
             return 'insurance_claim', 0.55
 
-        finance_hints = {'savings', 'investment', 'compound', 'interest', 'money', 'budget'}
-        if len(tokens.intersection(finance_hints)) >= 2:
+        if hits.count('intent_context.finance', MATCH_WORD) >= 2:
             return 'financial_literacy', 0.55
 
         return 'general', 0.5
@@ -177,6 +203,17 @@ class IntentClassifier:
         return intent_info.get(intent, intent_info['general'])
 
 
+# Typo corrections only for the groups the intent score reads, as before the shared engine.
+KEYWORD_ENGINE.add_corrections("intent", IntentClassifier.COMMON_NORMALIZATIONS)
+KEYWORD_ENGINE.add_corrections("intent_context", IntentClassifier.COMMON_NORMALIZATIONS)
+KEYWORD_ENGINE.register("intent", IntentClassifier.INTENT_KEYWORDS)
+KEYWORD_ENGINE.register("intent_context", {
+    'insurance': IntentClassifier.INSURANCE_CONTEXT_HINTS,
+    'finance': IntentClassifier.FINANCE_CONTEXT_HINTS,
+})
+KEYWORD_ENGINE.register("chat_domain", IntentClassifier.CHAT_DOMAIN_KEYWORDS)
+
+
 if __name__ == "__main__":
     # Test intent classifier
     print("=" * 70)
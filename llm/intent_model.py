@@ -0,0 +1,199 @@
+"""
+Trained intent model.
+A linear classifier over hashed character n-grams, used ahead of the keyword
+rules in IntentClassifier ("intent" task) and FinanceIntentAnalyzer
+("finance_intent" task). Character n-grams need no tokenizer and share
+features across spellings, so transliterated ("mera claim reject ho gaya")
+and native-script queries are scored as well as English ones.
+
+Each task is one compressed .npz artifact in INTENT_MODEL_DIR, written by
+llm/train_intent_model.py. Prediction hashes the n-grams with NumPy (no
+per-n-gram Python loop) and takes one sparse dot product with the weight
+matrix. A prediction below INTENT_MODEL_THRESHOLD, or a missing artifact,
+leaves the decision to the rules.
+"""
+
+import logging
+import os
+import re
+import threading
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INTENT_MODEL_ENABLED = os.getenv("INTENT_MODEL_ENABLED", "true").strip().lower() in {"1", "true", "yes", "on"}
+INTENT_MODEL_DIR = os.getenv(
+    "INTENT_MODEL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "intent_model")
+)
+INTENT_MODEL_THRESHOLD = float(os.getenv("INTENT_MODEL_THRESHOLD", "0.6"))
+
+DEFAULT_NGRAM_SIZES = (2, 3, 4)
+DEFAULT_HASH_BITS = 17
+# Longer messages are classified on their opening; intent is stated up front.
+MAX_MODEL_CHARS = 400
+
+_HASH_PRIME = np.uint64(1099511628211)  # FNV-1a 64-bit prime
+_HASH_MIX = np.uint64(0x9E3779B97F4A7C15)  # golden-ratio multiplier for bucket selection
+# Same character set as the keyword engine: ASCII letters/digits and the Indic blocks.
+_NON_MODEL_CHARS = re.compile(r"[^a-z0-9\s\u0900-\u0dff]")
+
+
+class IntentPrediction(NamedTuple):
+    label: str
+    confidence: float
+
+
+def normalize_model_text(text: str) -> str:
+    """Lowercase, punctuation to spaces, single-spaced and padded so n-grams see word edges."""
+    words = _NON_MODEL_CHARS.sub(" ", (text or "")[:MAX_MODEL_CHARS].lower()).split()
+    return f" {' '.join(words)} " if words else ""
+
+
+def hash_ngrams(text: str, ngram_sizes: Iterable[int], hash_bits: int) -> np.ndarray:
+    """
+    Bucket ids of every character n-gram of normalized text.
+
+    A polynomial hash over code points is extended one character at a time,
+    so each n-gram size costs a couple of array operations.
+    """
+    if not text:
+        return np.zeros(0, dtype=np.int64)
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    sizes = sorted(set(ngram_sizes))
+    rolling = codes
+    hashed = []
+    for size in range(2, sizes[-1] + 1):
+        if codes.size < size:
+            break
+        # rolling[i] covers codes[i:i+size-1]; append the next character.
+        rolling = rolling[:-1] * _HASH_PRIME + codes[size - 1:]
+        if size in sizes:
+            hashed.append(rolling * _HASH_PRIME + np.uint64(size))
+    if 1 in sizes:
+        hashed.append(codes * _HASH_PRIME + np.uint64(1))
+    if not hashed:
+        return np.zeros(0, dtype=np.int64)
+    values = np.concatenate(hashed) * _HASH_MIX
+    return (values >> np.uint64(64 - hash_bits)).astype(np.int64)
+
+
+class IntentModel:
+    """
+    Multinomial logistic regression over averaged hashed n-gram features.
+
+    Args:
+        labels: Class names, in weight-column order
+        weights: (2**hash_bits, len(labels)) weight matrix
+        bias: (len(labels),) bias vector
+        ngram_sizes: Character n-gram lengths
+        hash_bits: log2 of the number of hash buckets
+    """
+
+    def __init__(self, labels, weights, bias, ngram_sizes=DEFAULT_NGRAM_SIZES, hash_bits=DEFAULT_HASH_BITS):
+        self.labels = [str(label) for label in labels]
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.ngram_sizes = tuple(int(size) for size in ngram_sizes)
+        self.hash_bits = int(hash_bits)
+
+    def features(self, text: str) -> np.ndarray:
+        return hash_ngrams(normalize_model_text(text), self.ngram_sizes, self.hash_bits)
+
+    def predict_proba(self, text: str) -> Optional[np.ndarray]:
+        """Class probabilities, or None when text has nothing to score."""
+        buckets = self.features(text)
+        if buckets.size == 0:
+            return None
+        # Sparse dot product: the feature vector is 1/n at each n-gram bucket.
+        logits = self.weights[buckets].sum(axis=0) / buckets.size + self.bias
+        logits = np.exp(logits - logits.max())
+        return logits / logits.sum()
+
+    def predict(self, text: str) -> Optional[IntentPrediction]:
+        probabilities = self.predict_proba(text)
+        if probabilities is None:
+            return None
+        best = int(probabilities.argmax())
+        return IntentPrediction(self.labels[best], float(probabilities[best]))
+
+    def save(self, path: str) -> None:
+        """Write the artifact; weights are stored as float16 with zero rows compressed away."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temp_path = f"{path}.part.npz"
+        np.savez_compressed(
+            temp_path,
+            labels=np.array(self.labels),
+            weights=self.weights.astype(np.float16),
+            bias=self.bias,
+            ngram_sizes=np.array(self.ngram_sizes, dtype=np.int64),
+            hash_bits=np.array(self.hash_bits, dtype=np.int64),
+        )
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "IntentModel":
+        with np.load(path, allow_pickle=False) as artifact:
+            return cls(
+                labels=artifact["labels"].tolist(),
+                weights=artifact["weights"],
+                bias=artifact["bias"],
+                ngram_sizes=artifact["ngram_sizes"].tolist(),
+                hash_bits=int(artifact["hash_bits"]),
+            )
+
+
+def model_path(task: str) -> str:
+    return os.path.join(INTENT_MODEL_DIR, f"{task}.npz")
+
+
+_models: Dict[str, Optional[IntentModel]] = {}
+_models_lock = threading.Lock()
+
+
+def get_intent_model(task: str) -> Optional[IntentModel]:
+    """Model for task, loaded once; None when disabled, not trained, or unreadable."""
+    if not INTENT_MODEL_ENABLED:
+        return None
+    if task not in _models:
+        with _models_lock:
+            if task not in _models:
+                path = model_path(task)
+                model = None
+                if os.path.exists(path):
+                    try:
+                        model = IntentModel.load(path)
+                        logger.info(f"Intent model '{task}' loaded: {len(model.labels)} labels, {path}")
+                    except (OSError, ValueError, KeyError) as e:
+                        logger.warning(f"Intent model '{task}' not loaded: {e}")
+                _models[task] = model
+    return _models[task]
+
+
+def predict_intent(task: str, text: str, labels: Optional[Iterable[str]] = None) -> Optional[IntentPrediction]:
+    """
+    Confident model prediction for text, or None to fall back to the rules.
+
+    Args:
+        task: Artifact name ("intent" or "finance_intent")
+        text: Raw user message
+        labels: Labels the caller can route; other predictions are ignored
+
+    Returns:
+        IntentPrediction when a model is loaded and its confidence reaches INTENT_MODEL_THRESHOLD
+    """
+    model = get_intent_model(task)
+    if model is None:
+        return None
+    prediction = model.predict(text)
+    if prediction is None or prediction.confidence < INTENT_MODEL_THRESHOLD:
+        return None
+    if labels is not None and prediction.label not in labels:
+        return None
+    return prediction
+
+
+def preload_intent_models(tasks: Tuple[str, ...] = ("intent", "finance_intent")) -> None:
+    for task in tasks:
+        get_intent_model(task)
@@ -1,9 +1,11 @@
 """
 Safety Filter Module
 Pre-LLM guardrails to prevent prohibited queries from reaching the model.
+Patterns are scanned together with every other guardrail category (and the
+Indic language packs) by llm.guardrails.
 """
 
-import re
+from llm.guardrails import GUARDRAILS, scan_guardrails
 
 
 class SafetyFilter:
@@ -54,13 +56,12 @@ class SafetyFilter:
         Returns:
             (is_safe, violation_type, reason)
         """
-        query_lower = query.lower()
-        
-        # Check each category
-        for category, patterns in SafetyFilter.PROHIBITED_PATTERNS.items():
-            for pattern in patterns:
-                if re.search(pattern, query_lower):
-                    return False, category, SafetyFilter._get_rejection_message(category)
+        violated = {violation.category for violation in scan_guardrails(query or "")}
+
+        # Categories keep their priority order when several are violated
+        for category in SafetyFilter.PROHIBITED_PATTERNS:
+            if category in violated:
+                return False, category, SafetyFilter._get_rejection_message(category)
         
         return True, "safe", ""
     
@@ -139,6 +140,9 @@ I can provide **information** to help you understand your options, but the decis
         return messages.get(violation_type, "⚠️ I cannot assist with this type of request.")
 
 
+GUARDRAILS.register(SafetyFilter.PROHIBITED_PATTERNS)
+
+
 def check_safety(query: str) -> tuple[bool, str]:
     """
     Quick safety check function.
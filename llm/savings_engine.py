@@ -1,13 +1,173 @@
 """
 Savings Engine - Financial calculations and visualizations
+
+project_scenarios() evaluates whole batches or grids of lump-sum + SIP
+scenarios with NumPy (100k scenarios in a few milliseconds) and backs the
+/savings/scenarios endpoint used by the frontend sliders. pandas and Plotly
+are only imported by the chart/table helpers that need them.
 """
 
-import pandas as pd
-import plotly.graph_objects as go
+import os
+from typing import TYPE_CHECKING, NamedTuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Upper bound on values per call; a year-by-year path counts each year.
+SAVINGS_MAX_SCENARIOS = int(os.getenv("SAVINGS_MAX_SCENARIOS", "100000"))
+
+
+class ScenarioResult(NamedTuple):
+    """One array per figure, all of the scenario shape (grid, broadcast, or paths)."""
+    invested: np.ndarray
+    final_value: np.ndarray
+    gains: np.ndarray
+    tax: np.ndarray
+    post_tax_value: np.ndarray
+    real_value: np.ndarray
 
 
 class SavingsEngine:
     """Handle savings calculations and generate financial charts"""
+
+    @staticmethod
+    def _scenario_inputs(principal, monthly_contribution, rate, years, frequency, grid: bool) -> list:
+        """Broadcast (or, for grid=True, cross) the inputs; raise ValueError on bad shapes or values."""
+        arrays = [
+            np.asarray(value, dtype=np.float64)
+            for value in (principal, monthly_contribution, rate, years, frequency)
+        ]
+        if grid:
+            if any(array.ndim > 1 for array in arrays):
+                raise ValueError("Grid inputs must be scalars or 1-D arrays")
+            arrays = np.ix_(*(np.atleast_1d(array) for array in arrays))
+        try:
+            shape = np.broadcast_shapes(*(array.shape for array in arrays))
+        except ValueError:
+            raise ValueError("Scenario inputs must have matching lengths (or use grid=True)") from None
+        count = int(np.prod(shape))
+        if count > SAVINGS_MAX_SCENARIOS:
+            raise ValueError(f"{count} scenarios requested; the limit is {SAVINGS_MAX_SCENARIOS}")
+
+        _, _, rate_array, years_array, frequency_array = arrays
+        if not all(np.all(np.isfinite(array)) for array in arrays):
+            raise ValueError("Scenario inputs must be finite numbers")
+        if np.any(years_array < 0):
+            raise ValueError("Years must not be negative")
+        if np.any(frequency_array <= 0):
+            raise ValueError("Compounding frequency must be positive")
+        if np.any(rate_array / frequency_array <= -100):
+            raise ValueError("Rate per compounding period must be above -100%")
+        return list(arrays)
+
+    @staticmethod
+    def project_scenarios(
+        principal=0.0,
+        monthly_contribution=0.0,
+        rate=8.0,
+        years=10,
+        frequency=12,
+        inflation=0.0,
+        tax_rate=0.0,
+        grid: bool = False,
+    ) -> ScenarioResult:
+        """
+        Project many lump-sum + monthly SIP scenarios at once.
+
+        Each argument is a scalar or an array. By default the arrays are
+        broadcast together (one scenario per element); with grid=True every
+        combination is evaluated and the result has one axis per argument in
+        the order principal, monthly_contribution, rate, years, frequency.
+        Contributions are made at the start of each month, as in
+        sip_calculator, and grow at the monthly rate equivalent to `rate`
+        compounded `frequency` times a year.
+
+        Args:
+            principal: Initial investment amount(s)
+            monthly_contribution: SIP amount(s) per month
+            rate: Annual interest rate(s) in percent
+            years: Investment period(s) in years (fractions allowed)
+            frequency: Compounding frequency per year
+            inflation: Annual inflation in percent, for real_value
+            tax_rate: Tax in percent on positive gains, for post_tax_value
+            grid: Evaluate the cross product of the inputs
+
+        Returns:
+            ScenarioResult of float64 arrays
+
+        Raises:
+            ValueError: Mismatched shapes, too many scenarios, invalid values,
+                or results too large to represent
+        """
+        principal, monthly_contribution, rate, years, frequency = SavingsEngine._scenario_inputs(
+            principal, monthly_contribution, rate, years, frequency, grid
+        )
+        # Work in log-growth so zero and tiny rates need no special casing for the lump sum.
+        # Overflow (huge rates or horizons) becomes inf/nan and is rejected below.
+        with np.errstate(over="ignore", divide="ignore", invalid="ignore"):
+            yearly_log_growth = frequency * np.log1p(rate / 100 / frequency)
+            growth = np.expm1(years * yearly_log_growth)
+            monthly_rate = np.expm1(yearly_log_growth / 12)
+            months = years * 12
+
+            sip_factor = np.where(monthly_rate == 0, months, growth / monthly_rate * (1 + monthly_rate))
+            final_value = principal * (1 + growth) + monthly_contribution * sip_factor
+            invested = principal + monthly_contribution * months
+            gains = final_value - invested
+            tax = np.maximum(gains, 0) * (np.asarray(tax_rate, dtype=np.float64) / 100)
+            post_tax_value = final_value - tax
+            real_value = post_tax_value * np.exp(-years * np.log1p(np.asarray(inflation, dtype=np.float64) / 100))
+
+        if not (np.all(np.isfinite(final_value)) and np.all(np.isfinite(real_value))):
+            raise ValueError("Scenario values overflow; lower the rate, years or amounts")
+
+        shape = np.broadcast_shapes(final_value.shape, tax.shape, real_value.shape)
+        return ScenarioResult(
+            *(np.broadcast_to(values, shape) for values in (invested, final_value, gains, tax, post_tax_value, real_value))
+        )
+
+    @staticmethod
+    def project_paths(
+        principal=0.0,
+        monthly_contribution=0.0,
+        rate=8.0,
+        max_years: int = 30,
+        frequency=12,
+        inflation=0.0,
+        tax_rate=0.0,
+    ) -> ScenarioResult:
+        """
+        Year-end values from year 0 to max_years for each scenario, for growth charts.
+
+        The scenario arguments are broadcast as in project_scenarios; the
+        result gains a trailing axis of length max_years + 1.
+        """
+        max_years = int(max_years)
+        if max_years < 0:
+            raise ValueError("Years must not be negative")
+        principal, monthly_contribution, rate, frequency = (
+            np.asarray(value, dtype=np.float64)[..., None]
+            for value in (principal, monthly_contribution, rate, frequency)
+        )
+        return SavingsEngine.project_scenarios(
+            principal,
+            monthly_contribution,
+            rate,
+            np.arange(max_years + 1),
+            frequency,
+            inflation=np.asarray(inflation, dtype=np.float64)[..., None],
+            tax_rate=np.asarray(tax_rate, dtype=np.float64)[..., None],
+        )
+
+    @staticmethod
+    def scenario_payload(result: ScenarioResult, decimals: int = 2) -> dict:
+        """JSON-ready columns: {"shape": [...], "<field>": flat list in C order}."""
+        payload = {"shape": list(result.final_value.shape)}
+        for field, values in zip(ScenarioResult._fields, result):
+            payload[field] = np.round(values, decimals).ravel().tolist()
+        return payload
     
     @staticmethod
     def calculate_compound_interest(principal: float, rate: float, years: int, frequency: int = 12) -> dict:
@@ -49,26 +209,21 @@ class SavingsEngine:
         Returns:
             Plotly figure object
         """
-        years = list(range(0, max_years + 1))
+        import plotly.graph_objects as go
+
+        years = np.arange(max_years + 1)
         
         # Calculate simple and compound interest
-        simple_interest = [principal + (principal * rate / 100 * year) for year in years]
-        compound_interest = [principal * (1 + rate / 100) ** year for year in years]
-        
-        # Create DataFrame
-        df = pd.DataFrame({
-            'Years': years,
-            'Simple Interest': simple_interest,
-            'Compound Interest': compound_interest
-        })
+        simple_interest = principal + principal * rate / 100 * years
+        compound_interest = SavingsEngine.project_paths(principal, rate=rate, max_years=max_years, frequency=1).final_value
         
         # Create Plotly figure
         fig = go.Figure()
         
         # Add Simple Interest line
         fig.add_trace(go.Scatter(
-            x=df['Years'],
-            y=df['Simple Interest'],
+            x=years,
+            y=simple_interest,
             mode='lines',
             name='Simple Interest',
             line=dict(color='#94A3B8', width=2, dash='dash'),
@@ -77,8 +232,8 @@ class SavingsEngine:
         
         # Add Compound Interest line
         fig.add_trace(go.Scatter(
-            x=df['Years'],
-            y=df['Compound Interest'],
+            x=years,
+            y=compound_interest,
             mode='lines',
             name='Compound Interest',
             line=dict(color='#3B82F6', width=3),
@@ -110,7 +265,7 @@ class SavingsEngine:
         return fig
     
     @staticmethod
-    def generate_comparison_data(principal: float, years: int) -> pd.DataFrame:
+    def generate_comparison_data(principal: float, years: int) -> "pd.DataFrame":
         """
         Generate comparison data for different investment options
         
@@ -121,6 +276,8 @@ class SavingsEngine:
         Returns:
             DataFrame with comparison data
         """
+        import pandas as pd
+
         options = {
             'Savings Account': 3.5,
             'Fixed Deposit': 6.5,
@@ -129,9 +286,11 @@ class SavingsEngine:
             'Equity (Long-term)': 15
         }
         
+        final_amounts = SavingsEngine.project_scenarios(
+            principal, rate=list(options.values()), years=years, frequency=1
+        ).final_value
         results = []
-        for option, rate in options.items():
-            final_amount = principal * (1 + rate / 100) ** years
+        for (option, rate), final_amount in zip(options.items(), final_amounts):
             results.append({
                 'Investment Option': option,
                 'Interest Rate': f'{rate}%',
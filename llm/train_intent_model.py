@@ -0,0 +1,213 @@
+"""
+Train an intent model artifact for llm/intent_model.py.
+
+Input is JSONL, one labeled query per line: {"text": ..., "label": ...}.
+"query" / "query_preview" are accepted for the text and "intent" for the
+label, so chat_input log events can be labeled in place and fed back in;
+a log prefix before the JSON object is skipped. With no files given, the
+task's seed set in llm/intent_model/<task>_seed.jsonl is used.
+
+The model is softmax regression over mean-pooled hashed n-gram features,
+trained full-batch with Adam. A stratified 20% holdout reports accuracy and
+how many queries clear INTENT_MODEL_THRESHOLD; the saved model is then
+retrained on everything and written to INTENT_MODEL_DIR/<task>.npz.
+
+Usage:
+    python llm/train_intent_model.py intent [labeled.jsonl ...]
+    python llm/train_intent_model.py finance_intent [labeled.jsonl ...]
+"""
+
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add project root to Python path for proper module imports
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from llm.intent_model import (
+    DEFAULT_HASH_BITS,
+    DEFAULT_NGRAM_SIZES,
+    INTENT_MODEL_THRESHOLD,
+    IntentModel,
+    hash_ngrams,
+    model_path,
+    normalize_model_text,
+)
+
+SEED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "intent_model")
+EPOCHS = 300
+LEARNING_RATE = 0.1
+L2 = 1e-5
+HOLDOUT_FRACTION = 0.2
+
+
+def load_examples(paths):
+    """Read (text, label) pairs from JSONL files, skipping unlabeled or malformed lines."""
+    examples = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as labeled_file:
+            for line in labeled_file:
+                start = line.find("{")
+                if start < 0:
+                    continue
+                try:
+                    record = json.loads(line[start:])
+                except ValueError:
+                    continue
+                text = record.get("text") or record.get("query") or record.get("query_preview")
+                label = record.get("label") or record.get("intent")
+                if isinstance(text, str) and isinstance(label, str) and text.strip():
+                    examples.append((text, label.strip()))
+    return examples
+
+
+def featurize(texts, ngram_sizes, hash_bits):
+    """
+    Flattened bucket ids of every text.
+
+    Returns:
+        (buckets, offsets, counts, kept): the i-th kept text owns
+        buckets[offsets[i]:offsets[i] + counts[i]]; texts with no features are not kept
+    """
+    rows = [hash_ngrams(normalize_model_text(text), ngram_sizes, hash_bits) for text in texts]
+    kept = np.array([i for i, row in enumerate(rows) if row.size], dtype=np.int64)
+    rows = [rows[i] for i in kept]
+    counts = np.array([row.size for row in rows], dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.int64)
+    return np.concatenate(rows), offsets, counts, kept
+
+
+def train(texts, labels, label_names, ngram_sizes=DEFAULT_NGRAM_SIZES, hash_bits=DEFAULT_HASH_BITS,
+          epochs=EPOCHS, learning_rate=LEARNING_RATE, l2=L2):
+    """
+    Fit softmax regression with Adam on the full batch.
+
+    Args:
+        texts: Training queries
+        labels: Label of each query
+        label_names: Class order for the weight columns
+
+    Returns:
+        Trained IntentModel
+    """
+    buckets, offsets, counts, kept = featurize(texts, ngram_sizes, hash_bits)
+    label_index = {name: i for i, name in enumerate(label_names)}
+    targets = np.array([label_index[labels[i]] for i in kept], dtype=np.int64)
+    example_ids = np.repeat(np.arange(len(kept)), counts)
+    scale = (1.0 / counts)[example_ids, None]
+    one_hot = np.eye(len(label_names))[targets]
+
+    # Only buckets seen in training get gradients; train that slice, scatter it back at the end.
+    used, local = np.unique(buckets, return_inverse=True)
+    weights = np.zeros((used.size, len(label_names)))
+    bias = np.zeros(len(label_names))
+    params = [weights, bias]
+    moments = [np.zeros_like(p) for p in params]
+    velocities = [np.zeros_like(p) for p in params]
+
+    for step in range(1, epochs + 1):
+        logits = np.add.reduceat(weights[local] * scale, offsets, axis=0) + bias
+        logits -= logits.max(axis=1, keepdims=True)
+        probabilities = np.exp(logits)
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        error = (probabilities - one_hot) / len(targets)
+
+        weight_grad = np.zeros_like(weights)
+        np.add.at(weight_grad, local, error[example_ids] * scale)
+        weight_grad += l2 * weights
+        grads = [weight_grad, error.sum(axis=0)]
+
+        for param, grad, moment, velocity in zip(params, grads, moments, velocities):
+            moment *= 0.9
+            moment += 0.1 * grad
+            velocity *= 0.999
+            velocity += 0.001 * grad * grad
+            param -= learning_rate * (moment / (1 - 0.9 ** step)) / (
+                np.sqrt(velocity / (1 - 0.999 ** step)) + 1e-8
+            )
+
+    full_weights = np.zeros((2 ** hash_bits, len(label_names)), dtype=np.float32)
+    full_weights[used] = weights
+    return IntentModel(label_names, full_weights, bias, ngram_sizes, hash_bits)
+
+
+def split_holdout(labels, fraction=HOLDOUT_FRACTION, seed=0):
+    """Stratified train/holdout indices; labels with one example stay in training."""
+    rng = np.random.default_rng(seed)
+    train_ids, holdout_ids = [], []
+    for label in sorted(set(labels)):
+        ids = rng.permutation([i for i, value in enumerate(labels) if value == label]).tolist()
+        cut = int(len(ids) * fraction) if len(ids) > 1 else 0
+        holdout_ids.extend(ids[:cut])
+        train_ids.extend(ids[cut:])
+    return train_ids, holdout_ids
+
+
+def evaluate(model, texts, labels, threshold=INTENT_MODEL_THRESHOLD):
+    """
+    Returns:
+        (accuracy over all texts, share at or above threshold, accuracy on that share)
+    """
+    predictions = [model.predict(text) for text in texts]
+    correct = [p is not None and p.label == label for p, label in zip(predictions, labels)]
+    confident = [p is not None and p.confidence >= threshold for p in predictions]
+    covered = sum(confident)
+    confident_correct = sum(1 for ok, sure in zip(correct, confident) if ok and sure)
+    return (
+        sum(correct) / max(len(texts), 1),
+        covered / max(len(texts), 1),
+        confident_correct / covered if covered else 0.0,
+    )
+
+
+def _median_predict_us(model, texts, repeats=20):
+    timings = []
+    for _ in range(repeats):
+        for text in texts:
+            started = time.perf_counter()
+            model.predict(text)
+            timings.append((time.perf_counter() - started) * 1_000_000)
+    return float(np.median(timings))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    task = sys.argv[1]
+    paths = sys.argv[2:] or [os.path.join(SEED_DIR, f"{task}_seed.jsonl")]
+    examples = load_examples(paths)
+    if not examples:
+        print(f"No labeled examples in {', '.join(paths)}")
+        sys.exit(1)
+
+    texts = [text for text, _ in examples]
+    labels = [label for _, label in examples]
+    label_names = sorted(set(labels))
+    print(f"Task '{task}': {len(examples)} examples, labels: {', '.join(label_names)}")
+
+    train_ids, holdout_ids = split_holdout(labels)
+    if holdout_ids:
+        holdout_model = train([texts[i] for i in train_ids], [labels[i] for i in train_ids], label_names)
+        accuracy, coverage, confident_accuracy = evaluate(
+            holdout_model, [texts[i] for i in holdout_ids], [labels[i] for i in holdout_ids]
+        )
+        print(
+            f"Holdout ({len(holdout_ids)}): accuracy {accuracy:.1%}; "
+            f"{coverage:.1%} above threshold {INTENT_MODEL_THRESHOLD}, {confident_accuracy:.1%} of those correct"
+        )
+
+    started = time.perf_counter()
+    model = train(texts, labels, label_names)
+    print(f"Trained on all examples in {time.perf_counter() - started:.1f}s")
+
+    path = model_path(task)
+    model.save(path)
+    print(f"Saved {path} ({os.path.getsize(path) / 1024:.0f} KB)")
+    print(f"Median prediction: {_median_predict_us(model, texts[:200]):.1f} us")
@@ -3,10 +3,11 @@ RAG Module
 Contains vector database retrieval and context generation.
 """
 
-from .retriever import retrieve_context
+from .retriever import retrieve_context, retrieve_ranked
 from .build_vector_db import update_vector_db
 
 __all__ = [
     'retrieve_context',
+    'retrieve_ranked',
     'update_vector_db',
 ]
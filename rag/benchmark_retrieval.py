@@ -0,0 +1,208 @@
+"""
+Retrieval benchmark: recall@k and latency for vector, BM25 and hybrid modes.
+
+The labeled query set is generated from knowledge_base/*.txt: every short
+heading or vocabulary term inside a chunk becomes a query whose relevant
+answer is the chunk that contains it.
+
+Before the benchmark, native-script queries are checked to tokenize into
+whole words, transliterated queries to retrieve context in hybrid mode and
+off-topic queries to retrieve nothing.
+
+Usage:
+    python rag/benchmark_retrieval.py
+"""
+
+import os
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path for proper module imports
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from rag.build_vector_db import load_documents, remove_empty_chunks, smart_chunk_documents
+from rag.bm25 import tokenize
+
+KB_FOLDER = os.path.join(project_root, "knowledge_base")
+MODES = ("vector", "bm25", "hybrid")
+K_VALUES = (1, 3, 5)
+
+# Extra labeled queries covering short domain terms and transliterated phrasing.
+HANDWRITTEN_QUERIES = [
+    ("PPF", "PPF"),
+    ("SIP", "SIP"),
+    ("deductible", "Deductible"),
+    ("premium", "Premium"),
+    ("claim cheyyatam yelaa", "Report the Claim"),
+    ("claim kaise kare", "Report the Claim"),
+    ("emergency fund", "Emergency Fund"),
+    ("co-payment meaning", "Co-payment"),
+]
+
+# Native-script queries must keep vowel signs and viramas inside their words.
+NATIVE_SCRIPT_QUERIES = [
+    ("क्लेम कैसे करें", ["क्लेम", "कैसे", "करें"]),
+    ("క్లెయిమ్ ఎలా చేయాలి", ["క్లెయిమ్", "ఎలా", "చేయాలి"]),
+    ("க்ளெய்ம் எப்படி செய்வது", ["க்ளெய்ம்", "எப்படி", "செய்வது"]),
+    ("ಕ್ಲೇಮ್ ಹೇಗೆ ಮಾಡುವುದು", ["ಕ್ಲೇಮ್", "ಹೇಗೆ", "ಮಾಡುವುದು"]),
+]
+
+# Romanized Hindi/Telugu queries that embed poorly; hybrid retrieval must still answer them from BM25.
+TRANSLITERATED_QUERIES = [
+    "claim kaise kare",
+    "claim cheyyatam yelaa",
+    "premium kitna hai",
+]
+
+# Queries outside the knowledge base; hybrid retrieval must not return context for them.
+OFF_TOPIC_QUERIES = [
+    "what is the weather today",
+    "tell me a joke",
+    "who won the cricket match",
+]
+
+_HEADING_PATTERN = re.compile(r"^[A-Za-z][A-Za-z0-9 /&()'\-]{2,60}\??$")
+_VOCAB_PATTERN = re.compile(r"^-\s*([A-Za-z][A-Za-z \-]{2,40}):")
+
+
+def _candidate_queries(chunk):
+    """Yield (query, anchor) pairs from headings and vocabulary lines of a chunk."""
+    for line in chunk.split("\n"):
+        line = line.strip()
+        vocab = _VOCAB_PATTERN.match(line)
+        if vocab:
+            term = vocab.group(1).strip()
+            yield f"what is {term.lower()}", term
+            continue
+        if _HEADING_PATTERN.match(line) and 1 <= len(line.split()) <= 6 and not line.isupper():
+            yield line.rstrip("?").lower(), line
+
+
+def build_labeled_queries(kb_folder=KB_FOLDER):
+    """
+    Build a labeled query set from the knowledge base.
+
+    Returns:
+        List of dicts with query and anchor (text that a relevant chunk contains).
+    """
+    documents, metadata = load_documents(kb_folder)
+    chunks, chunk_metadata = smart_chunk_documents(documents, metadata, max_tokens=240, min_words=30)
+    chunks, _ = remove_empty_chunks(chunks, chunk_metadata)
+
+    labeled = []
+    seen = set()
+    for chunk in chunks:
+        for query, anchor in _candidate_queries(chunk):
+            if query in seen:
+                continue
+            seen.add(query)
+            labeled.append({"query": query, "anchor": anchor})
+
+    for query, anchor in HANDWRITTEN_QUERIES:
+        if query not in seen and any(anchor.lower() in chunk.lower() for chunk in chunks):
+            labeled.append({"query": query, "anchor": anchor})
+
+    return labeled
+
+
+def check_query_handling():
+    """
+    Check native-script tokenization, transliterated recall and off-topic rejection.
+
+    Returns:
+        List of failure messages (empty when every check passes)
+    """
+    from rag.retriever import retrieve_ranked
+
+    failures = []
+    for query, expected in NATIVE_SCRIPT_QUERIES:
+        tokens = tokenize(query)
+        if tokens != expected:
+            failures.append(f"tokenize({query!r}) == {tokens}, expected {expected}")
+    for query in TRANSLITERATED_QUERIES:
+        if not retrieve_ranked(query, k=3, mode="hybrid"):
+            failures.append(f"transliterated {query!r} retrieved nothing")
+    for query in OFF_TOPIC_QUERIES:
+        results = retrieve_ranked(query, k=3, mode="hybrid")
+        if results:
+            failures.append(f"off-topic {query!r} retrieved {len(results)} chunks")
+    return failures
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_benchmark(labeled_queries, modes=MODES, k_values=K_VALUES):
+    """
+    Run every labeled query through each retrieval mode.
+
+    Returns:
+        {mode: {"recall@k": float, ..., "p50_ms": float, "p95_ms": float, "mean_ms": float}}
+    """
+    from rag.retriever import retrieve_ranked
+
+    max_k = max(k_values)
+    report = {}
+    for mode in modes:
+        hits_at = {k: 0 for k in k_values}
+        latencies = []
+        for item in labeled_queries:
+            started = time.perf_counter()
+            results = retrieve_ranked(item["query"], k=max_k, lang="all", mode=mode)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+            anchor = item["anchor"].lower()
+            first_relevant = next(
+                (rank for rank, result in enumerate(results) if anchor in result["doc"].lower()),
+                None,
+            )
+            for k in k_values:
+                if first_relevant is not None and first_relevant < k:
+                    hits_at[k] += 1
+
+        total = max(len(labeled_queries), 1)
+        mode_report = {f"recall@{k}": hits_at[k] / total for k in k_values}
+        mode_report["p50_ms"] = _percentile(latencies, 50)
+        mode_report["p95_ms"] = _percentile(latencies, 95)
+        mode_report["mean_ms"] = statistics.fmean(latencies) if latencies else 0.0
+        report[mode] = mode_report
+    return report
+
+
+def print_report(report, query_count):
+    columns = [f"recall@{k}" for k in K_VALUES] + ["p50_ms", "p95_ms", "mean_ms"]
+    print("=" * 78)
+    print(f"Retrieval Benchmark ({query_count} labeled queries from {Path(KB_FOLDER).name}/*.txt)")
+    print("=" * 78)
+    print(f"{'mode':<10}" + "".join(f"{col:>11}" for col in columns))
+    print("-" * 78)
+    for mode, values in report.items():
+        print(f"{mode:<10}" + "".join(f"{values[col]:>11.3f}" for col in columns))
+
+
+if __name__ == "__main__":
+    check_failures = check_query_handling()
+    for failure in check_failures:
+        print(f"[FAIL] {failure}")
+    if check_failures:
+        sys.exit(1)
+    print(
+        f"[OK] {len(NATIVE_SCRIPT_QUERIES)} native-script, {len(TRANSLITERATED_QUERIES)} transliterated "
+        f"and {len(OFF_TOPIC_QUERIES)} off-topic query checks"
+    )
+
+    queries = build_labeled_queries()
+    if not queries:
+        print("No labeled queries could be built from the knowledge base.")
+        sys.exit(1)
+    print_report(run_benchmark(queries), len(queries))
@@ -0,0 +1,154 @@
+"""
+BM25 lexical index for knowledge base chunks.
+Complements the MiniLM embeddings on short, transliterated, and domain-term queries
+(for example "PPF", "SIP", "deductible", "claim cheyyatam yelaa").
+"""
+
+import math
+import re
+import unicodedata
+from collections import Counter
+
+
+def _combining_mark_ranges():
+    """Regex class body for the combining marks (category M) of the Basic Multilingual Plane."""
+    ranges = []
+    for code in range(0x80, 0x10000):
+        if unicodedata.category(chr(code))[0] != "M":
+            continue
+        if ranges and ranges[-1][1] == code - 1:
+            ranges[-1][1] = code
+        else:
+            ranges.append([code, code])
+    return "".join(
+        re.escape(chr(start)) if start == end else f"{re.escape(chr(start))}-{re.escape(chr(end))}"
+        for start, end in ranges
+    )
+
+
+# \w alone splits Indic words at every vowel sign and virama (category M, as in
+# utils/keyword_matcher._is_word_char), so marks count as word characters here.
+TOKEN_PATTERN = re.compile(rf"[\w{_combining_mark_ranges()}]+", re.UNICODE)
+
+# Function words that match nearly every chunk; ignored when scoring a query.
+STOPWORDS = frozenset(
+    "a an the is are was were be been am do does did of to in on at by for with from and or but if "
+    "it its this that these those what which who whom whose when where why how i me my we our you "
+    "your he she they them their there here can could will would should shall may might must "
+    "about into than then so not no yes please tell explain give today now some any".split()
+)
+
+
+def tokenize(text):
+    """Lowercase word tokens; keeps numbers and native-script words whole."""
+    return [
+        token for token in TOKEN_PATTERN.findall((text or "").lower())
+        if len(token) > 1 or token.isdigit()
+    ]
+
+
+class BM25Index:
+    """Okapi BM25 over an in-memory inverted index."""
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.ids = []
+        self.documents = []
+        self.metadatas = []
+        self.postings = {}
+        self.doc_lengths = []
+        self.avg_doc_length = 0.0
+        self.idf = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def build(self, ids, documents, metadatas=None):
+        """
+        Index documents for lexical search.
+
+        Args:
+            ids: Document IDs (same IDs used in the vector collection)
+            documents: Document texts
+            metadatas: Optional metadata dicts aligned with documents
+
+        Returns:
+            self, for chaining
+        """
+        metadatas = metadatas or [{} for _ in documents]
+        self.ids = list(ids)
+        self.documents = list(documents)
+        self.metadatas = [meta or {} for meta in metadatas]
+        self.postings = {}
+        self.doc_lengths = []
+
+        for doc_idx, doc in enumerate(self.documents):
+            term_counts = Counter(tokenize(doc))
+            self.doc_lengths.append(sum(term_counts.values()))
+            for term, tf in term_counts.items():
+                self.postings.setdefault(term, []).append((doc_idx, tf))
+
+        doc_count = len(self.documents)
+        self.avg_doc_length = (sum(self.doc_lengths) / doc_count) if doc_count else 0.0
+        self.idf = {
+            term: math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self.postings.items()
+        }
+        return self
+
+    def search(self, query, n_results=10, min_score=0.0):
+        """
+        Score documents against a query.
+
+        Args:
+            query: Query text; STOPWORDS are not scored
+            n_results: Maximum number of results
+            min_score: Drop documents scoring below this
+
+        Returns:
+            List of (doc_index, score) sorted by score, best first.
+        """
+        if not self.documents:
+            return []
+
+        scores = {}
+        avg_length = self.avg_doc_length or 1.0
+        for term in set(tokenize(query)) - STOPWORDS:
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf[term]
+            for doc_idx, tf in postings:
+                length_norm = 1 - self.b + self.b * (self.doc_lengths[doc_idx] / avg_length)
+                term_score = idf * (tf * (self.k1 + 1)) / (tf + self.k1 * length_norm)
+                scores[doc_idx] = scores.get(doc_idx, 0.0) + term_score
+
+        ranked = sorted(
+            (item for item in scores.items() if item[1] >= min_score), key=lambda item: item[1], reverse=True
+        )
+        return ranked[:n_results]
+
+    def match_strength(self, query, doc_idx):
+        """
+        Term-frequency saturation of the query term that a document matches most strongly.
+
+        tf / (tf + k1 * length_norm), in [0, 1): a word mentioned once in an average-length
+        chunk gives 0.4, three times about 0.67. Separates chunks that are about a query
+        word from chunks that only mention it in passing, independent of its IDF.
+
+        Args:
+            query: Query text; STOPWORDS are not considered
+            doc_idx: Index of the document to inspect
+
+        Returns:
+            Saturation of the strongest term, 0.0 when no query term occurs in the document.
+        """
+        length_norm = 1 - self.b + self.b * (self.doc_lengths[doc_idx] / (self.avg_doc_length or 1.0))
+        strength = 0.0
+        for term in set(tokenize(query)) - STOPWORDS:
+            for posting_idx, tf in self.postings.get(term, ()):
+                if posting_idx == doc_idx:
+                    strength = max(strength, tf / (tf + self.k1 * length_norm))
+                    break
+        return strength
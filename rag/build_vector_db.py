@@ -5,10 +5,20 @@ Optimized for multilingual, step-by-step content with proper chunking.
 
 import os
 import re
+import sys
 from pathlib import Path
 from sentence_transformers import SentenceTransformer
 import chromadb
 
+# Add project root to Python path for proper module imports
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from rag.kb_version import write_kb_version
+from rag.text_variants import build_chunk_variants, detect_content_type
+from utils.chunker import iter_chunks
+
 
 def clean_text(text):
     """Clean and normalize text while preserving structure."""
@@ -32,21 +42,14 @@ def load_documents(kb_folder):
     return documents, metadata
 
 
-def detect_content_type(text):
-    """Detect if chunk is flowchart, language section, or regular."""
-    if 'FLOWCHART_FORMAT' in text:
-        return 'flowchart'
-    elif any(lang in text for lang in ['English:', 'Hindi:', 'Telugu:']):
-        return 'multilingual'
-    return 'regular'
-
-
-def smart_chunk_documents(documents, metadata, max_words=200, min_words=30):
+def smart_chunk_documents(documents, metadata, max_tokens=240, min_words=30):
     """
     Smart chunking that preserves:
     - Language sections (English, Hindi, Telugu)
     - Flowchart format
     - Step-by-step structure
+    Other content goes through the shared structure-aware chunker
+    (utils/chunker.py) with a token budget.
     """
     chunks = []
     chunk_metadata = []
@@ -92,38 +95,14 @@ def smart_chunk_documents(documents, metadata, max_words=200, min_words=30):
                 })
                 continue
             
-            # For other regular content, chunk by size
-            paragraphs = section.split('\n\n')
-            current_chunk = ""
-            
-            for para in paragraphs:
-                para = para.strip()
-                if not para or len(para.split()) < 5:
-                    continue
-                
-                # Check if adding this paragraph exceeds max size
-                test_chunk = (current_chunk + "\n\n" + para).strip() if current_chunk else para
-                word_count = len(test_chunk.split())
-                
-                if word_count > max_words and current_chunk:
-                    # Save current chunk
-                    if len(current_chunk.split()) >= min_words:
-                        chunks.append(current_chunk)
-                        chunk_metadata.append({
-                            "source": metadata[doc_idx]["source"],
-                            "type": "regular"
-                        })
-                    current_chunk = para
-                else:
-                    current_chunk = test_chunk
-            
-            # Add remaining chunk
-            if current_chunk and len(current_chunk.split()) >= min_words:
-                chunks.append(current_chunk)
-                chunk_metadata.append({
-                    "source": metadata[doc_idx]["source"],
-                    "type": "regular"
-                })
+            # For other regular content, pack paragraphs up to the token budget
+            for chunk in iter_chunks(section, max_tokens=max_tokens):
+                if len(chunk["text"].split()) >= min_words:
+                    chunks.append(chunk["text"])
+                    chunk_metadata.append({
+                        "source": metadata[doc_idx]["source"],
+                        "type": "regular"
+                    })
     
     return chunks, chunk_metadata
 
@@ -160,7 +139,7 @@ def build_vector_database():
     
     # Smart chunking preserving multilingual and step structure
     print("Creating semantic chunks...")
-    chunks, chunk_metadata = smart_chunk_documents(documents, metadata, max_words=200, min_words=30)
+    chunks, chunk_metadata = smart_chunk_documents(documents, metadata, max_tokens=240, min_words=30)
     print(f"✓ Created {len(chunks)} chunks")
     
     # Remove empty chunks
@@ -196,15 +175,18 @@ def build_vector_database():
            for i, meta in enumerate(chunk_metadata)]
     
     # Prepare metadata for storage
+    # Per-language, speech-friendly variants are precomputed here so retrieval
+    # can return them without re-parsing multilingual chunks on every query.
     metadatas = [
         {
             "source": meta["source"],
             "type": meta.get("type", "regular"),
             "has_english": str(meta.get("has_english", False)),
             "has_hindi": str(meta.get("has_hindi", False)),
-            "has_telugu": str(meta.get("has_telugu", False))
+            "has_telugu": str(meta.get("has_telugu", False)),
+            **build_chunk_variants(chunk, meta.get("type", "regular")),
         } 
-        for meta in chunk_metadata
+        for chunk, meta in zip(chunks, chunk_metadata)
     ]
     
     # Add documents to collection
@@ -216,6 +198,9 @@ def build_vector_database():
         metadatas=metadatas
     )
     
+    # Stamp the new index so running retrievers drop cached results
+    kb_version = write_kb_version(db_path, chunks)
+    
     # Print success summary
     print(f"\n✓ Vector database built successfully!")
     print(f"  - Total chunks: {len(chunks)}")
@@ -223,6 +208,7 @@ def build_vector_database():
     print(f"  - Min chunk words: {min([len(c.split()) for c in chunks])}")
     print(f"  - Max chunk words: {max([len(c.split()) for c in chunks])}")
     print(f"  - Collection: insurance_kb")
+    print(f"  - KB version: {kb_version}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,84 @@
+"""
+Knowledge-base version stamp.
+The index builder writes a stamp next to the vector database after every rebuild;
+readers compare it to detect a new index and drop anything derived from the old one.
+The version combines a content hash with a per-build id, so every rebuild gets a new
+version even when the chunk text is unchanged (metadata such as the per-language
+variants, or the collection itself, may still differ).
+"""
+
+import hashlib
+import json
+import os
+import time
+import uuid
+
+KB_VERSION_FILE = "kb_version.json"
+
+_cached_stamp = {"path": None, "signature": None, "version": None}
+
+
+def compute_kb_version(chunks):
+    """Content hash of the indexed chunks (order-sensitive)."""
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        digest.update(chunk.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()[:16]
+
+
+def write_kb_version(db_path, chunks):
+    """
+    Write the version stamp for a freshly built index.
+    Call once per rebuild: each call produces a new version.
+
+    Args:
+        db_path: Vector database directory
+        chunks: Chunk texts that were indexed
+
+    Returns:
+        The version string written
+    """
+    content_hash = compute_kb_version(chunks)
+    build_id = uuid.uuid4().hex[:12]
+    version = f"{content_hash}-{build_id}"
+    stamp = {
+        "version": version,
+        "content_hash": content_hash,
+        "build_id": build_id,
+        "chunk_count": len(chunks),
+        "built_at": time.time(),
+    }
+    os.makedirs(db_path, exist_ok=True)
+    stamp_path = os.path.join(db_path, KB_VERSION_FILE)
+    temp_path = f"{stamp_path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(stamp, f)
+    os.replace(temp_path, stamp_path)
+    return version
+
+
+def read_kb_version(db_path):
+    """
+    Return the current version stamp, or "unversioned" if none was written.
+    The file is only re-read when its mtime or inode changes, so this is cheap per call.
+    """
+    stamp_path = os.path.join(db_path, KB_VERSION_FILE)
+    try:
+        stat = os.stat(stamp_path)
+    except OSError:
+        return "unversioned"
+    # The stamp is swapped in with os.replace, so a new inode also marks a new build.
+    signature = (stat.st_mtime_ns, stat.st_ino)
+
+    if _cached_stamp["path"] == stamp_path and _cached_stamp["signature"] == signature:
+        return _cached_stamp["version"]
+
+    try:
+        with open(stamp_path, "r", encoding="utf-8") as f:
+            version = json.load(f).get("version") or "unversioned"
+    except (OSError, ValueError):
+        return "unversioned"
+
+    _cached_stamp.update(path=stamp_path, signature=signature, version=version)
+    return version
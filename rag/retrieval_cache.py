@@ -0,0 +1,91 @@
+"""
+Bounded LRU cache for retrieval results.
+Entries are keyed on the normalized query, retrieval parameters and the
+knowledge-base version, so a rebuilt index never serves stale context.
+"""
+
+import threading
+from collections import OrderedDict
+
+
+def normalize_query_for_cache(query):
+    """Lowercase and collapse whitespace (MiniLM and BM25 are both case-insensitive)."""
+    return " ".join((query or "").lower().split())
+
+
+class RetrievalCache:
+    """Thread-safe LRU cache bounded by entry count and total cached characters."""
+
+    def __init__(self, max_entries=1024, max_chars=4_000_000):
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self._entries = OrderedDict()
+        self._chars = 0
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(query, k, min_similarity, lang, mode, kb_version):
+        return (normalize_query_for_cache(query), int(k), float(min_similarity), lang, mode, kb_version)
+
+    def sync_version(self, kb_version):
+        """Drop every entry when the knowledge-base version changes."""
+        with self._lock:
+            if self._version == kb_version:
+                return False
+            if self._version is not None:
+                self.invalidations += 1
+            self._entries.clear()
+            self._chars = 0
+            self._version = kb_version
+            return True
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        size = len(value)
+        if size > self.max_chars:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._chars -= len(previous)
+            self._entries[key] = value
+            self._chars += size
+            while self._entries and (len(self._entries) > self.max_entries or self._chars > self.max_chars):
+                _, evicted = self._entries.popitem(last=False)
+                self._chars -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._chars = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "cached_chars": self._chars,
+                "max_entries": self.max_entries,
+                "max_chars": self.max_chars,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "kb_version": self._version,
+            }
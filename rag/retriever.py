@@ -7,8 +7,16 @@ import os
 import re
 import logging
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Add project root to Python path for proper module imports
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
 # Set environment variables BEFORE importing sentence-transformers
 os.environ['HF_HUB_DISABLE_IMPLICIT_TOKEN'] = '1'
 os.environ['HF_HUB_OFFLINE'] = '0'
@@ -16,6 +24,12 @@ os.environ['HF_HUB_OFFLINE'] = '0'
 from sentence_transformers import SentenceTransformer
 import chromadb
 
+from rag.bm25 import BM25Index, tokenize
+from rag.build_vector_db import load_documents, remove_empty_chunks, smart_chunk_documents
+from rag.kb_version import read_kb_version, write_kb_version
+from rag.retrieval_cache import RetrievalCache
+from rag.text_variants import build_chunk_variants, detect_content_type, select_variant
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -83,44 +97,115 @@ def load_default_documents(collection):
     
     doc_count = 0
     error_count = 0
+    indexed_chunks = []
+    
+    # Same chunking as rag/build_vector_db.py so both index paths agree
+    documents, metadata = load_documents(kb_folder)
+    chunks, chunk_metadata = smart_chunk_documents(documents, metadata, max_tokens=240, min_words=30)
+    chunks, chunk_metadata = remove_empty_chunks(chunks, chunk_metadata)
     
-    for txt_file in sorted(kb_path.glob("*.txt")):
+    for idx, (chunk, meta) in enumerate(zip(chunks, chunk_metadata)):
+        doc_id = f"{Path(meta['source']).stem}_{idx}"
         try:
-            with open(txt_file, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
-                if content:
-                    # Split content into chunks
-                    chunks = [chunk.strip() for chunk in content.split('\n---\n') if chunk.strip()]
-                    
-                    for idx, chunk in enumerate(chunks):
-                        if chunk:
-                            try:
-                                # Create document ID and embedding
-                                doc_id = f"{txt_file.stem}_{idx}"
-                                embedding = model.encode(chunk, convert_to_tensor=False)
-                                
-                                # Add to collection
-                                collection.add(
-                                    ids=[doc_id],
-                                    embeddings=[embedding.tolist()],
-                                    documents=[chunk],
-                                    metadatas=[{"source": txt_file.name, "chunk": idx}]
-                                )
-                                doc_count += 1
-                            except Exception as chunk_error:
-                                logger.error(f"[ERROR] Error processing chunk {doc_id}: {type(chunk_error).__name__}: {chunk_error}")
-                                error_count += 1
-        except Exception as e:
-            logger.error(f"[ERROR] Error loading {txt_file.name}: {type(e).__name__}: {e}")
+            embedding = model.encode(chunk, convert_to_tensor=False)
+            content_type = meta.get("type") or detect_content_type(chunk)
+            
+            # Add to collection
+            collection.add(
+                ids=[doc_id],
+                embeddings=[embedding.tolist()],
+                documents=[chunk],
+                metadatas=[{
+                    "source": meta["source"],
+                    "chunk": idx,
+                    "type": content_type,
+                    **build_chunk_variants(chunk, content_type),
+                }]
+            )
+            indexed_chunks.append(chunk)
+            doc_count += 1
+        except Exception as chunk_error:
+            logger.error(f"[ERROR] Error processing chunk {doc_id}: {type(chunk_error).__name__}: {chunk_error}")
             error_count += 1
     
     if doc_count > 0:
+        write_kb_version(db_path, indexed_chunks)
         logger.info(f"[OK] Loaded {doc_count} document chunks into vector database")
     if error_count > 0:
         logger.warning(f"[WARNING] Encountered {error_count} errors while loading documents")
 
 collection = get_or_create_collection()
 
+# Hybrid retrieval configuration
+RETRIEVAL_MODE = os.getenv("RAG_RETRIEVAL_MODE", "hybrid").strip().lower()  # hybrid | vector | bm25
+RRF_K = int(os.getenv("RAG_RRF_K", "60"))
+# BM25 hits scoring below this are dropped (stopwords are never scored).
+BM25_MIN_SCORE = float(os.getenv("RAG_BM25_MIN_SCORE", "0.5"))
+# With no vector hit, a BM25 hit is kept only if a query word is this saturated in it
+# (see BM25Index.match_strength; 0.6 is roughly three mentions in an average chunk).
+BM25_MIN_STRENGTH = float(os.getenv("RAG_BM25_MIN_STRENGTH", "0.6"))
+
+# Query cues that favour structured chunks (step-by-step and flowchart content)
+PROCEDURE_CUES = {
+    "how", "steps", "step", "process", "procedure", "file", "filing", "submit",
+    "kaise", "cheyyali", "cheyyatam", "yelaa", "ela", "eppadi", "hege",
+}
+
+_search_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="rag-search")
+
+
+def build_lexical_index():
+    """Build BM25 index from the documents stored in the vector collection."""
+    try:
+        stored = collection.get(include=["documents", "metadatas"])
+        index = BM25Index().build(
+            stored.get("ids", []),
+            stored.get("documents", []),
+            stored.get("metadatas", []),
+        )
+        logger.info(f"[OK] BM25 index built over {len(index)} chunks")
+        return index
+    except Exception as e:
+        logger.error(f"[ERROR] Failed to build BM25 index: {type(e).__name__}: {e}", exc_info=True)
+        return BM25Index()
+
+
+lexical_index = build_lexical_index()
+_loaded_kb_version = read_kb_version(db_path)
+_refresh_lock = threading.Lock()
+
+# Retrieval results depend only on (query, k, min_similarity, lang, mode) and the KB version.
+_retrieval_cache = RetrievalCache(
+    max_entries=int(os.getenv("RAG_CACHE_MAX_ENTRIES", "1024")),
+    max_chars=int(os.getenv("RAG_CACHE_MAX_CHARS", "4000000")),
+)
+
+
+def refresh_if_kb_changed():
+    """
+    Reload the collection and BM25 index when the builder has written a new KB version.
+
+    Returns:
+        The current knowledge-base version string.
+    """
+    global collection, lexical_index, _loaded_kb_version
+
+    current_version = read_kb_version(db_path)
+    if current_version != _loaded_kb_version:
+        with _refresh_lock:
+            if current_version != _loaded_kb_version:
+                logger.info(f"Knowledge base version changed ({_loaded_kb_version} -> {current_version}), reloading index")
+                collection = client.get_collection(name="insurance_kb")
+                lexical_index = build_lexical_index()
+                _loaded_kb_version = current_version
+    _retrieval_cache.sync_version(current_version)
+    return current_version
+
+
+def get_retrieval_cache_stats():
+    """Return hit/miss/eviction counters for the retrieval cache."""
+    return _retrieval_cache.stats()
+
 
 def clean_query(query):
     """Clean and normalize query."""
@@ -128,59 +213,180 @@ def clean_query(query):
     return query.strip()
 
 
-def extract_english_section(text):
-    """Extract only English section from multilingual content."""
-    if 'English:' in text:
-        # Find English section
-        parts = text.split('\n')
-        english_content = []
-        in_english = False
-        
-        for line in parts:
-            if 'English:' in line:
-                in_english = True
-                continue
-            elif any(lang in line for lang in ['Hindi:', 'Telugu:', 'FLOWCHART']):
-                in_english = False
-            elif in_english and line.strip():
-                english_content.append(line.strip())
-        
-        if english_content:
-            return '\n'.join(english_content).strip()
-    
-    return text.strip()
+def _vector_search(query, n_results, min_similarity):
+    """Dense retrieval: MiniLM query embedding against the Chroma collection."""
+    query_embedding = model.encode(query).tolist()
+    results = collection.query(
+        query_embeddings=[query_embedding],
+        n_results=n_results
+    )
+
+    ids = results.get('ids', [[]])
+    documents = results.get('documents', [[]])
+    metadatas = results.get('metadatas', [[]])
+    distances = results.get('distances', [[]])
+    if not documents or not documents[0]:
+        return []
+
+    hits = []
+    for doc_id, doc, meta, dist in zip(ids[0], documents[0], metadatas[0], distances[0]):
+        if not doc or not doc.strip():
+            continue
+
+        # Calculate relevance score
+        similarity = 1 - (dist / 2)
+
+        # Skip low relevance
+        if similarity < min_similarity:
+            logger.debug(f"Skipping low relevance doc: similarity={similarity:.2f}")
+            continue
+
+        hits.append({'id': doc_id, 'doc': doc, 'meta': meta or {}, 'score': similarity})
+    return hits
 
 
-def make_speech_friendly(text):
+def _lexical_search(query, n_results):
+    """Sparse retrieval: BM25 over the same chunks as the vector collection."""
+    hits = []
+    for doc_idx, score in lexical_index.search(query, n_results=n_results, min_score=BM25_MIN_SCORE):
+        hits.append({
+            'id': lexical_index.ids[doc_idx],
+            'doc': lexical_index.documents[doc_idx],
+            'meta': lexical_index.metadatas[doc_idx],
+            'score': score,
+            'strength': lexical_index.match_strength(query, doc_idx),
+        })
+    return hits
+
+
+def _content_type_boosts(query, lang):
+    """Per content-type multipliers applied after rank fusion."""
+    boosts = {}
+    query_tokens = set(tokenize(query))
+    if query_tokens & PROCEDURE_CUES:
+        boosts['steps'] = 1.2
+        boosts['flowchart'] = 1.15
+    if lang != 'en':
+        boosts['multilingual'] = 1.2
+    return boosts
+
+
+def reciprocal_rank_fusion(rankings, boosts=None, rrf_k=RRF_K):
     """
-    Clean text for speech.
-    Remove extra formatting, make short friendly sentences.
+    Fuse several ranked hit lists with reciprocal-rank fusion.
+
+    Args:
+        rankings: List of hit lists, each sorted best first
+        boosts: Optional {content_type: multiplier}
+        rrf_k: RRF damping constant (default: 60)
+
+    Returns:
+        Hits sorted by fused score (score field replaced by fused score).
     """
-    # Remove markdown and special formatting
-    text = re.sub(r'\*+', '', text)
-    text = re.sub(r'#+', '', text)
-    text = re.sub(r'_+', '', text)
-    
-    # Replace arrows with readable text
-    text = text.replace('->', ' leads to ')
-    text = text.replace('<-', ' comes from ')
-    
-    # Clean extra spaces
-    text = re.sub(r'\s{2,}', ' ', text)
-    
-    return text.strip()
+    boosts = boosts or {}
+    fused = {}
+    for hits in rankings:
+        for rank, hit in enumerate(hits):
+            entry = fused.setdefault(hit['id'], dict(hit, score=0.0))
+            entry['score'] += 1.0 / (rrf_k + rank + 1)
+
+    for entry in fused.values():
+        entry['score'] *= boosts.get(entry['meta'].get('type', 'regular'), 1.0)
+
+    return sorted(fused.values(), key=lambda hit: hit['score'], reverse=True)
+
+
+def retrieve_ranked(query, k=3, min_similarity=0.25, lang='en', mode=None):
+    """
+    Retrieve ranked chunks without speech formatting.
+
+    Args:
+        query: Search query string
+        k: Number of matches to return (default: 3)
+        min_similarity: Minimum cosine relevance for vector hits (default: 0.25); in hybrid
+            mode a query with no such hit keeps only BM25 hits of at least BM25_MIN_STRENGTH
+        lang: Language code ('en', 'hi', 'te', 'ta', 'kn') or 'all' for full chunks
+        mode: 'hybrid', 'vector' or 'bm25' (default: RAG_RETRIEVAL_MODE)
+
+    Returns:
+        List of dicts with id, doc, type and score, best first.
+    """
+    mode = (mode or RETRIEVAL_MODE).lower()
+    query = clean_query(query)
+    if not query:
+        return []
+
+    n_candidates = min(k * 3, 15)  # Get extra for filtering
+
+    # Single-word queries ("PPF", "deductible") embed poorly; rely on BM25 for them.
+    use_vector = mode in {'hybrid', 'vector'} and len(query.split()) >= 2
+    use_lexical = mode in {'hybrid', 'bm25'} and len(lexical_index) > 0
+
+    vector_future = None
+    lexical_hits = []
+    if use_vector:
+        vector_future = _search_executor.submit(_vector_search, query, n_candidates, min_similarity)
+    if use_lexical:
+        lexical_hits = _lexical_search(query, n_candidates)
+
+    vector_hits = []
+    vector_failed = False
+    if vector_future is not None:
+        try:
+            vector_hits = vector_future.result()
+        except Exception as e:
+            vector_failed = True
+            logger.error(f"❌ Error in vector search: {type(e).__name__}: {e}", exc_info=True)
+
+    if mode == 'vector':
+        ranked = vector_hits
+    elif mode == 'bm25':
+        ranked = lexical_hits
+    else:
+        if use_vector and not vector_hits and not vector_failed:
+            # Nothing clears min_similarity. Keep chunks that are about a query word
+            # ("claim kaise kare" embeds poorly but "claim" recurs in the claim steps) and
+            # drop passing mentions that make off-topic queries look relevant ("cricket match").
+            lexical_hits = [hit for hit in lexical_hits if hit['strength'] >= BM25_MIN_STRENGTH]
+        ranked = reciprocal_rank_fusion(
+            [vector_hits, lexical_hits],
+            boosts=_content_type_boosts(query, lang),
+        )
+
+    results = []
+    for hit in ranked:
+        meta = hit['meta']
+
+        # Precomputed, speech-friendly variant for the requested language
+        doc = select_variant(hit['doc'], meta, lang)
+
+        # Skip if empty after extraction
+        if not doc.strip():
+            continue
+
+        results.append({
+            'id': hit['id'],
+            'doc': doc,
+            'type': meta.get('type', 'regular'),
+            'score': hit['score'],
+        })
+        if len(results) >= k:
+            break
+
+    return results
 
 
 def retrieve_context(query, k=3, min_similarity=0.25, lang='en'):
     """
     Retrieve relevant context from vector database.
     Optimized for simple English, multilingual content, and speech.
+    Uses hybrid BM25 + vector retrieval fused with RRF (see RAG_RETRIEVAL_MODE).
     
     Args:
         query: Search query string
         k: Number of matches to retrieve (default: 3)
         min_similarity: Minimum relevance score (default: 0.25)
-        lang: Language preference 'en'=English only, 'all'=all languages
+        lang: Language code ('en', 'hi', 'te', 'ta', 'kn') or 'all' for full chunks
     
     Returns:
         Clean, speech-friendly text joined with spaces.
@@ -190,80 +396,31 @@ def retrieve_context(query, k=3, min_similarity=0.25, lang='en'):
         # Clean query
         query = clean_query(query)
         
-        if not query or len(query.split()) < 2:
+        if not query:
             logger.warning(f"Query too short or empty: {query}")
             return ""
         
         logger.debug(f"Retrieving context for query: {query}")
         
-        # Convert query to embedding
-        try:
-            query_embedding = model.encode(query).tolist()
-        except Exception as e:
-            logger.error(f"❌ Error encoding query: {type(e).__name__}: {e}", exc_info=True)
-            return ""
-        
-        # Query the collection
-        try:
-            results = collection.query(
-                query_embeddings=[query_embedding],
-                n_results=min(k * 3, 15)  # Get extra for filtering
-            )
-        except Exception as e:
-            logger.error(f"❌ Error querying collection: {type(e).__name__}: {e}", exc_info=True)
-            return ""
-        
-        # Extract documents and metadata
-        documents = results.get('documents', [[]])
-        metadatas = results.get('metadatas', [[]])
-        distances = results.get('distances', [[]])
-        
-        if not documents or not documents[0]:
-            logger.debug("No documents found in query results")
-            return ""
-        
-        logger.debug(f"Retrieved {len(documents[0])} candidate documents, filtering...")
+        kb_version = refresh_if_kb_changed()
+        cache_key = RetrievalCache.make_key(query, k, min_similarity, lang, RETRIEVAL_MODE, kb_version)
+        cached_context = _retrieval_cache.get(cache_key)
+        if cached_context is not None:
+            logger.debug("Retrieval cache hit")
+            return cached_context
         
-        # Filter and rank results
-        ranked_results = []
-        
-        for doc, meta, dist in zip(documents[0], metadatas[0], distances[0]):
-            if not doc.strip():
-                continue
-            
-            # Calculate relevance score
-            similarity = 1 - (dist / 2)
-            
-            # Skip low relevance
-            if similarity < min_similarity:
-                logger.debug(f"Skipping low relevance doc: similarity={similarity:.2f}")
-                continue
-            
-            # Extract English if multilingual
-            if lang == 'en' and meta.get('type') == 'multilingual':
-                doc = extract_english_section(doc)
-            
-            # Skip if empty after extraction
-            if not doc.strip():
-                continue
-            
-            ranked_results.append({
-                'doc': doc,
-                'type': meta.get('type', 'regular'),
-                'similarity': similarity
-            })
-        
-        # Sort by similarity
-        ranked_results = sorted(ranked_results, key=lambda x: x['similarity'], reverse=True)
-        
-        # Take top k
-        ranked_results = ranked_results[:k]
+        started = time.perf_counter()
+        ranked_results = retrieve_ranked(query, k=k, min_similarity=min_similarity, lang=lang)
         
         if not ranked_results:
             logger.warning(f"No relevant documents found for query (threshold: {min_similarity})")
+            _retrieval_cache.put(cache_key, "")
             return ""
         
-        logger.info(f"✓ Found {len(ranked_results)} relevant documents")
+        logger.info(
+            f"✓ Found {len(ranked_results)} relevant documents "
+            f"({RETRIEVAL_MODE}, {(time.perf_counter() - started) * 1000:.1f} ms)"
+        )
         
         # Remove duplicates
         unique_docs = []
@@ -277,17 +434,11 @@ def retrieve_context(query, k=3, min_similarity=0.25, lang='en'):
                 seen.add(normalized)
                 unique_docs.append(doc)
         
-        # Make speech-friendly
-        final_output = []
-        for doc in unique_docs:
-            doc = make_speech_friendly(doc)
-            if doc:
-                final_output.append(doc)
-        
-        # Join with spaces for natural speech flow
-        context = " ".join(final_output)
+        # Join with spaces for natural speech flow (variants are already speech-friendly)
+        context = " ".join(unique_docs)
         
         logger.debug(f"Context prepared: {len(context)} characters")
+        _retrieval_cache.put(cache_key, context)
         return context
     
     except Exception as e:
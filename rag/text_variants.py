@@ -0,0 +1,141 @@
+"""
+Per-language chunk variants for the knowledge base.
+The index builder precomputes cleaned, speech-friendly text for each language
+section of a chunk so retrieval can return the right variant without re-parsing.
+"""
+
+import re
+
+# Language section labels used inside multilingual knowledge-base chunks
+SECTION_LABELS = {
+    "en": "English:",
+    "hi": "Hindi:",
+    "te": "Telugu:",
+}
+SECTION_TERMINATORS = list(SECTION_LABELS.values()) + ["FLOWCHART"]
+
+# Metadata field holding each precomputed variant
+VARIANT_FIELDS = {
+    "en": "text_en",
+    "hi": "text_hi",
+    "te": "text_te",
+    "all": "text_speech",
+}
+
+_MARKUP_PATTERN = re.compile(r'[*#_]+')
+_SPACES_PATTERN = re.compile(r'\s{2,}')
+
+
+def detect_content_type(text):
+    """Detect if chunk is flowchart, language section, steps, or regular."""
+    if 'FLOWCHART_FORMAT' in text:
+        return 'flowchart'
+    elif any(lang in text for lang in SECTION_LABELS.values()):
+        return 'multilingual'
+    elif 'Step' in text and '->' in text:
+        return 'steps'
+    return 'regular'
+
+
+def extract_language_section(text, lang="en"):
+    """
+    Extract one language section from multilingual content.
+
+    Returns:
+        Section text, or "" when the chunk has no section for that language.
+    """
+    label = SECTION_LABELS.get(lang)
+    if not label or label not in text:
+        return ""
+
+    section_lines = []
+    in_section = False
+    for line in text.split('\n'):
+        if label in line:
+            in_section = True
+            remainder = line.split(label, 1)[1].strip()
+            if remainder:
+                section_lines.append(remainder)
+            continue
+        if any(marker in line for marker in SECTION_TERMINATORS):
+            in_section = False
+        elif in_section and line.strip():
+            section_lines.append(line.strip())
+
+    return '\n'.join(section_lines).strip()
+
+
+def extract_english_section(text):
+    """Extract only English section from multilingual content."""
+    return extract_language_section(text, "en") or text.strip()
+
+
+def make_speech_friendly(text):
+    """
+    Clean text for speech.
+    Remove extra formatting, make short friendly sentences.
+    """
+    # Remove markdown and special formatting
+    text = _MARKUP_PATTERN.sub('', text)
+
+    # Replace arrows with readable text
+    text = text.replace('->', ' leads to ')
+    text = text.replace('<-', ' comes from ')
+
+    # Clean extra spaces
+    text = _SPACES_PATTERN.sub(' ', text)
+
+    return text.strip()
+
+
+def build_chunk_variants(text, content_type):
+    """
+    Precompute cleaned variants of a chunk for storage in index metadata.
+
+    Args:
+        text: Raw chunk text
+        content_type: Chunk type from the builder (multilingual, flowchart, steps, regular)
+
+    Returns:
+        Dict of variant fields (text_en, text_hi, text_te, text_speech) plus
+        a comma-separated "languages" list.
+    """
+    variants = {"text_speech": make_speech_friendly(text)}
+    languages = []
+
+    if content_type == "multilingual":
+        for lang, field in VARIANT_FIELDS.items():
+            if lang == "all":
+                continue
+            section = extract_language_section(text, lang)
+            variants[field] = make_speech_friendly(section) if section else ""
+            if section:
+                languages.append(lang)
+        if not variants["text_en"]:
+            variants["text_en"] = variants["text_speech"]
+    else:
+        # Regular knowledge-base content is written in simple English.
+        variants["text_en"] = variants["text_speech"]
+        variants["text_hi"] = ""
+        variants["text_te"] = ""
+        languages.append("en")
+
+    variants["languages"] = ",".join(languages)
+    return variants
+
+
+def select_variant(doc, meta, lang):
+    """
+    Return the stored variant of a retrieved chunk for the requested language.
+
+    Languages without their own section (Tamil, Kannada, or a missing Hindi/Telugu
+    section) get the English variant rather than the whole mixed-language chunk.
+    Indexes built before variants existed fall back to cleaning at query time.
+    """
+    field = VARIANT_FIELDS.get(lang, VARIANT_FIELDS["en"])
+    if "text_speech" in meta:
+        return meta.get(field) or meta.get("text_en") or meta.get("text_speech", "")
+
+    if lang == 'en' and meta.get('type') == 'multilingual':
+        doc = extract_english_section(doc)
+    return make_speech_friendly(doc)
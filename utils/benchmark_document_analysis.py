@@ -0,0 +1,167 @@
+"""
+Benchmark: single-pass analyze_claim_document vs the previous per-pattern version.
+
+Generates synthetic claim documents of increasing size (OCR-style noise, bills,
+repeated pages), checks that both versions return the same analysis, and
+reports the median latency of each.
+
+Usage:
+    python utils/benchmark_document_analysis.py
+"""
+
+import os
+import random
+import re
+import statistics
+import sys
+import time
+
+# Add project root to Python path for proper module imports
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from utils.document_processor import analyze_claim_document
+
+SIZES_KB = (10, 50, 200, 1000)
+REPEATS = 7
+
+_FILLER_WORDS = (
+    "the patient was admitted to hospital for treatment of fever and the doctor advised rest "
+    "room charges nursing pharmacy consumables investigation laboratory radiology discharge "
+    "summary reference ward bed days package surgeon anaesthesia procedure follow up"
+).split()
+
+
+def legacy_analyze_claim_document(document_text):
+    """analyze_claim_document before the single-pass scanner (kept for comparison)."""
+    text = document_text or ''
+    text_lower = text.lower()
+
+    type_hints = {
+        'claim_form': ['claim form', 'claim number', 'claimant', 'incident date', 'loss date'],
+        'insurance_policy': ['policy', 'premium', 'coverage', 'sum insured', 'policy term'],
+        'medical_document': ['medical', 'prescription', 'diagnosis', 'hospital', 'doctor'],
+        'bill_invoice': ['invoice', 'bill', 'receipt', 'amount due', 'total amount'],
+    }
+    type_scores = {doc_type: sum(1 for hint in hints if hint in text_lower) for doc_type, hints in type_hints.items()}
+
+    def _extract_with_patterns(patterns):
+        for pattern in patterns:
+            match = re.search(pattern, text, flags=re.IGNORECASE)
+            if match:
+                value = match.group(1).strip()
+                if value:
+                    return value
+        return ''
+
+    extracted_fields = {
+        'policy_number': _extract_with_patterns([r'policy\s*(?:number|no\.?|#)\s*[:\-]?\s*([A-Z0-9\-/]{5,})']),
+        'claim_number': _extract_with_patterns([r'claim\s*(?:number|no\.?|id|#)\s*[:\-]?\s*([A-Z0-9\-/]{4,})']),
+        'claimant_name': _extract_with_patterns([r'(?:claimant|insured|name)\s*[:\-]\s*([A-Za-z .]{3,60})']),
+        'email': _extract_with_patterns([r'([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,})']),
+        'phone': _extract_with_patterns([r'(?:\+?91[-\s]?)?([6-9]\d{9})']),
+    }
+    amounts = re.findall(r'₹\s*[\d,]+(?:\.\d{2})?|\$\s*[\d,]+(?:\.\d{2})?', text)
+    dates = re.findall(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}', text)
+    extracted_fields['invoice_total'] = amounts[0] if amounts else ''
+    extracted_fields['incident_date'] = dates[0] if dates else ''
+
+    return {
+        'type_scores': type_scores,
+        'extracted_fields': extracted_fields,
+        'detected_amounts': amounts[:5],
+        'detected_dates': dates[:5],
+    }
+
+
+def _comparable(analysis):
+    return {
+        'extracted_fields': {name: meta['value'] for name, meta in analysis['extracted_fields'].items()},
+        'detected_amounts': analysis['detected_amounts'],
+        'detected_dates': analysis['detected_dates'],
+    }
+
+
+def _legacy_comparable(legacy):
+    return {key: value for key, value in legacy.items() if key != 'type_scores'}
+
+
+def build_synthetic_document(size_kb, seed=0):
+    """Bill/claim-like text of roughly size_kb kilobytes with fields scattered through it."""
+    rng = random.Random(seed)
+    lines = []
+    size = 0
+    target = size_kb * 1024
+    while size < target:
+        roll = rng.random()
+        if roll < 0.04:
+            line = f"{rng.choice(['Room rent', 'Pharmacy', 'Consultation'])} ₹ {rng.randint(100, 99999):,}.00"
+        elif roll < 0.06:
+            line = f"Date of service {rng.randint(1, 28)}/{rng.randint(1, 12)}/20{rng.randint(20, 25)}"
+        elif roll < 0.07:
+            line = f"Ref {rng.randint(10**5, 10**7)} ward {rng.randint(1, 40)}-B"
+        else:
+            line = " ".join(rng.choice(_FILLER_WORDS) for _ in range(rng.randint(6, 16)))
+            if rng.random() < 0.2:
+                line = line.upper()
+        lines.append(line)
+        size += len(line) + 1
+
+    header = [
+        "CLAIM FORM - Hospitalisation",
+        f"Policy Number: POL/{rng.randint(10**6, 10**7)}",
+        f"Claim No: CLM-{rng.randint(1000, 99999)}",
+        "Claimant Name: Ravi Kumar Sharma",
+        "Email: ravi.sharma@example.in",
+        f"Phone: +91 9{rng.randint(10**8, 10**9 - 1)}",
+    ]
+    # Put the labelled fields in the middle so neither version can stop early.
+    middle = len(lines) // 2
+    return "\n".join(lines[:middle] + header + lines[middle:])
+
+
+def _median_ms(func, text):
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        func(text)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def run_benchmark(sizes_kb=SIZES_KB):
+    rows = []
+    for size_kb in sizes_kb:
+        text = build_synthetic_document(size_kb, seed=size_kb)
+        matches = _comparable(analyze_claim_document(text)) == _legacy_comparable(legacy_analyze_claim_document(text))
+        legacy_ms = _median_ms(legacy_analyze_claim_document, text)
+        single_pass_ms = _median_ms(analyze_claim_document, text)
+        rows.append((size_kb, legacy_ms, single_pass_ms, matches))
+    return rows
+
+
+def check_parity(samples=300):
+    """Compare both versions on small randomized documents; returns mismatching seeds."""
+    mismatches = []
+    for seed in range(samples):
+        text = build_synthetic_document(2, seed=seed)
+        if _comparable(analyze_claim_document(text)) != _legacy_comparable(legacy_analyze_claim_document(text)):
+            mismatches.append(seed)
+    return mismatches
+
+
+if __name__ == "__main__":
+    print("=" * 64)
+    print("analyze_claim_document: per-pattern vs single pass")
+    print("=" * 64)
+    print(f"{'size':>8}{'legacy ms':>14}{'single ms':>14}{'speedup':>10}{'same':>8}")
+    print("-" * 64)
+    for size_kb, legacy_ms, single_pass_ms, matches in run_benchmark():
+        speedup = legacy_ms / single_pass_ms if single_pass_ms else float('inf')
+        print(f"{size_kb:>6}KB{legacy_ms:>14.2f}{single_pass_ms:>14.2f}{speedup:>9.1f}x{str(matches):>8}")
+
+    mismatched = check_parity()
+    print(f"\nParity on 300 randomized documents: {300 - len(mismatched)}/300 identical")
+    if mismatched:
+        print(f"Mismatching seeds: {mismatched[:10]}")
@@ -0,0 +1,250 @@
+"""
+Benchmark: per-query classification with the shared keyword engine vs the
+previous per-keyword substring checks.
+
+Runs the chat-domain, intent and finance classifiers over a set of realistic
+and randomized queries, reports how often the old and new versions agree
+(they differ by design where a keyword sits inside an unrelated word, e.g.
+"claim" in "disclaimer"), and the median cost per query of each.
+
+Usage:
+    python utils/benchmark_keyword_classification.py
+"""
+
+import os
+import random
+import re
+import statistics
+import sys
+import time
+
+# Add project root to Python path for proper module imports
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from llm.intent_classifier import IntentClassifier
+from utils.keyword_matcher import scan_query
+
+try:
+    from llm.finance_assistant import FinanceIntentAnalyzer
+except ImportError:
+    # finance_assistant pulls in the Gemini client; skip it when that is not installed.
+    FinanceIntentAnalyzer = None
+
+REPEATS = 200
+RANDOM_QUERIES = 500
+
+SAMPLE_QUERIES = [
+    "What is a deductible?",
+    "How long does a claim take?",
+    "Explain compound interest",
+    "What is PPF scheme?",
+    "Will my claim be approved?",
+    "Which insurance should I buy?",
+    "How to file a clm for my car accdnt?",
+    "Should I invest in mutual funds for retirement?",
+    "My insurence claim was rejected, how do I appeal the decision?",
+    "How do I build an emergency fund on a 40k salary with a home loan?",
+    "Is it good to put all in one stock? What about volatility and drawdown?",
+    "hospital bill reimbursement status and the documents needed for settlement",
+    "Please read the disclaimer on this policy document",
+    "बीमा क्लेम कैसे करें?",
+    "నా భీమా క్లెయిమ్ స్టేటస్ ఏమిటి?",
+    "hi",
+]
+
+_VOCABULARY = (
+    "claim claims disclaimer insurance insurer policy premium hospital car bike accident "
+    "budget budgeting invest investment investigation stock livestock risk asterisk savings "
+    "retirement debt loan sip etf equity should i recommend which one best option money "
+    "interest compound fund mutual emergency tax planning status track delay document the "
+    "my a to for how what is on with and of co-payment cash-flow 5 year 50 30 20"
+).split()
+
+
+def legacy_normalize_query(query):
+    """IntentClassifier._normalize_query before the keyword engine."""
+    normalized = (query or "").lower()
+    for wrong, correct in IntentClassifier.COMMON_NORMALIZATIONS.items():
+        normalized = re.sub(rf"\b{re.escape(wrong)}\b", correct, normalized)
+    normalized = re.sub(r"[^a-z0-9\s]", " ", normalized)
+    return re.sub(r"\s+", " ", normalized).strip()
+
+
+def _legacy_keyword_score(clean, words, keywords):
+    score = 0.0
+    for keyword in keywords:
+        keyword_lower = keyword.lower()
+        if " " in keyword_lower:
+            if keyword_lower in clean:
+                score += 1.0
+        elif keyword_lower in words:
+            score += 1.0
+        elif keyword_lower in clean:
+            score += 0.6
+    return score
+
+
+def legacy_classify(query):
+    """IntentClassifier.classify before the keyword engine."""
+    normalized = legacy_normalize_query(query)
+    words = set(normalized.split())
+
+    def score(intent):
+        keywords = IntentClassifier.INTENT_KEYWORDS[intent]
+        return min(_legacy_keyword_score(normalized, words, keywords) / max(len(keywords) * 0.35, 1.0), 1.0)
+
+    prohibited_score = score('prohibited')
+    if prohibited_score > 0.3:
+        return 'prohibited', prohibited_score
+
+    scores = {intent: score(intent) for intent in IntentClassifier.INTENT_KEYWORDS if intent != 'prohibited'}
+    best_intent = max(scores, key=scores.get)
+    confidence = scores[best_intent]
+    if confidence < 0.2:
+        if len(words & IntentClassifier.INSURANCE_CONTEXT_HINTS) >= 2:
+            return 'insurance_claim', 0.55
+        if len(words & IntentClassifier.FINANCE_CONTEXT_HINTS) >= 2:
+            return 'financial_literacy', 0.55
+        return 'general', 0.5
+    return best_intent, confidence
+
+
+def legacy_classify_domain(query):
+    """_classify_chat_domain before the keyword engine."""
+    text = (query or "").lower()
+    insurance_score = sum(1 for word in IntentClassifier.CHAT_DOMAIN_KEYWORDS['insurance'] if word in text)
+    finance_score = sum(1 for word in IntentClassifier.CHAT_DOMAIN_KEYWORDS['finance'] if word in text)
+    if insurance_score > 0 and finance_score > 0:
+        return "mixed"
+    if insurance_score > 0:
+        return "insurance"
+    if finance_score > 0:
+        return "finance"
+    intent_name, _ = legacy_classify(query)
+    if intent_name in {"insurance_claim", "insurance_general"}:
+        return "insurance"
+    if intent_name == "financial_literacy":
+        return "finance"
+    return "unknown"
+
+
+def legacy_finance_analyze(query):
+    """FinanceIntentAnalyzer.analyze before the keyword engine (result fields as a tuple)."""
+    analyzer = FinanceIntentAnalyzer
+    text = (query or "").strip().lower()
+    clean = re.sub(r"\s+", " ", re.sub(r"[^a-z0-9\s]", " ", text)).strip()
+    if not clean:
+        if not text:
+            return "clarification", 0.0, True, False, True
+        native = any(ord(ch) > 127 for ch in text) and any(hint in text for hint in analyzer.NATIVE_INSURANCE_HINTS)
+        return ("financial_planning" if native else "personal_finance"), 0.35, False, False, True
+
+    words = set(clean.split())
+    scores = {
+        intent: _legacy_keyword_score(clean, words, keywords)
+        for intent, keywords in analyzer.INTENT_KEYWORDS.items()
+    }
+    best_intent = max(scores, key=scores.get)
+    confidence = min(scores[best_intent] / max(len(analyzer.INTENT_KEYWORDS[best_intent]) * 0.35, 1), 1.0)
+    domain_overlap = sum(1 for hint in analyzer.DOMAIN_HINTS if hint in clean)
+    in_domain = domain_overlap > 0 or confidence >= 0.2
+    risk_sensitive = best_intent in {"investing", "stock_market", "risk_analysis"} or any(
+        hint in clean for hint in analyzer.RISKY_HINTS
+    )
+    is_advice_query = any(hint in clean for hint in analyzer.ADVICE_HINTS) or risk_sensitive
+    needs_clarification = (not in_domain and is_advice_query) or (
+        is_advice_query and len(words) <= 3 and confidence < 0.15 and domain_overlap == 0
+    )
+    return best_intent, confidence, needs_clarification, risk_sensitive, in_domain
+
+
+def finance_analyze(query):
+    result = FinanceIntentAnalyzer.analyze(query)
+    return result.intent, result.confidence, result.needs_clarification, result.risk_sensitive, result.in_domain
+
+
+def legacy_turn(query):
+    results = [legacy_classify_domain(query), legacy_classify(query)]
+    if FinanceIntentAnalyzer is not None:
+        results.append(legacy_finance_analyze(query))
+    return results
+
+
+def engine_turn(query):
+    results = [IntentClassifier.classify_domain(query), IntentClassifier.classify(query)]
+    if FinanceIntentAnalyzer is not None:
+        results.append(finance_analyze(query))
+    return results
+
+
+def build_random_queries(count=RANDOM_QUERIES, seed=0):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(_VOCABULARY) for _ in range(rng.randint(2, 14))) for _ in range(count)]
+
+
+def _comparable(results):
+    return [
+        tuple(round(value, 6) if isinstance(value, float) else value for value in result)
+        if isinstance(result, tuple) else result
+        for result in results
+    ]
+
+
+def check_parity(queries):
+    """Return [(query, legacy results, engine results)] where the two differ."""
+    mismatches = []
+    for query in queries:
+        scan_query.cache_clear()
+        legacy, engine = _comparable(legacy_turn(query)), _comparable(engine_turn(query))
+        if legacy != engine:
+            mismatches.append((query, legacy, engine))
+    return mismatches
+
+
+def _median_us(func, queries, clear_cache):
+    timings = []
+    for _ in range(REPEATS):
+        for query in queries:
+            if clear_cache:
+                scan_query.cache_clear()
+            started = time.perf_counter()
+            func(query)
+            timings.append((time.perf_counter() - started) * 1_000_000)
+    return statistics.median(timings)
+
+
+def run_benchmark(queries=SAMPLE_QUERIES):
+    rows = [
+        ("chat domain", _median_us(legacy_classify_domain, queries, False),
+         _median_us(IntentClassifier.classify_domain, queries, True)),
+        ("intent", _median_us(legacy_classify, queries, False),
+         _median_us(IntentClassifier.classify, queries, True)),
+    ]
+    if FinanceIntentAnalyzer is not None:
+        rows.append(("finance intent", _median_us(legacy_finance_analyze, queries, False),
+                     _median_us(finance_analyze, queries, True)))
+    rows.append(("full chat turn", _median_us(legacy_turn, queries, False), _median_us(engine_turn, queries, True)))
+    return rows
+
+
+if __name__ == "__main__":
+    print("=" * 64)
+    print("Query classification: substring checks vs keyword engine")
+    print("=" * 64)
+    if FinanceIntentAnalyzer is None:
+        print("llm.finance_assistant not importable (Gemini client missing); finance intent skipped")
+
+    random_queries = build_random_queries()
+    mismatches = check_parity(SAMPLE_QUERIES + random_queries)
+    total = len(SAMPLE_QUERIES) + len(random_queries)
+    print(f"Agreement: {total - len(mismatches)}/{total} queries")
+    for query, legacy, engine in mismatches[:5]:
+        print(f"  {query[:60]!r}\n    before: {legacy}\n    after:  {engine}")
+
+    print(f"\n{'classifier':<16}{'before us':>12}{'after us':>12}{'speedup':>10}")
+    print("-" * 50)
+    for name, legacy_us, engine_us in run_benchmark():
+        print(f"{name:<16}{legacy_us:>12.1f}{engine_us:>12.1f}{legacy_us / engine_us:>9.1f}x")
+    print("\n'after' clears the scan memo before each query, so every row pays for one full scan.")
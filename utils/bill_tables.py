@@ -0,0 +1,274 @@
+"""
+Bill and invoice line items.
+Turns raw table rows (from pdfplumber's table finder) into structured line
+items, reconciles them against the stated bill total with vectorized pandas
+arithmetic, and formats compact rows for chat prompts.
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+# Header keywords per column role, checked in this order ("unit price" before "unit").
+COLUMN_KEYWORDS = {
+    'description': ('description', 'particulars', 'item', 'service', 'details', 'test', 'medicine', 'procedure'),
+    'unit_price': ('rate', 'unit price', 'price', 'mrp', 'unit cost'),
+    'quantity': ('qty', 'quantity', 'units', 'unit', 'nos', 'days', 'count'),
+    'amount': ('amount', 'total', 'net', 'value', 'cost'),
+}
+
+# Rows whose description marks them as bill-level figures rather than items.
+_FINAL_TOTAL_LABEL = re.compile(r'\b(?:grand\s+total|net\s+(?:payable|amount)|total\s+(?:amount|payable|bill)|bill\s+amount|amount\s+payable)\b', re.IGNORECASE)
+_TOTAL_LABEL = re.compile(r'\btotal\b', re.IGNORECASE)
+_SUBTOTAL_LABEL = re.compile(r'\bsub\s*-?\s*total\b', re.IGNORECASE)
+_INCLUSIVE_LABEL = re.compile(r'\bincl(?:\.|usive|uding)?\b', re.IGNORECASE)
+_TAX_LABEL = re.compile(r'\b(?:gst|cgst|sgst|igst|tax|vat|cess)\b', re.IGNORECASE)
+_DISCOUNT_LABEL = re.compile(r'\b(?:discount|concession|rebate|less|advance\s+paid|deposit)\b', re.IGNORECASE)
+_NUMBER_CLEANUP = r'(?:₹|rs\.?|inr|/-|,|\s)'
+# "Grand Total: ₹ 12,345.00" style lines in the text layer, for bills whose total sits outside the table.
+_STATED_TOTAL_LINE = re.compile(
+    _FINAL_TOTAL_LABEL.pattern + r'[^\d\n]{0,20}([\d,]+(?:\.\d{1,2})?)',
+    re.IGNORECASE,
+)
+
+# A line item is off when qty x rate differs from its amount by more than this.
+LINE_TOLERANCE_ABS = 1.0
+LINE_TOLERANCE_REL = 0.01
+
+
+def _clean_cell(cell: Any) -> str:
+    return ' '.join(str(cell).split()) if cell is not None else ''
+
+
+def _find_header(rows: List[List[str]]) -> tuple[Optional[int], Dict[str, int]]:
+    """Return (header row index, {role: column index}) for the first row naming an amount column."""
+    for row_index, row in enumerate(rows[:5]):
+        columns: Dict[str, int] = {}
+        lowered = [cell.lower() for cell in row]
+        for role, keywords in COLUMN_KEYWORDS.items():
+            for column, cell in enumerate(lowered):
+                if column in columns.values() or not cell:
+                    continue
+                if any(keyword in cell for keyword in keywords):
+                    columns[role] = column
+                    break
+        if 'amount' in columns:
+            return row_index, columns
+    return None, {}
+
+
+def _infer_columns(frame) -> Dict[str, int]:
+    """Without a header: first mostly-text column is the description, the last numeric one the amount."""
+    numeric_share = frame.apply(lambda column: _to_number(column).notna().mean())
+    numeric_columns = [index for index, share in enumerate(numeric_share) if share >= 0.6]
+    if not numeric_columns:
+        return {}
+    columns = {'amount': numeric_columns[-1]}
+    text_columns = [index for index in range(frame.shape[1]) if index not in numeric_columns]
+    if text_columns:
+        columns['description'] = text_columns[0]
+    if len(numeric_columns) >= 3:
+        columns['quantity'], columns['unit_price'] = numeric_columns[-3], numeric_columns[-2]
+    elif len(numeric_columns) == 2:
+        columns['unit_price'] = numeric_columns[0]
+    return columns
+
+
+def _to_number(series):
+    import pandas as pd
+
+    cleaned = series.astype(str).str.replace(_NUMBER_CLEANUP, '', regex=True, flags=re.IGNORECASE)
+    # Hospital statements print refunds and adjustments as bracketed negatives.
+    negative = cleaned.str.match(r'^\(.*\)$')
+    cleaned = cleaned.str.strip('()').str.extract(r'^(-?\d+(?:\.\d+)?)', expand=False)
+    numbers = pd.to_numeric(cleaned, errors='coerce')
+    return numbers.where(~negative, -numbers)
+
+
+def parse_table(rows: List[List[Any]], page: Optional[int] = None):
+    """
+    Normalize one extracted table into a line-item DataFrame.
+
+    Args:
+        rows: Table rows as lists of cell values (None for empty cells)
+        page: 1-based page the table came from
+
+    Returns:
+        DataFrame with description, quantity, unit_price, amount, page and
+        kind ('item', 'subtotal', 'tax', 'discount', 'total'), or None when
+        the table has no usable amount column
+    """
+    import pandas as pd
+
+    cleaned_rows = [[_clean_cell(cell) for cell in row] for row in rows if row and any(cell for cell in row)]
+    if len(cleaned_rows) < 2:
+        return None
+    width = max(len(row) for row in cleaned_rows)
+    cleaned_rows = [row + [''] * (width - len(row)) for row in cleaned_rows]
+
+    header_index, columns = _find_header(cleaned_rows)
+    body = cleaned_rows[header_index + 1:] if header_index is not None else cleaned_rows
+    if not body:
+        return None
+    frame = pd.DataFrame(body)
+    if header_index is None:
+        columns = _infer_columns(frame)
+    if 'amount' not in columns:
+        return None
+
+    if 'description' in columns:
+        description = frame[columns['description']]
+    else:
+        # Join every non-numeric cell of the row as the description.
+        used = set(columns.values())
+        text_columns = [column for column in frame.columns if column not in used]
+        description = frame[text_columns].agg(' '.join, axis=1) if text_columns else pd.Series([''] * len(frame))
+
+    items = pd.DataFrame({
+        'description': description.str.strip(),
+        'quantity': _to_number(frame[columns['quantity']]) if 'quantity' in columns else float('nan'),
+        'unit_price': _to_number(frame[columns['unit_price']]) if 'unit_price' in columns else float('nan'),
+        'amount': _to_number(frame[columns['amount']]),
+        'page': page,
+    })
+    items = items[items['amount'].notna()].copy()
+    if items.empty:
+        return None
+
+    labels = items['description']
+    items['kind'] = 'item'
+    items.loc[labels.str.contains(_TAX_LABEL), 'kind'] = 'tax'
+    items.loc[labels.str.contains(_DISCOUNT_LABEL), 'kind'] = 'discount'
+    items.loc[labels.str.contains(_SUBTOTAL_LABEL), 'kind'] = 'subtotal'
+    # "Total GST" is a tax line; "Total (incl. GST)" is the bill total.
+    plain_total = (
+        labels.str.contains(_TOTAL_LABEL)
+        & ~labels.str.contains(_SUBTOTAL_LABEL)
+        & ((items['kind'] == 'item') | labels.str.contains(_INCLUSIVE_LABEL))
+    )
+    items.loc[plain_total | labels.str.contains(_FINAL_TOTAL_LABEL), 'kind'] = 'total'
+    return items
+
+
+def find_stated_total(text: str) -> Optional[float]:
+    """Return the last labelled total amount in the text, or None."""
+    matches = _STATED_TOTAL_LINE.findall(text or '')
+    for value in reversed(matches):
+        try:
+            return float(value.replace(',', ''))
+        except ValueError:
+            continue
+    return None
+
+
+def reconcile_bill(tables: List[Dict[str, Any]], stated_total: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Build line items from page tables and check them against the stated total.
+
+    Args:
+        tables: [{'page': int, 'rows': [[cell, ...], ...]}, ...] from the table finder
+        stated_total: Total taken from the text when no table row states one
+
+    Returns:
+        Dict with line_items, items_total, tax_total, discount_total,
+        expected_total, stated_total, difference, reconciled and mismatched_lines
+    """
+    import numpy as np
+    import pandas as pd
+
+    frames = [parse_table(table['rows'], table.get('page')) for table in tables]
+    frames = [frame for frame in frames if frame is not None]
+    if not frames:
+        return {'line_items': [], 'reconciled': None, 'stated_total': stated_total}
+
+    bill = pd.concat(frames, ignore_index=True)
+    items = bill[bill['kind'] == 'item']
+
+    # Per-line check: quantity x unit price against the line amount.
+    computed = items['quantity'] * items['unit_price']
+    tolerance = np.maximum(LINE_TOLERANCE_ABS, items['amount'].abs() * LINE_TOLERANCE_REL)
+    checkable = computed.notna()
+    line_ok = (computed - items['amount']).abs() <= tolerance
+    line_check = np.where(checkable, np.where(line_ok, 'ok', 'mismatch'), 'unchecked')
+
+    items_total = float(items['amount'].sum())
+    tax_total = float(bill.loc[bill['kind'] == 'tax', 'amount'].sum())
+    discount_total = float(bill.loc[bill['kind'] == 'discount', 'amount'].abs().sum())
+    expected_total = items_total + tax_total - discount_total
+
+    stated_rows = bill.loc[bill['kind'] == 'total', 'amount']
+    if not stated_rows.empty:
+        # The last total row on a bill is the final payable amount.
+        stated_total = float(stated_rows.iloc[-1])
+
+    difference = None
+    reconciled = None
+    if stated_total is not None:
+        difference = round(expected_total - stated_total, 2)
+        reconciled = bool(abs(difference) <= max(LINE_TOLERANCE_ABS, abs(stated_total) * LINE_TOLERANCE_REL))
+
+    line_items = []
+    for row, check in zip(items.itertuples(index=False), line_check):
+        line_items.append({
+            'description': row.description,
+            'quantity': None if pd.isna(row.quantity) else float(row.quantity),
+            'unit_price': None if pd.isna(row.unit_price) else float(row.unit_price),
+            'amount': float(row.amount),
+            'page': None if pd.isna(row.page) else int(row.page),
+            'check': str(check),
+        })
+
+    return {
+        'line_items': line_items,
+        'items_total': round(items_total, 2),
+        'tax_total': round(tax_total, 2),
+        'discount_total': round(discount_total, 2),
+        'expected_total': round(expected_total, 2),
+        'stated_total': stated_total,
+        'difference': difference,
+        'reconciled': reconciled,
+        'mismatched_lines': int((line_check == 'mismatch').sum()),
+    }
+
+
+def _format_amount(value: Optional[float]) -> str:
+    if value is None:
+        return '-'
+    return f"{value:,.2f}"
+
+
+def format_bill_rows(bill: Dict[str, Any], max_rows: int = 40) -> str:
+    """
+    Compact one-line-per-item view of a reconciled bill for LLM prompts.
+
+    Args:
+        bill: Output of reconcile_bill
+        max_rows: Line items to include before summarizing the rest
+
+    Returns:
+        Text block, or "" when the bill has no line items
+    """
+    line_items = bill.get('line_items') or []
+    if not line_items:
+        return ''
+
+    lines = ['Bill line items (description | qty x rate = amount):']
+    for item in line_items[:max_rows]:
+        if item['quantity'] is not None and item['unit_price'] is not None:
+            math = f"{item['quantity']:g} x {_format_amount(item['unit_price'])} = {_format_amount(item['amount'])}"
+        else:
+            math = _format_amount(item['amount'])
+        flag = ' [qty x rate mismatch]' if item['check'] == 'mismatch' else ''
+        page = f" (p{item['page']})" if item.get('page') else ''
+        lines.append(f"- {item['description'] or 'Item'} | {math}{flag}{page}")
+    if len(line_items) > max_rows:
+        remaining = sum(item['amount'] for item in line_items[max_rows:])
+        lines.append(f"- ... {len(line_items) - max_rows} more items totalling {_format_amount(remaining)}")
+
+    lines.append(
+        f"Items total {_format_amount(bill.get('items_total'))}, tax {_format_amount(bill.get('tax_total'))}, "
+        f"discount {_format_amount(bill.get('discount_total'))}, expected {_format_amount(bill.get('expected_total'))}"
+    )
+    if bill.get('stated_total') is not None:
+        status = 'matches' if bill.get('reconciled') else f"differs by {_format_amount(bill.get('difference'))}"
+        lines.append(f"Stated bill total {_format_amount(bill['stated_total'])} ({status})")
+    return '\n'.join(lines)
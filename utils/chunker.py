@@ -0,0 +1,222 @@
+"""
+Structure-aware text chunker.
+Splits text into chunks under a token budget without cutting through words,
+sentences, paragraphs or table rows, and never across the "--- Page N ---"
+markers written by extract_text_from_pdf. Used for uploaded documents and for
+the knowledge-base index.
+"""
+
+import re
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Union
+
+# MiniLM truncates inputs at 256 word pieces; stay just under it.
+DEFAULT_MAX_TOKENS = 240
+
+PAGE_MARKER_PATTERN = re.compile(r'^--- Page (\d+) ---$')
+# Two or more cells separated by a tab, a run of spaces or a pipe.
+_TABLE_ROW_PATTERN = re.compile(r'\S(?:\t| {2,}| ?\| ?)\S.*(?:\t| {2,}| ?\| ?)\S|\S(?:\t| {3,})\S')
+_SENTENCE_SPLIT_PATTERN = re.compile(r'(?<=[.!?।])\s+')
+
+
+class Block(NamedTuple):
+    kind: str                      # "paragraph", "table_row" or "page"
+    text: str
+    page: Optional[int]
+    table_header: Optional[str] = None
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token), no tokenizer needed."""
+    return (len(text) + 3) // 4
+
+
+def _iter_lines(source: Union[str, Iterable[str]]) -> Iterator[str]:
+    if not isinstance(source, str):
+        for line in source:
+            yield line.rstrip('\r\n')
+        return
+    start = 0
+    while True:
+        end = source.find('\n', start)
+        if end == -1:
+            yield source[start:]
+            return
+        yield source[start:end]
+        start = end + 1
+
+
+def iter_blocks(source: Union[str, Iterable[str]]) -> Iterator[Block]:
+    """
+    Group lines into paragraphs and table rows, tracking the current page.
+
+    Args:
+        source: Text, or any iterable of lines (e.g. an open file)
+
+    Yields:
+        Block tuples; a "page" block marks the start of each new page
+    """
+    page: Optional[int] = None
+    paragraph: List[str] = []
+    table_header: Optional[str] = None
+
+    for line in _iter_lines(source):
+        stripped = line.strip()
+        marker = PAGE_MARKER_PATTERN.match(stripped)
+        if marker:
+            if paragraph:
+                yield Block('paragraph', '\n'.join(paragraph), page)
+                paragraph = []
+            table_header = None
+            page = int(marker.group(1))
+            yield Block('page', '', page)
+            continue
+
+        if not stripped:
+            if paragraph:
+                yield Block('paragraph', '\n'.join(paragraph), page)
+                paragraph = []
+            table_header = None
+            continue
+
+        if _TABLE_ROW_PATTERN.search(stripped):
+            if paragraph:
+                yield Block('paragraph', '\n'.join(paragraph), page)
+                paragraph = []
+            yield Block('table_row', stripped, page, table_header)
+            if table_header is None:
+                table_header = stripped
+            continue
+
+        table_header = None
+        paragraph.append(stripped)
+
+    if paragraph:
+        yield Block('paragraph', '\n'.join(paragraph), page)
+
+
+def _split_oversized(text: str, max_tokens: int) -> Iterator[str]:
+    """Split a paragraph that exceeds the budget at sentences, then at words."""
+    pieces: List[str] = []
+    for sentence in _SENTENCE_SPLIT_PATTERN.split(text):
+        if estimate_tokens(sentence) <= max_tokens:
+            pieces.append(sentence)
+            continue
+        words: List[str] = []
+        for word in sentence.split():
+            if words and estimate_tokens(' '.join(words + [word])) > max_tokens:
+                pieces.append(' '.join(words))
+                words = []
+            words.append(word)
+        if words:
+            pieces.append(' '.join(words))
+
+    current = ''
+    for piece in pieces:
+        candidate = f"{current} {piece}" if current else piece
+        if current and estimate_tokens(candidate) > max_tokens:
+            yield current
+            current = piece
+        else:
+            current = candidate
+    if current:
+        yield current
+
+
+def _is_heading(text: str) -> bool:
+    return '\n' not in text and len(text) <= 80 and not text.rstrip().endswith(('.', ',', ';'))
+
+
+def iter_chunks(
+    source: Union[str, Iterable[str]],
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream chunks of at most max_tokens (estimated) from text or lines.
+
+    Paragraphs and table rows are packed greedily; a chunk ends at a page
+    marker, before a unit that would overflow the budget, and never in the
+    middle of a word. Table rows continued in a new chunk get the table's
+    header row repeated, and a trailing heading moves to the next chunk with
+    the paragraph it introduces.
+
+    Args:
+        source: Text, or any iterable of lines
+        max_tokens: Token budget per chunk
+
+    Yields:
+        {'text': str, 'page': int | None, 'tokens': int}
+    """
+    parts: List[str] = []
+    kinds: List[str] = []
+    page: Optional[int] = None
+    # Joiners are one or two characters; count each as a token to stay safe.
+    used_tokens = 0
+
+    def append(text: str, kind: str) -> None:
+        nonlocal used_tokens
+        parts.append(text)
+        kinds.append(kind)
+        used_tokens += estimate_tokens(text) + 1
+
+    def flush(keep_heading: bool = False) -> Optional[Dict[str, Any]]:
+        nonlocal used_tokens
+        carried = None
+        if keep_heading and len(parts) > 1 and kinds[-1] == 'paragraph' and _is_heading(parts[-1]):
+            carried = parts.pop()
+            kinds.pop()
+        chunk = None
+        if parts:
+            text = parts[0]
+            for index in range(1, len(parts)):
+                joiner = '\n' if kinds[index] == kinds[index - 1] == 'table_row' else '\n\n'
+                text += joiner + parts[index]
+            chunk = {'text': text, 'page': page, 'tokens': estimate_tokens(text)}
+        parts.clear()
+        kinds.clear()
+        used_tokens = 0
+        if carried is not None:
+            append(carried, 'paragraph')
+        return chunk
+
+    for block in iter_blocks(source):
+        if block.kind == 'page':
+            chunk = flush()
+            if chunk:
+                yield chunk
+            page = block.page
+            continue
+
+        units = [block.text]
+        if estimate_tokens(block.text) > max_tokens:
+            units = list(_split_oversized(block.text, max_tokens))
+
+        for unit in units:
+            unit_tokens = estimate_tokens(unit)
+            if parts and used_tokens + unit_tokens > max_tokens:
+                # Headings travel with the paragraph or table they introduce.
+                chunk = flush(keep_heading=block.kind == 'paragraph' or block.table_header is None)
+                if chunk:
+                    yield chunk
+                if parts and used_tokens + unit_tokens > max_tokens:
+                    # The carried heading does not fit with this unit either.
+                    chunk = flush()
+                    if chunk:
+                        yield chunk
+                header = block.table_header
+                if (
+                    block.kind == 'table_row'
+                    and header
+                    and not parts
+                    and estimate_tokens(header) + unit_tokens + 2 <= max_tokens
+                ):
+                    append(header, 'table_row')
+            append(unit, block.kind)
+
+    chunk = flush()
+    if chunk:
+        yield chunk
+
+
+def chunk_text(source: Union[str, Iterable[str]], max_tokens: int = DEFAULT_MAX_TOKENS) -> List[Dict[str, Any]]:
+    """List version of iter_chunks."""
+    return list(iter_chunks(source, max_tokens=max_tokens))
@@ -3,53 +3,550 @@ Document Processing Module
 Handles PDF and image text extraction with OCR support.
 """
 
+import functools
+import multiprocessing
 import os
 import logging
-from typing import Optional, Dict, Any
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Optional, Dict, Any, Callable, Iterator
 import re
 
+from utils.keyword_matcher import KeywordMatcher
+
 logger = logging.getLogger(__name__)
 
+# Bump whenever extraction or analysis output changes so cached results are not reused.
+EXTRACTOR_VERSION = "4"
+
+# Page-parallel PDF extraction settings
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "4"))
+PDF_FAST_MIN_CHARS = 20
+
+# OCR fallback for scanned pages (no text layer)
+PDF_OCR_ENABLED = os.getenv("PDF_OCR_ENABLED", "true").strip().lower() in {"1", "true", "yes", "on"}
+OCR_DPI = int(os.getenv("OCR_DPI", "300"))
+OCR_MAX_SIDE_PX = int(os.getenv("OCR_MAX_SIDE_PX", "4000"))
+# Low-DPI scans are only enlarged when short enough for text to be too small for
+# Tesseract, and by at most OCR_MAX_UPSCALE: pixel count grows with its square.
+OCR_UPSCALE_BELOW_PX = int(os.getenv("OCR_UPSCALE_BELOW_PX", "1600"))
+OCR_MAX_UPSCALE = 2.0
+PDF_OCR_MIN_CHARS = 5
+
+_pdf_pool = None
+_pdf_pool_workers = 0
+_pdf_pool_lock = threading.Lock()
+
+# PDFium is not thread-safe and the handle cache below is shared, so all in-process
+# PDF library access is serialized: document jobs run on several API threads. Pool
+# workers are single-threaded and never contend for it.
+_pdf_library_lock = threading.RLock()
+
+# Per-process cache of open documents, so page tasks in a worker reuse one parse.
+# Keyed by (engine, path, mtime, size): upload temp paths can be reused for a new file.
+_open_documents: "OrderedDict[tuple, Any]" = OrderedDict()
+_MAX_OPEN_DOCUMENTS = 4
+
+
+def _holding_pdf_lock(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with _pdf_library_lock:
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def _has_module(name: str) -> bool:
+    try:
+        __import__(name)
+        return True
+    except ImportError:
+        return False
+
+
+def _close_quietly(document) -> None:
+    try:
+        document.close()
+    except Exception:
+        pass
+
+
+def _file_signature(pdf_path: str) -> Optional[tuple]:
+    try:
+        stat = os.stat(pdf_path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _close_stale() -> None:
+    """Close handles whose file was deleted or replaced (finished or reused upload temp files)."""
+    for key in list(_open_documents):
+        if _file_signature(key[1]) != key[2:]:
+            _close_quietly(_open_documents.pop(key))
+
+
+@_holding_pdf_lock
+def _open_cached(pdf_path: str, engine: str):
+    stat = os.stat(pdf_path)
+    key = (engine, pdf_path, stat.st_mtime_ns, stat.st_size)
+    document = _open_documents.get(key)
+    if document is not None:
+        _open_documents.move_to_end(key)
+        return document
+
+    _close_stale()
+
+    if engine == "pdfium":
+        import pypdfium2 as pdfium
+        document = pdfium.PdfDocument(pdf_path)
+    else:
+        import pdfplumber
+        document = pdfplumber.open(pdf_path)
+    _open_documents[key] = document
+
+    # Uploads are temp files; keep only the most recently used documents open.
+    while len(_open_documents) > _MAX_OPEN_DOCUMENTS:
+        _, stale = _open_documents.popitem(last=False)
+        _close_quietly(stale)
+    return document
+
+
+@_holding_pdf_lock
+def _close_cached(pdf_path: str) -> None:
+    for key in [cached for cached in _open_documents if cached[1] == pdf_path]:
+        _close_quietly(_open_documents.pop(key))
+
+
+def _looks_tabular(text: str) -> bool:
+    """Heuristic: many lines with several numeric columns need layout-aware extraction."""
+    lines = [line for line in text.splitlines() if line.strip()]
+    if len(lines) < 5:
+        return False
+    numeric_lines = sum(1 for line in lines if len(re.findall(r'\d[\d,.]*', line)) >= 3)
+    return numeric_lines / len(lines) >= 0.3
+
+
+@_holding_pdf_lock
+def _fast_page_text(pdf_path: str, page_index: int) -> Optional[str]:
+    """Text-layer extraction with pypdfium2 (C library); None when unavailable."""
+    try:
+        document = _open_cached(pdf_path, "pdfium")
+    except ImportError:
+        return None
+    page = document[page_index]
+    text_page = page.get_textpage()
+    try:
+        return text_page.get_text_range() or ""
+    finally:
+        text_page.close()
+        page.close()
+
+
+@_holding_pdf_lock
+def _layout_page_text(pdf_path: str, page_index: int) -> str:
+    """Layout-aware extraction with pdfplumber (slow, pure Python)."""
+    document = _open_cached(pdf_path, "pdfplumber")
+    page = document.pages[page_index]
+    try:
+        return page.extract_text() or ""
+    finally:
+        page.flush_cache()
+
+
+def _otsu_threshold(histogram: list[int]) -> int:
+    """Otsu's binarization threshold from a 256-bin grayscale histogram."""
+    total = sum(histogram)
+    if not total:
+        return 128
+    weighted_total = sum(level * count for level, count in enumerate(histogram))
+    background_weight = 0
+    background_sum = 0
+    best_threshold = 128
+    best_variance = -1.0
+    for level, count in enumerate(histogram):
+        background_weight += count
+        if background_weight == 0:
+            continue
+        foreground_weight = total - background_weight
+        if foreground_weight == 0:
+            break
+        background_sum += level * count
+        background_mean = background_sum / background_weight
+        foreground_mean = (weighted_total - background_sum) / foreground_weight
+        variance = background_weight * foreground_weight * (background_mean - foreground_mean) ** 2
+        if variance > best_variance:
+            best_variance = variance
+            best_threshold = level
+    return best_threshold
+
+
+def preprocess_for_ocr(image, source_dpi: Optional[float] = None):
+    """
+    Prepare an image for Tesseract: DPI normalization, grayscale, binarization.
+
+    High-DPI images are scaled down to OCR_DPI. Low-DPI images are scaled up
+    only when shorter than OCR_UPSCALE_BELOW_PX, and by at most OCR_MAX_UPSCALE.
+
+    Args:
+        image: PIL image
+        source_dpi: Known resolution of the image (default: read from image info)
+
+    Returns:
+        1-bit PIL image at roughly OCR_DPI (less for capped upscales)
+    """
+    from PIL import Image
+
+    if source_dpi is None:
+        dpi_info = image.info.get('dpi')
+        source_dpi = float(dpi_info[0]) if dpi_info and dpi_info[0] else None
+
+    scale = 1.0
+    if source_dpi and abs(source_dpi - OCR_DPI) / OCR_DPI > 0.15:
+        scale = OCR_DPI / source_dpi
+        if scale > 1.0:
+            scale = min(scale, OCR_MAX_UPSCALE) if image.height < OCR_UPSCALE_BELOW_PX else 1.0
+    longest_side = max(image.size) * scale
+    if longest_side > OCR_MAX_SIDE_PX:
+        scale *= OCR_MAX_SIDE_PX / longest_side
+    if abs(scale - 1.0) > 0.01:
+        new_size = (max(1, int(image.width * scale)), max(1, int(image.height * scale)))
+        image = image.resize(new_size, Image.LANCZOS)
+
+    grayscale = image.convert('L')
+    threshold = _otsu_threshold(grayscale.histogram())
+    return grayscale.point(lambda value: 255 if value > threshold else 0, mode='1')
+
+
+@_holding_pdf_lock
+def _rasterize_page(pdf_path: str, page_index: int):
+    """Render a PDF page to a grayscale PIL image at OCR_DPI."""
+    try:
+        document = _open_cached(pdf_path, "pdfium")
+        page = document[page_index]
+        try:
+            return page.render(scale=OCR_DPI / 72, grayscale=True).to_pil()
+        finally:
+            page.close()
+    except ImportError:
+        document = _open_cached(pdf_path, "pdfplumber")
+        return document.pages[page_index].to_image(resolution=OCR_DPI).original
+
+
+def _ocr_page(pdf_path: str, page_index: int, ocr_lang: str) -> tuple[str, Dict[str, float]]:
+    """Rasterize, preprocess and OCR one page; returns text and stage timings."""
+    import pytesseract
+
+    # Pages already run in parallel; keep each Tesseract process single-threaded.
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+    started = time.perf_counter()
+    image = _rasterize_page(pdf_path, page_index)
+    rasterized = time.perf_counter()
+    prepared = preprocess_for_ocr(image, source_dpi=OCR_DPI)
+    preprocessed = time.perf_counter()
+    text = pytesseract.image_to_string(prepared, lang=ocr_lang)
+    finished = time.perf_counter()
+    return text, {
+        'raster_ms': round((rasterized - started) * 1000, 2),
+        'preprocess_ms': round((preprocessed - rasterized) * 1000, 2),
+        'ocr_ms': round((finished - preprocessed) * 1000, 2),
+    }
+
+
+def _extract_page(pdf_path: str, page_index: int, ocr_lang: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Extract one page: fast text layer first, pdfplumber only when layout matters,
+    Tesseract OCR when the page has no text layer and ocr_lang is given.
+    """
+    started = time.perf_counter()
+    engine = "pdfium"
+    text = None
+    timings: Dict[str, float] = {}
+    error = None
+    try:
+        text = _fast_page_text(pdf_path, page_index)
+        if text is None or len(text.strip()) < PDF_FAST_MIN_CHARS or _looks_tabular(text):
+            engine = "pdfplumber"
+            text = _layout_page_text(pdf_path, page_index)
+    except ImportError:
+        error = "pdfplumber not installed"
+    except Exception as e:
+        error = str(e)[:100]
+
+    if ocr_lang and len((text or "").strip()) < PDF_OCR_MIN_CHARS:
+        try:
+            text, timings = _ocr_page(pdf_path, page_index, ocr_lang)
+            engine = "tesseract"
+            error = None
+        except ImportError:
+            error = "pytesseract not installed"
+        except Exception as e:
+            error = f"OCR failed: {str(e)[:100]}"
+
+    return {
+        'page': page_index + 1,
+        'text': (text or "").strip(),
+        'engine': engine,
+        'duration_ms': round((time.perf_counter() - started) * 1000, 2),
+        **timings,
+        'error': error,
+    }
+
+
+@_holding_pdf_lock
+def _count_pdf_pages(pdf_path: str) -> int:
+    try:
+        import pypdfium2 as pdfium
+
+        document = pdfium.PdfDocument(pdf_path)
+        try:
+            return len(document)
+        finally:
+            document.close()
+    except ImportError:
+        import pdfplumber
+
+        with pdfplumber.open(pdf_path) as pdf:
+            return len(pdf.pages)
+
+
+def _get_pdf_pool(workers: int) -> ProcessPoolExecutor:
+    """Shared process pool for page extraction (recreated if the worker count changes)."""
+    global _pdf_pool, _pdf_pool_workers
+    with _pdf_pool_lock:
+        if _pdf_pool is None or _pdf_pool_workers != workers:
+            if _pdf_pool is not None:
+                _pdf_pool.shutdown(wait=False)
+            # Spawn, not fork: the API process is multithreaded, and a forked child can
+            # inherit locks (PDFium's, logging's, this module's) held by another thread.
+            _pdf_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pdf_pool_workers = workers
+        return _pdf_pool
+
+
+def iter_pdf_pages(
+    pdf_path: str,
+    workers: Optional[int] = None,
+    ocr_lang: Optional[str] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Extract PDF pages in parallel and yield each page as soon as it finishes.
+
+    Pages are yielded in completion order, not page order, so downstream
+    chunking and analysis can start on early pages.
+    
+    Args:
+        pdf_path: Path to PDF file
+        workers: Process pool size (default: PDF_EXTRACT_WORKERS)
+        ocr_lang: Tesseract language for pages without a text layer (None disables OCR)
+    
+    Yields:
+        Dicts with page (1-based), text, engine, duration_ms and error;
+        OCR pages also carry raster_ms, preprocess_ms and ocr_ms
+    """
+    workers = max(1, workers or PDF_EXTRACT_WORKERS)
+    page_count = _count_pdf_pages(pdf_path)
+
+    if workers == 1 or page_count < PDF_PARALLEL_MIN_PAGES:
+        try:
+            for page_index in range(page_count):
+                yield _extract_page(pdf_path, page_index, ocr_lang)
+        finally:
+            _close_cached(pdf_path)
+        return
 
-def extract_text_from_pdf(pdf_path: str) -> str:
+    pool = _get_pdf_pool(workers)
+    futures = [pool.submit(_extract_page, pdf_path, page_index, ocr_lang) for page_index in range(page_count)]
+    try:
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def extract_pdf_pages(
+    pdf_path: str,
+    workers: Optional[int] = None,
+    ocr_lang: Optional[str] = 'eng',
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+) -> tuple[str, list[Dict[str, Any]]]:
     """
-    Extract text from PDF file.
+    Extract text from PDF file and return the individual pages alongside it.
     
     Args:
         pdf_path: Path to PDF file
+        workers: Page extraction processes (default: PDF_EXTRACT_WORKERS)
+        ocr_lang: OCR language for scanned pages (eng, hin, tel, tam, kan)
+        progress_callback: Called as (pages_done, page_count) after each page
     
     Returns:
-        Extracted text string
+        (extracted text or "Error: ..." message, page dicts from iter_pdf_pages sorted by page)
     """
     if not os.path.exists(pdf_path):
-        return "Error: PDF file not found."
+        return "Error: PDF file not found.", []
+    
+    if not _has_module("pdfplumber") and not _has_module("pypdfium2"):
+        return "Error: pdfplumber not installed. Run: pip install pdfplumber", []
     
     try:
-        import pdfplumber
-        
         logger.info(f"Extracting text from PDF: {pdf_path}")
-        text_content = []
-        
-        with pdfplumber.open(pdf_path) as pdf:
-            for page_num, page in enumerate(pdf.pages, 1):
-                page_text = page.extract_text()
-                if page_text:
-                    text_content.append(f"--- Page {page_num} ---\n{page_text}")
+        started = time.perf_counter()
+        effective_ocr_lang = ocr_lang if PDF_OCR_ENABLED else None
+        page_count = _count_pdf_pages(pdf_path) if progress_callback else 0
+        pages = []
+        for page in iter_pdf_pages(pdf_path, workers=workers, ocr_lang=effective_ocr_lang):
+            pages.append(page)
+            if progress_callback:
+                progress_callback(len(pages), page_count)
+        pages.sort(key=lambda item: item['page'])
         
+        text_content = [
+            f"--- Page {page['page']} ---\n{page['text']}"
+            for page in pages
+            if page['text']
+        ]
         full_text = "\n\n".join(text_content)
         
         if not full_text.strip():
-            return "Error: Could not extract text from PDF. The file might be scanned images."
+            if effective_ocr_lang and any(page['error'] == "pytesseract not installed" for page in pages):
+                return "Error: Could not extract text from PDF. Scanned pages need pytesseract: pip install pytesseract", pages
+            return "Error: Could not extract text from PDF. The file might be scanned images.", pages
         
-        logger.info(f"Extracted {len(full_text)} characters from PDF")
-        return full_text.strip()
-    
-    except ImportError:
-        return "Error: pdfplumber not installed. Run: pip install pdfplumber"
+        layout_pages = sum(1 for page in pages if page['engine'] == 'pdfplumber')
+        ocr_pages = sum(1 for page in pages if page['engine'] == 'tesseract')
+        logger.info(
+            f"Extracted {len(full_text)} characters from {len(pages)} PDF pages "
+            f"({layout_pages} via pdfplumber, {ocr_pages} via OCR) "
+            f"in {(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+        return full_text.strip(), pages
     
     except Exception as e:
         logger.error(f"PDF extraction error: {str(e)}", exc_info=True)
-        return f"Error: Could not process PDF. {str(e)[:100]}"
+        return f"Error: Could not process PDF. {str(e)[:100]}", []
+
+
+def extract_text_from_pdf(pdf_path: str, workers: Optional[int] = None, ocr_lang: Optional[str] = 'eng') -> str:
+    """
+    Extract text from PDF file, OCRing pages that have no text layer.
+    
+    Args:
+        pdf_path: Path to PDF file
+        workers: Page extraction processes (default: PDF_EXTRACT_WORKERS)
+        ocr_lang: OCR language for scanned pages (None disables OCR)
+    
+    Returns:
+        Extracted text string
+    """
+    text, _ = extract_pdf_pages(pdf_path, workers=workers, ocr_lang=ocr_lang)
+    return text
+
+
+# Ruled bills use drawn cell borders; many hospital statements only align columns.
+_TABLE_SETTINGS_LINES = {"vertical_strategy": "lines", "horizontal_strategy": "lines"}
+_TABLE_SETTINGS_TEXT = {"vertical_strategy": "text", "horizontal_strategy": "text", "min_words_vertical": 2}
+
+
+def _extract_page_tables(pdf_path: str, page_index: int) -> Dict[str, Any]:
+    """Run pdfplumber's table finder on one page (bordered tables first, then text alignment)."""
+    started = time.perf_counter()
+    tables: list = []
+    strategy = None
+    error = None
+    try:
+        with _pdf_library_lock:
+            document = _open_cached(pdf_path, "pdfplumber")
+            page = document.pages[page_index]
+            try:
+                for strategy, settings in (("lines", _TABLE_SETTINGS_LINES), ("text", _TABLE_SETTINGS_TEXT)):
+                    tables = [table for table in page.extract_tables(settings) if len(table) >= 2]
+                    if tables:
+                        break
+            finally:
+                page.flush_cache()
+    except Exception as e:
+        error = str(e)[:200]
+    return {
+        'page': page_index + 1,
+        'tables': tables,
+        'strategy': strategy if tables else None,
+        'duration_ms': round((time.perf_counter() - started) * 1000, 2),
+        'error': error,
+    }
+
+
+def extract_pdf_tables(pdf_path: str, workers: Optional[int] = None) -> list[Dict[str, Any]]:
+    """
+    Find tables on every PDF page, in parallel across pages.
+
+    Args:
+        pdf_path: Path to PDF file
+        workers: Process pool size (default: PDF_EXTRACT_WORKERS)
+
+    Returns:
+        [{'page': int, 'rows': [[cell, ...], ...]}, ...] in page order; empty
+        when pdfplumber is missing or no page has a table
+    """
+    if not os.path.exists(pdf_path) or not _has_module("pdfplumber"):
+        return []
+
+    started = time.perf_counter()
+    workers = max(1, workers or PDF_EXTRACT_WORKERS)
+    page_count = _count_pdf_pages(pdf_path)
+    if workers == 1 or page_count < PDF_PARALLEL_MIN_PAGES:
+        try:
+            results = [_extract_page_tables(pdf_path, page_index) for page_index in range(page_count)]
+        finally:
+            _close_cached(pdf_path)
+    else:
+        pool = _get_pdf_pool(workers)
+        results = list(pool.map(_extract_page_tables, [pdf_path] * page_count, range(page_count)))
+
+    tables = [
+        {'page': result['page'], 'rows': rows}
+        for result in results
+        for rows in result['tables']
+    ]
+    logger.info(
+        f"Found {len(tables)} tables on {page_count} PDF pages "
+        f"in {(time.perf_counter() - started) * 1000:.0f} ms"
+    )
+    return tables
+
+
+def analyze_bill_tables(pdf_path: str, document_text: str = '', workers: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """
+    Extract bill/invoice line items from PDF tables and reconcile them with the total.
+
+    Args:
+        pdf_path: Path to PDF file
+        document_text: Extracted text, searched for a stated total outside the tables
+        workers: Process pool size for the table finder
+
+    Returns:
+        reconcile_bill output, or None when pandas is missing or no line items were found
+    """
+    try:
+        from utils.bill_tables import find_stated_total, reconcile_bill
+        import pandas  # noqa: F401
+    except ImportError:
+        logger.warning("pandas not installed; skipping bill line-item extraction")
+        return None
+
+    try:
+        tables = extract_pdf_tables(pdf_path, workers=workers)
+        if not tables:
+            return None
+        bill = reconcile_bill(tables, stated_total=find_stated_total(document_text))
+    except Exception as e:
+        logger.error(f"Bill table extraction error: {str(e)}", exc_info=True)
+        return None
+    return bill if bill['line_items'] else None
 
 
 def extract_text_from_image(image_path: str, lang: str = 'eng') -> str:
@@ -72,8 +569,8 @@ def extract_text_from_image(image_path: str, lang: str = 'eng') -> str:
         
         logger.info(f"Extracting text from image: {image_path} (lang={lang})")
         
-        # Open image
-        image = Image.open(image_path)
+        # Open image and normalize it for Tesseract
+        image = preprocess_for_ocr(Image.open(image_path))
         
         # Perform OCR
         text = pytesseract.image_to_string(image, lang=lang)
@@ -96,17 +593,23 @@ def extract_text_from_image(image_path: str, lang: str = 'eng') -> str:
         return f"Error: Could not process image. {str(e)[:100]}"
 
 
-def process_document(file_path: str, file_type: str, ocr_lang: str = 'eng') -> Dict[str, Any]:
+def process_document(
+    file_path: str,
+    file_type: str,
+    ocr_lang: str = 'eng',
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+) -> Dict[str, Any]:
     """
     Process uploaded document and extract text.
     
     Args:
         file_path: Path to uploaded file
         file_type: File type (pdf, image)
-        ocr_lang: OCR language for images
+        ocr_lang: OCR language for images and scanned PDF pages
+        progress_callback: Called as (pages_done, page_count) during PDF extraction
     
     Returns:
-        Dictionary with extracted text and metadata
+        Dictionary with extracted text, page_texts and metadata (PDFs include page_metrics)
     """
     result = {
         'success': False,
@@ -118,9 +621,16 @@ def process_document(file_path: str, file_type: str, ocr_lang: str = 'eng') -> D
     
     try:
         if file_type == 'pdf':
-            text = extract_text_from_pdf(file_path)
+            text, pages = extract_pdf_pages(
+                file_path,
+                ocr_lang=ocr_lang,
+                progress_callback=progress_callback,
+            )
+            result['page_metrics'] = [{key: value for key, value in page.items() if key != 'text'} for page in pages]
+            page_texts = [{'page': page['page'], 'text': page['text']} for page in pages if page['text']]
         elif file_type == 'image':
             text = extract_text_from_image(file_path, lang=ocr_lang)
+            page_texts = [{'page': 1, 'text': text}]
         else:
             result['error'] = f"Unsupported file type: {file_type}"
             return result
@@ -131,6 +641,7 @@ def process_document(file_path: str, file_type: str, ocr_lang: str = 'eng') -> D
         
         result['success'] = True
         result['text'] = text
+        result['page_texts'] = page_texts
         result['char_count'] = len(text)
         logger.info(f"Document processed successfully: {result['file_name']}")
         
@@ -141,6 +652,110 @@ def process_document(file_path: str, file_type: str, ocr_lang: str = 'eng') -> D
     return result
 
 
+# Document type hints, matched with one keyword automaton pass.
+CLAIM_TYPE_HINTS = {
+    'claim_form': ['claim form', 'claim number', 'claimant', 'incident date', 'loss date'],
+    'insurance_policy': ['policy', 'premium', 'coverage', 'sum insured', 'policy term'],
+    'medical_document': ['medical', 'prescription', 'diagnosis', 'hospital', 'doctor'],
+    'bill_invoice': ['invoice', 'bill', 'receipt', 'amount due', 'total amount'],
+}
+_TYPE_HINT_MATCHER = KeywordMatcher(CLAIM_TYPE_HINTS)
+
+# Every field, amount and date in one alternation over lowercased text. The
+# pattern opens with a single character class, so the regex engine skips every
+# position that cannot start a field; the lookbehind on each branch then picks
+# the alternative for that first character. Branches consume at most their
+# label and capture values in lookaheads, so overlapping fields are still seen.
+_CLAIM_FIELD_SCANNER_SOURCE = r"[pcin@+0-9₹$](?:" + "|".join([
+    r'(?<=p)olicy\s*(?:number|no\.?|#)\s*[:\-]?\s*(?=(?P<policy_number>[a-z0-9\-/]{5,}))',
+    r'(?<=c)laim\s*(?:number|no\.?|id|#)\s*[:\-]?\s*(?=(?P<claim_number>[a-z0-9\-/]{4,}))',
+    r'(?:(?<=c)laimant|(?<=i)nsured|(?<=n)ame)\s*[:\-]\s*(?=(?P<claimant_name>[a-z .]{3,60}))',
+    r'(?<=@)(?=(?P<email_domain>[a-z0-9.-]+\.[a-z]{2,}))',
+    r'(?<=\+)91[-\s]?(?=(?P<phone_plus>[6-9]\d{9}))',
+    r'(?<=9)1[-\s]?(?=(?P<phone_prefixed>[6-9]\d{9}))',
+    r'(?<=[6-9])(?=(?P<phone_tail>\d{9}))',
+    r'(?<=\d)(?=(?P<date_tail>\d?[/-]\d{1,2}[/-]\d{2,4}))',
+    r'(?<=[₹$])(?=(?P<amount_tail>\s*[\d,]+(?:\.\d{2})?))',
+]) + ")"
+_CLAIM_FIELD_SCANNER = re.compile(_CLAIM_FIELD_SCANNER_SOURCE)
+# For the rare text whose lowercase form changes length (offsets would drift).
+_CLAIM_FIELD_SCANNER_IGNORECASE = re.compile(_CLAIM_FIELD_SCANNER_SOURCE, flags=re.IGNORECASE)
+_EMAIL_LOCAL_CHARS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789._%+-")
+_PHONE_GROUPS = ('phone_plus', 'phone_prefixed', 'phone_tail')
+_LABELLED_FIELDS = ('policy_number', 'claim_number', 'claimant_name')
+
+
+def scan_claim_document(document_text: str) -> Dict[str, Any]:
+    """
+    Find claim fields, amounts and dates in a single pass over the text.
+
+    Args:
+        document_text: Extracted text from document
+
+    Returns:
+        {'fields': {name: (value, start)}, 'amounts': [(value, start)],
+         'dates': [(value, start)], 'type_scores': {doc_type: hint count}}
+        Each labelled field keeps its first occurrence with a non-blank value,
+        so a blank "Claimant:" line is skipped in favour of the next one (a
+        per-pattern re.search would stop at the blank one and give '').
+        Email and phone are the first match; amounts and dates are every
+        non-overlapping match in text order, as re.findall would return.
+    """
+    text = document_text or ''
+    text_lower = text.lower()
+    scanner = _CLAIM_FIELD_SCANNER
+    scan_text = text_lower
+    if len(text_lower) != len(text):
+        scanner = _CLAIM_FIELD_SCANNER_IGNORECASE
+        scan_text = text
+
+    fields: Dict[str, tuple] = {}
+    amounts: list = []
+    dates: list = []
+    amount_end = date_end = 0
+
+    for match in scanner.finditer(scan_text):
+        group = match.lastgroup
+        if group in _LABELLED_FIELDS:
+            if group not in fields:
+                value = text[match.start(group):match.end(group)].strip()
+                if value:
+                    fields[group] = (value, match.start(group))
+        elif group == 'email_domain':
+            if 'email' in fields:
+                continue
+            at = match.start()
+            local_start = at
+            while local_start > 0 and text[local_start - 1] in _EMAIL_LOCAL_CHARS:
+                local_start -= 1
+            if local_start < at:
+                fields['email'] = (text[local_start:match.end(group)], local_start)
+        elif group in _PHONE_GROUPS:
+            if 'phone' not in fields:
+                # The tail branch captures the nine digits after the first one.
+                value_start = match.start() if group == 'phone_tail' else match.start(group)
+                fields['phone'] = (text[value_start:match.end(group)], value_start)
+        elif group == 'date_tail':
+            # Skip matches inside the previous date, as re.findall would.
+            if match.start() >= date_end:
+                date_end = match.end(group)
+                dates.append((text[match.start():date_end], match.start()))
+        elif group == 'amount_tail':
+            if match.start() >= amount_end:
+                amount_end = match.end(group)
+                amounts.append((text[match.start():amount_end], match.start()))
+
+    type_scores = {doc_type: 0 for doc_type in CLAIM_TYPE_HINTS}
+    type_scores.update(_TYPE_HINT_MATCHER.distinct_counts(text_lower))
+
+    return {
+        'fields': fields,
+        'amounts': amounts,
+        'dates': dates,
+        'type_scores': type_scores,
+    }
+
+
 def analyze_claim_document(document_text: str) -> Dict[str, Any]:
     """
     Analyze insurance claim document and extract key information.
@@ -163,67 +778,31 @@ def analyze_claim_document(document_text: str) -> Dict[str, Any]:
         'verification_status': 'low_confidence',
     }
 
-    text = document_text or ''
-    text_lower = text.lower()
+    scan = scan_claim_document(document_text)
 
     # Detect document type with lightweight scoring.
-    type_hints = {
-        'claim_form': ['claim form', 'claim number', 'claimant', 'incident date', 'loss date'],
-        'insurance_policy': ['policy', 'premium', 'coverage', 'sum insured', 'policy term'],
-        'medical_document': ['medical', 'prescription', 'diagnosis', 'hospital', 'doctor'],
-        'bill_invoice': ['invoice', 'bill', 'receipt', 'amount due', 'total amount'],
-    }
-    type_scores = {}
-    for doc_type, hints in type_hints.items():
-        score = sum(1 for hint in hints if hint in text_lower)
-        type_scores[doc_type] = score
-
+    type_scores = scan['type_scores']
     best_type = max(type_scores, key=type_scores.get)
     best_score = type_scores[best_type]
     if best_score > 0:
         analysis['document_type'] = best_type
         analysis['document_type_confidence'] = min(1.0, best_score / 4.0)
 
-    def _extract_with_patterns(patterns: list[str]) -> str:
-        for pattern in patterns:
-            match = re.search(pattern, text, flags=re.IGNORECASE)
-            if match:
-                value = match.group(1).strip()
-                if value:
-                    return value
-        return ''
-
     # Structured extraction schema with simple confidence heuristics.
-    extracted_fields = {
-        'policy_number': _extract_with_patterns([
-            r'policy\s*(?:number|no\.?|#)\s*[:\-]?\s*([A-Z0-9\-/]{5,})',
-        ]),
-        'claim_number': _extract_with_patterns([
-            r'claim\s*(?:number|no\.?|id|#)\s*[:\-]?\s*([A-Z0-9\-/]{4,})',
-        ]),
-        'claimant_name': _extract_with_patterns([
-            r'(?:claimant|insured|name)\s*[:\-]\s*([A-Za-z .]{3,60})',
-        ]),
-        'email': _extract_with_patterns([
-            r'([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,})',
-        ]),
-        'phone': _extract_with_patterns([
-            r'(?:\+?91[-\s]?)?([6-9]\d{9})',
-        ]),
-    }
-
-    amounts = re.findall(r'₹\s*[\d,]+(?:\.\d{2})?|\$\s*[\d,]+(?:\.\d{2})?', text)
-    dates = re.findall(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}', text)
+    field_names = ['policy_number', 'claim_number', 'claimant_name', 'email', 'phone']
+    extracted_fields = {name: scan['fields'].get(name, ('', None)) for name in field_names}
 
-    extracted_fields['invoice_total'] = amounts[0] if amounts else ''
-    extracted_fields['incident_date'] = dates[0] if dates else ''
+    amounts = scan['amounts']
+    dates = scan['dates']
+    extracted_fields['invoice_total'] = amounts[0] if amounts else ('', None)
+    extracted_fields['incident_date'] = dates[0] if dates else ('', None)
 
-    analysis['detected_amounts'] = amounts[:5]
-    analysis['detected_dates'] = dates[:5]
+    analysis['detected_amounts'] = [value for value, _ in amounts[:5]]
+    analysis['detected_dates'] = [value for value, _ in dates[:5]]
 
     # Add confidence metadata per extracted field.
     field_confidence = {}
-    for field_name, value in extracted_fields.items():
+    for field_name, (value, _) in extracted_fields.items():
         confidence = 0.0
         if value:
             if field_name in {'policy_number', 'claim_number'}:
@@ -238,10 +817,11 @@ def analyze_claim_document(document_text: str) -> Dict[str, Any]:
 
     analysis['extracted_fields'] = {
         key: {
-            'value': extracted_fields[key],
+            'value': value,
             'confidence': field_confidence[key],
+            'position': position,
         }
-        for key in extracted_fields
+        for key, (value, position) in extracted_fields.items()
     }
 
     # Build key fields and missing info lists to preserve compatibility.
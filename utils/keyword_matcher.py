@@ -0,0 +1,329 @@
+"""
+Multi-keyword matcher.
+Finds every occurrence of a fixed keyword set in one pass over the text using an
+Aho-Corasick automaton (pyahocorasick) when installed, or a single precompiled
+regex that dispatches on the first character otherwise.
+
+KEYWORD_ENGINE holds the keyword groups of every query classifier (intent,
+finance, chat domain, insurance hints) in one matcher, so a chat message is
+normalized and scanned once and each classifier reads its hits by label.
+Typo corrections belong to the namespace that registered them; only when they
+change a word of the message are that namespace's groups scanned again.
+"""
+
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, Optional, Set, Tuple, Union
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+# How a keyword occurrence sits in the surrounding text, weakest first.
+MATCH_INNER = 0   # embedded in a longer word ("claim" in "disclaimer")
+MATCH_PREFIX = 1  # starts a word but runs on ("claim" in "claims")
+MATCH_WORD = 2    # a whole word or phrase
+
+
+def _is_word_char(char: str) -> bool:
+    # Indic vowel signs and viramas are combining marks (Mn/Mc), not alphanumeric,
+    # but they sit inside a word.
+    if char.isalnum() or char == "_":
+        return True
+    return char > "\x7f" and unicodedata.category(char)[0] == "M"
+
+
+def match_kind(text: str, start: int, end: int) -> int:
+    """Classify the occurrence text[start:end] as MATCH_INNER, MATCH_PREFIX or MATCH_WORD."""
+    if start > 0 and _is_word_char(text[start - 1]):
+        return MATCH_INNER
+    if end < len(text) and _is_word_char(text[end]):
+        return MATCH_PREFIX
+    return MATCH_WORD
+
+
+class KeywordMatcher:
+    """
+    Match a fixed set of lowercase keywords, each optionally tagged with labels.
+
+    Args:
+        keywords: Iterable of keywords, or {label: [keywords]} to group them
+        word_boundary: Only count matches not embedded in a longer word
+        use_automaton: Use pyahocorasick when available (default True)
+    """
+
+    def __init__(
+        self,
+        keywords: Union[Iterable[str], Dict[str, Iterable[str]]],
+        word_boundary: bool = False,
+        use_automaton: bool = True,
+    ):
+        self.word_boundary = word_boundary
+        self.labels_by_keyword: Dict[str, Set[str]] = defaultdict(set)
+        if isinstance(keywords, dict):
+            for label, words in keywords.items():
+                for word in words:
+                    self.labels_by_keyword[word.lower()].add(label)
+        else:
+            for word in keywords:
+                self.labels_by_keyword[word.lower()].add(word.lower())
+        self.labels_by_keyword.pop("", None)
+        self.keywords = sorted(self.labels_by_keyword, key=len, reverse=True)
+
+        self._automaton = None
+        if use_automaton and ahocorasick is not None and self.keywords:
+            automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                automaton.add_word(keyword, keyword)
+            automaton.make_automaton()
+            self._automaton = automaton
+
+        self._pattern = self._compile_dispatch_pattern(self.keywords)
+        # The regex reports the longest keyword at each start; shorter keywords
+        # that are prefixes of it start at the same position.
+        keyword_set = set(self.keywords)
+        self._prefixes = {
+            keyword: [keyword[:size] for size in range(len(keyword) - 1, 0, -1) if keyword[:size] in keyword_set]
+            for keyword in self.keywords
+        }
+
+    @staticmethod
+    def _compile_dispatch_pattern(keywords: list) -> Optional["re.Pattern[str]"]:
+        # One branch per first character, each starting with a literal, so the
+        # regex engine can skip positions whose character starts no keyword.
+        by_first_char: Dict[str, list] = defaultdict(list)
+        for keyword in keywords:
+            by_first_char[keyword[0]].append(keyword[1:])
+        if not by_first_char:
+            return None
+        branches = []
+        for first_char, tails in by_first_char.items():
+            tail_alternation = "|".join(re.escape(tail) for tail in tails)
+            branches.append(f"{re.escape(first_char)}(?=({tail_alternation}))")
+        return re.compile("|".join(branches))
+
+    def _iter_occurrences(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        if self._automaton is not None:
+            for end_index, keyword in self._automaton.iter(text):
+                yield end_index - len(keyword) + 1, end_index + 1, keyword
+            return
+
+        for match in self._pattern.finditer(text):
+            start = match.start()
+            keyword = text[start] + match.group(match.lastindex)
+            for candidate in (keyword, *self._prefixes[keyword]):
+                yield start, start + len(candidate), candidate
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """
+        Yield (start, end, keyword) for every keyword occurrence, overlaps included.
+
+        Text is expected to be lowercased already; matches are reported in
+        end-position order by the automaton and start-position order by the regex.
+        """
+        if not text or not self.keywords:
+            return
+        for start, end, keyword in self._iter_occurrences(text):
+            if not self.word_boundary or match_kind(text, start, end) == MATCH_WORD:
+                yield start, end, keyword
+
+    def match_kinds(self, text: str) -> Dict[str, int]:
+        """
+        Return {keyword: strongest match kind} for every keyword present.
+
+        Ignores word_boundary: embedded occurrences are reported as MATCH_INNER
+        so callers can weigh whole-word and partial hits differently.
+        """
+        kinds: Dict[str, int] = {}
+        if not text or not self.keywords:
+            return kinds
+        for start, end, keyword in self._iter_occurrences(text):
+            best = kinds.get(keyword, -1)
+            if best < MATCH_WORD:
+                kind = match_kind(text, start, end)
+                if kind > best:
+                    kinds[keyword] = kind
+        return kinds
+
+    def find_keywords(self, text: str) -> Set[str]:
+        """Return the distinct keywords present in text."""
+        found: Set[str] = set()
+        for _, _, keyword in self.iter_matches(text):
+            found.add(keyword)
+            if len(found) == len(self.keywords):
+                break
+        return found
+
+    def distinct_counts(self, text: str) -> Dict[str, int]:
+        """Return {label: number of distinct keywords of that label present}."""
+        counts: Dict[str, int] = defaultdict(int)
+        for keyword in self.find_keywords(text):
+            for label in self.labels_by_keyword[keyword]:
+                counts[label] += 1
+        return dict(counts)
+
+    def contains_any(self, text: str) -> bool:
+        """Return True as soon as any keyword is found."""
+        return next(self.iter_matches(text), None) is not None
+
+
+class KeywordHits:
+    """Result of one KeywordEngine scan: {label: {keyword: match kind}}."""
+
+    __slots__ = ("_by_label",)
+
+    def __init__(self, kinds: Dict[str, int], labels_by_keyword: Dict[str, Set[str]]):
+        by_label: Dict[str, Dict[str, int]] = {}
+        for keyword, kind in kinds.items():
+            for label in labels_by_keyword[keyword]:
+                found = by_label.get(label)
+                if found is None:
+                    by_label[label] = {keyword: kind}
+                else:
+                    found[keyword] = kind
+        self._by_label = by_label
+
+    def keywords(self, label: str, min_kind: int = MATCH_INNER) -> Dict[str, int]:
+        """Keywords of label found at least as strongly as min_kind."""
+        return {keyword: kind for keyword, kind in self._by_label.get(label, {}).items() if kind >= min_kind}
+
+    def count(self, label: str, min_kind: int = MATCH_INNER) -> int:
+        return sum(1 for kind in self._by_label.get(label, {}).values() if kind >= min_kind)
+
+    def any(self, label: str, min_kind: int = MATCH_INNER) -> bool:
+        return any(kind >= min_kind for kind in self._by_label.get(label, {}).values())
+
+    def replace_labels(self, labels: Iterable[str], other: "KeywordHits") -> None:
+        """Take the hits for labels from other, dropping any this scan found for them."""
+        for label in labels:
+            found = other._by_label.get(label)
+            if found is None:
+                self._by_label.pop(label, None)
+            else:
+                self._by_label[label] = found
+
+    def weighted_score(self, label: str, partial_weight: float = 0.6) -> float:
+        """
+        Sum of keyword weights for label: 1.0 for a whole-word hit or any phrase
+        hit, partial_weight for a single word found inside a longer one.
+        """
+        return sum(
+            1.0 if kind == MATCH_WORD or " " in keyword else partial_weight
+            for keyword, kind in self._by_label.get(label, {}).items()
+        )
+
+
+# Characters kept for matching: ASCII letters/digits and the Indic script blocks.
+_NON_KEYWORD_CHARS = re.compile(r"[^a-z0-9\s\u0900-\u0dff]")
+
+
+class KeywordEngine:
+    """
+    Keyword groups registered by every classifier, matched in a single pass.
+
+    Groups are registered as namespace -> {category: keywords} and read back
+    from KeywordHits under the label "namespace.category". Text and keywords go
+    through the same normalization (lowercase, punctuation to spaces), plus the
+    typo corrections of the keyword's namespace; the matchers are built on first
+    use and rebuilt only if more groups or corrections are registered later.
+    """
+
+    def __init__(self):
+        self._groups: Dict[str, list] = {}
+        self._corrections: Dict[str, Dict[str, str]] = {}
+        self._matchers: Optional[Tuple[KeywordMatcher, list]] = None
+        self._lock = threading.Lock()
+
+    def add_corrections(self, namespace: str, corrections: Dict[str, str]) -> None:
+        """
+        Whole-word replacements (typos, shorthand) for one namespace's keyword groups.
+
+        They apply only when that namespace is matched, so a correction such as
+        "insur" -> "insurance" cannot hide the stem from another namespace.
+        """
+        with self._lock:
+            self._corrections.setdefault(namespace, {}).update(
+                {wrong.lower(): right.lower() for wrong, right in corrections.items()}
+            )
+            self._matchers = None
+        scan_query.cache_clear()
+
+    def register(self, namespace: str, groups: Dict[str, Iterable[str]]) -> None:
+        with self._lock:
+            for category, words in groups.items():
+                self._groups[f"{namespace}.{category}"] = list(words)
+            self._matchers = None
+        scan_query.cache_clear()
+
+    @staticmethod
+    def _split(text: str) -> list:
+        return _NON_KEYWORD_CHARS.sub(" ", (text or "").lower()).split()
+
+    def normalize(self, text: str, namespace: Optional[str] = None) -> str:
+        """Lowercase, punctuation to spaces, and the typo corrections of namespace if given."""
+        words = self._split(text)
+        corrections = self._corrections.get(namespace) if namespace else None
+        if corrections:
+            words = [corrections.get(word, word) for word in words]
+        return " ".join(words)
+
+    def _build_matchers(self) -> Tuple[KeywordMatcher, list]:
+        # Namespaces sharing a correction table share one rescan matcher.
+        labels_by_scope: Dict[tuple, list] = defaultdict(list)
+        keywords: Dict[str, list] = {}
+        for label, words in self._groups.items():
+            namespace = label.split(".", 1)[0]
+            keywords[label] = [self.normalize(word, namespace) for word in words]
+            corrections = self._corrections.get(namespace)
+            if corrections:
+                labels_by_scope[tuple(sorted(corrections.items()))].append(label)
+
+        rescans = [
+            (dict(scope), labels, KeywordMatcher({label: keywords[label] for label in labels}))
+            for scope, labels in labels_by_scope.items()
+        ]
+        return KeywordMatcher(keywords), rescans
+
+    def matcher(self) -> KeywordMatcher:
+        """The matcher over every registered group (keywords already normalized)."""
+        return self._get_matchers()[0]
+
+    def _get_matchers(self) -> Tuple[KeywordMatcher, list]:
+        matchers = self._matchers
+        if matchers is None:
+            with self._lock:
+                if self._matchers is None:
+                    self._matchers = self._build_matchers()
+                matchers = self._matchers
+        return matchers
+
+    def scan(self, text: str) -> KeywordHits:
+        """Normalize text and return every registered keyword hit, labelled."""
+        matcher, rescans = self._get_matchers()
+        words = self._split(text)
+        hits = KeywordHits(matcher.match_kinds(" ".join(words)), matcher.labels_by_keyword)
+        for corrections, labels, scoped_matcher in rescans:
+            corrected = [corrections.get(word, word) for word in words]
+            if corrected != words:
+                scoped_hits = KeywordHits(
+                    scoped_matcher.match_kinds(" ".join(corrected)), scoped_matcher.labels_by_keyword
+                )
+                hits.replace_labels(labels, scoped_hits)
+        return hits
+
+
+KEYWORD_ENGINE = KeywordEngine()
+
+
+@lru_cache(maxsize=1024)
+def scan_query(query: str) -> KeywordHits:
+    """
+    KEYWORD_ENGINE.scan for a user message, memoized: one chat turn runs the
+    domain, intent and finance classifiers over the same text.
+    """
+    return KEYWORD_ENGINE.scan(query)
@@ -2,9 +2,20 @@
 
 This module intentionally constrains detection to the product-supported languages:
 English, Hindi, Telugu, Tamil, and Kannada.
+
+Indic scripts are counted in one pass (str.translate maps each script block to
+a marker character, then str.count tallies them in C). Latin-script text is
+checked for transliterated Hindi/Telugu/Tamil/Kannada keywords and scored by
+langdetect with a fixed seed, so the same text always gets the same answer.
+Results are memoized by text: the several lookups made for one chat or voice
+turn compute it once.
 """
 
 import logging
+import re
+import threading
+from functools import lru_cache
+from typing import NamedTuple, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -25,15 +36,98 @@ LANGUAGE_NAME_MAP = {
     "kn": "Kannada",
 }
 
+# Private-use code points stand in for each script after translate().
+_LATIN_MARKER = "\ue000"
+_SCRIPT_MARKERS = {lang_code: chr(0xE001 + index) for index, lang_code in enumerate(SCRIPT_RANGES)}
+_SCRIPT_TABLE = {
+    codepoint: _SCRIPT_MARKERS[lang_code]
+    for lang_code, (start, end) in SCRIPT_RANGES.items()
+    for codepoint in range(start, end + 1)
+}
+_SCRIPT_TABLE.update({ord(ch): _LATIN_MARKER for ch in "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"})
+
+# Common words of each language written in Latin script (voice transcripts, chat typing).
+TRANSLITERATION_KEYWORDS = {
+    "hi": {"namaste", "kaise", "mujhe", "kya", "nahi", "hai", "hain"},
+    "te": {"namaskaram", "nenu", "ela", "cheyyali", "naaku", "meeru"},
+    "ta": {"vanakkam", "eppadi", "naan", "ungal", "enakku"},
+    "kn": {"namaskara", "hegide", "nanu", "nanage", "hege"},
+}
+TRANSLITERATION_MIN_HITS = 2
+_WORD_RE = re.compile(r"[a-z]+")
+
+LANGDETECT_SEED = 0
+_langdetect_lock = threading.Lock()
+_langdetect_ready = False
+_langdetect_missing_logged = threading.Event()
+
+
+class LanguageDetection(NamedTuple):
+    code: str                      # supported language code
+    confidence: float
+    method: str                    # "script", "langdetect" or "default"
+    transliterated: Optional[str]  # Indic language written in Latin script, if any
+
+
+def script_histogram(text: str) -> dict[str, int]:
+    """Count Latin letters and characters of each supported Indic script in one pass."""
+    mapped = (text or "").translate(_SCRIPT_TABLE)
+    counts = {lang_code: mapped.count(marker) for lang_code, marker in _SCRIPT_MARKERS.items()}
+    counts["latin"] = mapped.count(_LATIN_MARKER)
+    return counts
+
 
 def _detect_from_script(text: str) -> tuple[str, float] | None:
     """Use Unicode script ranges for highly reliable detection on Indic text."""
-    for ch in text:
-        codepoint = ord(ch)
-        for lang_code, (start, end) in SCRIPT_RANGES.items():
-            if start <= codepoint <= end:
-                return (lang_code, 0.99)
-    return None
+    counts = script_histogram(text)
+    latin = counts.pop("latin")
+    lang_code, count = max(counts.items(), key=lambda item: item[1])
+    if not count:
+        return None
+    # The dominant Indic script wins even in mixed text; Latin letters only lower the confidence.
+    confidence = 0.99 if count >= latin else max(0.6, min(0.99, count / (count + latin)))
+    return (lang_code, confidence)
+
+
+def infer_transliterated_language(text: str) -> str | None:
+    """Detect likely Indic language from transliterated latin text."""
+    words = set(_WORD_RE.findall((text or "").lower()))
+    if not words:
+        return None
+
+    best_lang = None
+    best_score = 0
+    for lang_code, keywords in TRANSLITERATION_KEYWORDS.items():
+        score = len(words & keywords)
+        if score > best_score:
+            best_lang = lang_code
+            best_score = score
+
+    return best_lang if best_score >= TRANSLITERATION_MIN_HITS else None
+
+
+def preload_language_detector() -> bool:
+    """Load langdetect's profiles and fix its seed; returns False when langdetect is missing."""
+    global _langdetect_ready
+
+    if _langdetect_ready:
+        return True
+    with _langdetect_lock:
+        if _langdetect_ready:
+            return True
+        try:
+            from langdetect import DetectorFactory
+            from langdetect.detector_factory import init_factory
+        except ImportError:
+            if not _langdetect_missing_logged.is_set():
+                _langdetect_missing_logged.set()
+                logger.warning("langdetect not installed. Falling back to English.")
+            return False
+        # langdetect samples n-grams randomly; a fixed seed makes results repeatable (and memoizable).
+        DetectorFactory.seed = LANGDETECT_SEED
+        init_factory()
+        _langdetect_ready = True
+    return True
 
 
 def _normalize_detected_code(lang_code: str) -> str:
@@ -53,33 +147,49 @@ def _normalize_detected_code(lang_code: str) -> str:
     return "en"
 
 
-def detect_language(text: str) -> tuple[str, float]:
-    """Detect language and return (supported_lang_code, confidence)."""
+@lru_cache(maxsize=2048)
+def detect_language_details(text: str) -> LanguageDetection:
+    """
+    Detect the language of text (memoized by text).
+
+    Args:
+        text: User message or transcript
+
+    Returns:
+        LanguageDetection with the supported code, confidence, the method
+        that decided it and any transliterated Indic language
+    """
     if not text or not text.strip():
-        return ("en", 0.0)
+        return LanguageDetection("en", 0.0, "default", None)
 
     script_result = _detect_from_script(text)
     if script_result:
         lang_code, confidence = script_result
         logger.info("Detected language by script: %s (confidence: %.2f)", lang_code, confidence)
-        return (lang_code, confidence)
-
-    try:
-        from langdetect import detect_langs
-
-        detected = detect_langs(text)
-        if detected:
-            top_lang = detected[0]
-            mapped_code = _normalize_detected_code(top_lang.lang)
-            confidence = float(top_lang.prob) if mapped_code != "en" else max(float(top_lang.prob), 0.60)
-            logger.info("Detected language: %s (confidence: %.2f)", mapped_code, confidence)
-            return (mapped_code, confidence)
-    except ImportError:
-        logger.warning("langdetect not installed. Falling back to English.")
-    except Exception as exc:
-        logger.error("Language detection error: %s", str(exc))
-
-    return ("en", 0.0)
+        return LanguageDetection(lang_code, confidence, "script", None)
+
+    transliterated = infer_transliterated_language(text)
+    if preload_language_detector():
+        try:
+            from langdetect import detect_langs
+
+            detected = detect_langs(text)
+            if detected:
+                top_lang = detected[0]
+                mapped_code = _normalize_detected_code(top_lang.lang)
+                confidence = float(top_lang.prob) if mapped_code != "en" else max(float(top_lang.prob), 0.60)
+                logger.info("Detected language: %s (confidence: %.2f)", mapped_code, confidence)
+                return LanguageDetection(mapped_code, confidence, "langdetect", transliterated)
+        except Exception as exc:
+            logger.error("Language detection error: %s", str(exc))
+
+    return LanguageDetection("en", 0.0, "default", transliterated)
+
+
+def detect_language(text: str) -> tuple[str, float]:
+    """Detect language and return (supported_lang_code, confidence)."""
+    detection = detect_language_details(text)
+    return (detection.code, detection.confidence)
 
 
 def get_language_name(lang_code: str) -> str:
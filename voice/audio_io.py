@@ -0,0 +1,265 @@
+"""
+In-memory audio decoding.
+Turns uploaded audio (bytes, a path or a file object) into the float32 mono
+16 kHz NumPy buffer the STT engines consume, without temp files. Decoders are
+tried from cheapest to most general: the stdlib wave module for PCM WAV,
+soundfile (libsndfile) for WAV/FLAC/OGG, PyAV for compressed formats
+(WebM/Opus, MP3, M4A), and finally an ffmpeg stdin -> stdout pipe.
+Local TTS engines go the other way: their 16-bit PCM is encoded to MP3 with
+lameenc, or the ffmpeg pipe when it is not installed.
+"""
+
+import io
+import logging
+import os
+import subprocess
+import wave
+from typing import BinaryIO, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+TARGET_SAMPLE_RATE = 16000
+FFMPEG_TIMEOUT_SECONDS = float(os.getenv("FFMPEG_TIMEOUT_SECONDS", "30"))
+# Bitrate of MP3 encoded from local TTS output (mono speech).
+TTS_MP3_BITRATE_KBPS = int(os.getenv("TTS_MP3_BITRATE_KBPS", "48"))
+
+AudioSource = Union[bytes, bytearray, str, BinaryIO]
+
+
+class AudioDecodeError(ValueError):
+    """Raised when no available decoder can read the audio."""
+
+
+def _read_source(source: AudioSource) -> bytes:
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    if isinstance(source, str):
+        with open(source, "rb") as audio_file:
+            return audio_file.read()
+    return source.read()
+
+
+def to_mono(samples):
+    """Average channels of a (frames, channels) array; 1-D input is returned as is."""
+    if samples.ndim == 1:
+        return samples
+    return samples.mean(axis=1)
+
+
+def resample(samples, source_rate: int, target_rate: int = TARGET_SAMPLE_RATE):
+    """
+    Resample a mono float32 buffer.
+
+    Uses scipy's polyphase filter when installed (anti-aliased), otherwise
+    linear interpolation, which is adequate for speech going down to 16 kHz.
+    """
+    import numpy as np
+
+    if source_rate == target_rate or samples.size == 0:
+        return samples.astype(np.float32, copy=False)
+    try:
+        from math import gcd
+
+        from scipy.signal import resample_poly
+
+        divisor = gcd(source_rate, target_rate)
+        return resample_poly(samples, target_rate // divisor, source_rate // divisor).astype(np.float32)
+    except ImportError:
+        target_length = int(round(samples.size * target_rate / source_rate))
+        positions = np.linspace(0, samples.size - 1, num=target_length, dtype=np.float64)
+        return np.interp(positions, np.arange(samples.size), samples).astype(np.float32)
+
+
+def _decode_wave(data: bytes):
+    """PCM WAV via the stdlib wave module (8/16/32-bit integer samples)."""
+    import numpy as np
+
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        return None
+    with wave.open(io.BytesIO(data), "rb") as wav:
+        channels = wav.getnchannels()
+        sample_width = wav.getsampwidth()
+        rate = wav.getframerate()
+        frames = wav.readframes(wav.getnframes())
+
+    if sample_width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sample_width == 2:
+        samples = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    elif sample_width == 4:
+        samples = np.frombuffer(frames, dtype="<i4").astype(np.float32) / 2147483648.0
+    else:
+        raise AudioDecodeError(f"Unsupported WAV sample width: {sample_width}")
+    return to_mono(samples.reshape(-1, channels)), rate
+
+
+def _decode_soundfile(data: bytes):
+    import soundfile
+
+    samples, rate = soundfile.read(io.BytesIO(data), dtype="float32", always_2d=True)
+    return to_mono(samples), rate
+
+
+def _decode_pyav(data: bytes):
+    import av
+    import numpy as np
+
+    chunks = []
+    with av.open(io.BytesIO(data), mode="r") as container:
+        stream = next((s for s in container.streams if s.type == "audio"), None)
+        if stream is None:
+            raise AudioDecodeError("No audio stream found.")
+        # Let libswresample downmix and resample while decoding.
+        resampler = av.AudioResampler(format="flt", layout="mono", rate=TARGET_SAMPLE_RATE)
+        for frame in container.decode(stream):
+            for resampled in resampler.resample(frame):
+                chunks.append(resampled.to_ndarray().reshape(-1))
+        for resampled in resampler.resample(None):
+            chunks.append(resampled.to_ndarray().reshape(-1))
+    samples = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+    return samples.astype(np.float32, copy=False), TARGET_SAMPLE_RATE
+
+
+def _decode_ffmpeg_pipe(data: bytes):
+    """Pipe the bytes through ffmpeg (stdin -> raw f32le on stdout); nothing touches disk."""
+    import numpy as np
+
+    command = [
+        "ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error",
+        "-i", "pipe:0",
+        "-f", "f32le", "-ac", "1", "-ar", str(TARGET_SAMPLE_RATE),
+        "pipe:1",
+    ]
+    try:
+        completed = subprocess.run(
+            command,
+            input=data,
+            capture_output=True,
+            timeout=FFMPEG_TIMEOUT_SECONDS,
+            check=False,
+        )
+    except FileNotFoundError as e:
+        raise ImportError("ffmpeg not installed") from e
+    if completed.returncode != 0:
+        raise AudioDecodeError(completed.stderr.decode("utf-8", errors="replace")[:300])
+    return np.frombuffer(completed.stdout, dtype="<f4").copy(), TARGET_SAMPLE_RATE
+
+
+_DECODERS = (
+    ("wave", _decode_wave),
+    ("soundfile", _decode_soundfile),
+    ("pyav", _decode_pyav),
+    ("ffmpeg_pipe", _decode_ffmpeg_pipe),
+)
+
+
+def decode_audio_with_info(source: AudioSource) -> Tuple["object", str]:
+    """
+    Decode audio to float32 mono at TARGET_SAMPLE_RATE, reporting which decoder worked.
+
+    Args:
+        source: Raw bytes, a file path or a binary file object
+
+    Returns:
+        (NumPy float32 array, decoder name)
+
+    Raises:
+        AudioDecodeError: When every available decoder fails
+    """
+    data = _read_source(source)
+    if not data:
+        raise AudioDecodeError("Empty audio.")
+
+    errors = []
+    for name, decoder in _DECODERS:
+        try:
+            decoded = decoder(data)
+        except ImportError:
+            continue
+        except Exception as e:
+            errors.append(f"{name}: {str(e)[:80]}")
+            continue
+        if decoded is None:
+            continue
+        samples, rate = decoded
+        return resample(samples, rate), name
+
+    if not errors:
+        raise AudioDecodeError("No audio decoder available. Install soundfile, av or ffmpeg.")
+    raise AudioDecodeError("Could not decode audio (" + "; ".join(errors) + ")")
+
+
+def decode_audio(source: AudioSource):
+    """Decode audio to a float32 mono 16 kHz NumPy array (see decode_audio_with_info)."""
+    samples, _ = decode_audio_with_info(source)
+    return samples
+
+
+def audio_duration_seconds(samples, sample_rate: int = TARGET_SAMPLE_RATE) -> float:
+    return round(len(samples) / sample_rate, 3)
+
+
+def wav_to_pcm16(data: bytes) -> Tuple[bytes, int]:
+    """
+    Read 16-bit mono PCM out of a WAV file held in memory.
+
+    Returns:
+        (little-endian int16 samples, sample rate)
+    """
+    import numpy as np
+
+    with wave.open(io.BytesIO(data), "rb") as wav:
+        channels = wav.getnchannels()
+        sample_width = wav.getsampwidth()
+        rate = wav.getframerate()
+        # Streamed WAVs (espeak-ng --stdout) carry a placeholder length; read to the end.
+        frames = wav.readframes(2**31 - 1)
+    if sample_width != 2:
+        raise AudioDecodeError(f"Unsupported WAV sample width: {sample_width}")
+    if channels > 1:
+        samples = np.frombuffer(frames[: len(frames) - len(frames) % (2 * channels)], dtype="<i2")
+        frames = samples.reshape(-1, channels).mean(axis=1).astype("<i2").tobytes()
+    return frames, rate
+
+
+def encode_mp3(pcm16: bytes, sample_rate: int, bitrate_kbps: int = TTS_MP3_BITRATE_KBPS) -> bytes:
+    """
+    Encode mono 16-bit PCM to MP3 in memory.
+
+    Uses lameenc when installed, otherwise pipes through ffmpeg.
+
+    Raises:
+        ImportError: When neither encoder is available
+        AudioDecodeError: When ffmpeg fails
+    """
+    try:
+        import lameenc
+
+        encoder = lameenc.Encoder()
+        encoder.set_bit_rate(bitrate_kbps)
+        encoder.set_in_sample_rate(sample_rate)
+        encoder.set_channels(1)
+        encoder.set_quality(5)
+        return bytes(encoder.encode(pcm16) + encoder.flush())
+    except ImportError:
+        pass
+
+    command = [
+        "ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error",
+        "-f", "s16le", "-ac", "1", "-ar", str(sample_rate), "-i", "pipe:0",
+        "-f", "mp3", "-b:a", f"{bitrate_kbps}k",
+        "pipe:1",
+    ]
+    try:
+        completed = subprocess.run(
+            command,
+            input=pcm16,
+            capture_output=True,
+            timeout=FFMPEG_TIMEOUT_SECONDS,
+            check=False,
+        )
+    except FileNotFoundError as e:
+        raise ImportError("No MP3 encoder available. Install lameenc or ffmpeg.") from e
+    if completed.returncode != 0:
+        raise AudioDecodeError(completed.stderr.decode("utf-8", errors="replace")[:300])
+    return completed.stdout
@@ -0,0 +1,191 @@
+"""
+Short-lived store of synthesized reply audio.
+Chat and voice responses carry a URL instead of base64 audio: the reply is
+registered here under a random id and synthesized in the background while the
+JSON response goes out, and GET /audio/{id} streams the segments as they are
+produced (or serves byte ranges once the clip is complete). Clips expire
+after AUDIO_URL_TTL_SECONDS and the store is bounded by total size.
+
+The store lives in the API process, so /audio requests must reach the worker
+that created the clip (the default single-process deployment does).
+"""
+
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from voice.tts import TTS_SEGMENT_WORKERS, iter_speech_segments
+
+logger = logging.getLogger(__name__)
+
+AUDIO_URL_TTL_SECONDS = int(os.getenv("AUDIO_URL_TTL_SECONDS", "300"))
+AUDIO_STORE_MAX_MB = float(os.getenv("AUDIO_STORE_MAX_MB", "64"))
+# How long a request for a byte range waits for a clip that is still rendering.
+AUDIO_RENDER_WAIT_SECONDS = float(os.getenv("AUDIO_RENDER_WAIT_SECONDS", "60"))
+
+
+class AudioClip:
+    """MP3 bytes of one reply, appended segment by segment while it renders."""
+
+    def __init__(self, clip_id: str, language: str):
+        self.clip_id = clip_id
+        self.language = language
+        self.created_at = time.monotonic()
+        self.chunks: List[bytes] = []
+        self.size = 0
+        self.done = False
+        self.failed = False
+        self._cond = threading.Condition()
+
+    def append(self, chunk: bytes) -> None:
+        with self._cond:
+            self.chunks.append(chunk)
+            self.size += len(chunk)
+            self._cond.notify_all()
+
+    def finish(self, failed: bool = False) -> None:
+        with self._cond:
+            self.done = True
+            self.failed = failed
+            self._cond.notify_all()
+
+    def wait_for_chunks(self, start: int, timeout: float) -> Tuple[List[bytes], bool]:
+        """
+        Block until chunks past index `start` exist or the clip is done.
+
+        Returns:
+            (new chunks, done) - an empty list with done=False means the wait timed out
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: len(self.chunks) > start or self.done, timeout=timeout)
+            return self.chunks[start:], self.done
+
+    def wait_done(self, timeout: float) -> bool:
+        with self._cond:
+            return self._cond.wait_for(lambda: self.done, timeout=timeout)
+
+    def data(self) -> bytes:
+        with self._cond:
+            return b"".join(self.chunks)
+
+
+class AudioClipStore:
+    """Thread-safe registry of recent clips, bounded by age and total bytes."""
+
+    def __init__(self, ttl_seconds: int, max_bytes: int, render_workers: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._clips: "OrderedDict[str, AudioClip]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Separate from the TTS segment pool: a render job waits on its segments there.
+        self._executor = ThreadPoolExecutor(max_workers=render_workers, thread_name_prefix="audio-render")
+
+    def _purge(self) -> None:
+        now = time.monotonic()
+        total = sum(clip.size for clip in self._clips.values())
+        for clip_id in list(self._clips):
+            clip = self._clips[clip_id]
+            expired = now - clip.created_at > self.ttl_seconds
+            if not expired and total <= self.max_bytes:
+                break
+            if not clip.done and not expired:
+                continue
+            del self._clips[clip_id]
+            total -= clip.size
+
+    def _render(self, clip: AudioClip, text: str) -> None:
+        started = time.perf_counter()
+        sources: List[str] = []
+        first_chunk_ms = None
+        try:
+            for chunk in iter_speech_segments(text, clip.language, sources):
+                if first_chunk_ms is None:
+                    first_chunk_ms = round((time.perf_counter() - started) * 1000, 2)
+                clip.append(chunk)
+        except Exception as e:
+            logger.warning(f"Audio render failed: {str(e)[:200]}")
+            sources.append("error")
+        failed = "error" in sources or not clip.chunks
+        clip.finish(failed=failed)
+        logger.info(
+            json.dumps(
+                {
+                    "event": "tts_audio",
+                    "audio_id": clip.clip_id,
+                    "language": clip.language,
+                    "segments": len(sources),
+                    "cached_segments": sum(1 for source in sources if source in {"memory", "disk"}),
+                    "failed": failed,
+                    "text_chars": len(text),
+                    "audio_bytes": clip.size,
+                    "first_chunk_ms": first_chunk_ms,
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                }
+            )
+        )
+
+    def create(self, text: str, language: str) -> Optional[str]:
+        """Register a clip, start rendering it in the background and return its id."""
+        if not text or not text.strip():
+            return None
+        clip = AudioClip(secrets.token_urlsafe(16), language)
+        with self._lock:
+            self._purge()
+            self._clips[clip.clip_id] = clip
+        self._executor.submit(self._render, clip, text)
+        return clip.clip_id
+
+    def get(self, clip_id: str) -> Optional[AudioClip]:
+        with self._lock:
+            self._purge()
+            return self._clips.get(clip_id)
+
+
+_audio_store: Optional[AudioClipStore] = None
+_audio_store_lock = threading.Lock()
+
+
+def get_audio_store() -> AudioClipStore:
+    global _audio_store
+
+    if _audio_store is None:
+        with _audio_store_lock:
+            if _audio_store is None:
+                _audio_store = AudioClipStore(
+                    ttl_seconds=AUDIO_URL_TTL_SECONDS,
+                    max_bytes=int(AUDIO_STORE_MAX_MB * 1024 * 1024),
+                    render_workers=TTS_SEGMENT_WORKERS,
+                )
+    return _audio_store
+
+
+def parse_byte_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range `Range: bytes=...` header.
+
+    Returns:
+        Inclusive (start, end) offsets, or None when the range is malformed or unsatisfiable
+    """
+    unit, _, spec = (header or "").partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if not first:
+            suffix = int(last)
+            if suffix <= 0:
+                return None
+            return max(0, size - suffix), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
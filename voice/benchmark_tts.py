@@ -0,0 +1,138 @@
+"""
+TTS backend benchmark: synthesis latency, CPU time and audio size per backend.
+
+Every installed backend (piper, espeak, gtts) synthesizes the same English
+and Hindi reply sentences directly, bypassing the TTS cache. CPU time
+includes child processes, so subprocess engines (espeak-ng, the ffmpeg MP3
+encoder) are not undercounted; for gTTS it is the client-side cost only.
+
+Usage:
+    python voice/benchmark_tts.py
+"""
+
+import os
+import resource
+import statistics
+import sys
+import time
+
+# Add project root to Python path for proper module imports
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from voice.audio_io import AudioDecodeError, audio_duration_seconds, decode_audio
+from voice.tts_backends import create_backend
+
+BACKENDS = ("piper", "espeak", "gtts")
+REPEATS = 3
+SAMPLE_TEXTS = {
+    "en": [
+        "Insurance assistance is currently in limited mode.",
+        "For a claim, first notify your insurer quickly, submit required documents, "
+        "and track status using your claim number.",
+        "Share your goal, your time horizon and your risk comfort level.",
+    ],
+    "hi": [
+        "बीमा सहायता के लिए अभी सीमित मोड सक्रिय है।",
+        "क्लेम के लिए पहले कंपनी को तुरंत सूचित करें, आवश्यक दस्तावेज जमा करें, "
+        "और क्लेम नंबर से स्टेटस ट्रैक करें।",
+        "बजट के लिए 50-30-20 नियम से शुरू करें।",
+    ],
+}
+
+
+def _cpu_seconds():
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def _audio_seconds(audio):
+    try:
+        return audio_duration_seconds(decode_audio(audio))
+    except (AudioDecodeError, ImportError):
+        return None
+
+
+def benchmark_backend(backend, language, texts, repeats=REPEATS):
+    """
+    Synthesize every text `repeats` times (after one untimed warm-up).
+
+    Returns:
+        Latency percentiles, CPU time and output size, or None when every call failed
+    """
+    try:
+        backend.synthesize(texts[0], language)
+    except Exception as e:
+        print(f"  {backend.name}/{language}: warm-up failed ({str(e)[:80]})")
+        return None
+
+    latencies, cpu_times, sizes, durations = [], [], [], []
+    for _ in range(repeats):
+        for text in texts:
+            cpu_started = _cpu_seconds()
+            started = time.perf_counter()
+            try:
+                audio = backend.synthesize(text, language)
+            except Exception:
+                continue
+            latencies.append((time.perf_counter() - started) * 1000)
+            cpu_times.append((_cpu_seconds() - cpu_started) * 1000)
+            sizes.append(len(audio))
+            duration = _audio_seconds(audio)
+            if duration:
+                durations.append(duration)
+
+    if not latencies:
+        return None
+    latencies.sort()
+    return {
+        "calls": len(latencies),
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[min(len(latencies) - 1, int(round(0.95 * (len(latencies) - 1))))],
+        "cpu_ms": statistics.fmean(cpu_times),
+        "kb": statistics.fmean(sizes) / 1024,
+        "kb_per_s": (sum(sizes) / 1024 / sum(durations)) if durations else None,
+    }
+
+
+def run_benchmark(backend_names=BACKENDS, sample_texts=SAMPLE_TEXTS):
+    report = []
+    for name in backend_names:
+        backend = create_backend(name)
+        if backend is None or not backend.available():
+            print(f"  {name}: not installed, skipped")
+            continue
+        for language, texts in sample_texts.items():
+            if not backend.supports(language):
+                continue
+            result = benchmark_backend(backend, language, texts)
+            if result:
+                report.append((name, language, result))
+    return report
+
+
+def print_report(report):
+    columns = ("calls", "p50_ms", "p95_ms", "cpu_ms", "kb", "kb_per_s")
+    print("=" * 78)
+    print("TTS Backend Benchmark (per segment, cache bypassed)")
+    print("=" * 78)
+    print(f"{'backend':<10}{'lang':<6}" + "".join(f"{col:>10}" for col in columns))
+    print("-" * 78)
+    for name, language, values in report:
+        cells = "".join(
+            f"{'-':>10}" if values[col] is None
+            else f"{values[col]:>10d}" if isinstance(values[col], int)
+            else f"{values[col]:>10.1f}"
+            for col in columns
+        )
+        print(f"{name:<10}{language:<6}" + cells)
+
+
+if __name__ == "__main__":
+    results = run_benchmark()
+    if not results:
+        print("No TTS backend is installed. Install piper-tts (with PIPER_VOICES), espeak-ng or gtts.")
+        sys.exit(1)
+    print_report(results)
@@ -4,12 +4,40 @@ Converts audio input to text for RAG processing with multilingual support.
 """
 
 import os
+import json
 import logging
-import subprocess
-import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from voice.audio_io import TARGET_SAMPLE_RATE, AudioDecodeError, decode_audio, decode_audio_with_info
+from voice.vad import build_segment_audio, detect_speech, plan_segments
 
 logger = logging.getLogger(__name__)
+
+# Whisper model size (tiny, base, small, medium, large-v3)
+WHISPER_MODEL_SIZE = os.getenv("WHISPER_MODEL_SIZE", "base").strip() or "base"
+# When set, transcription goes to the shared model server (voice/stt_server.py)
+# instead of loading a model in this process.
+STT_SERVER_URL = os.getenv("STT_SERVER_URL", "").strip().rstrip("/")
+STT_SERVER_TIMEOUT_SECONDS = float(os.getenv("STT_SERVER_TIMEOUT_SECONDS", "120"))
+# Keep the user's selected language unless language-ID gives it less than this probability.
+STT_PREFERRED_LANGUAGE_MIN_PROB = float(os.getenv("STT_PREFERRED_LANGUAGE_MIN_PROB", "0.1"))
+# Trim silence and reject empty clips before recognition.
+STT_VAD_ENABLED = os.getenv("STT_VAD_ENABLED", "true").strip().lower() in {"1", "true", "yes", "on"}
+# Concurrent segment requests to the model server for long recordings.
+STT_SEGMENT_WORKERS = int(os.getenv("STT_SEGMENT_WORKERS", "2"))
+# Content type for decoded float32 PCM sent to the model server.
+PCM_CONTENT_TYPE = f"audio/x-f32le; rate={TARGET_SAMPLE_RATE}"
+
 _WHISPER_MODEL = None
+_WHISPER_MODEL_LOCK = threading.Lock()
+# Whisper installs kv-cache hooks on the model for each decode, so one model
+# instance must not transcribe two clips at once.
+_WHISPER_TRANSCRIBE_LOCK = threading.Lock()
 
 # Language code mapping for Whisper (ISO 639-1 codes)
 LANGUAGE_MAP = {
@@ -35,41 +63,181 @@ def _resolve_language_code(language):
     return language if language else 'en'
 
 
-def _speech_to_text_whisper(audio_path, language='en', auto_detect=True):
-    """Primary STT engine: OpenAI Whisper."""
+def load_whisper_model(model_size=None):
+    """Load a Whisper model (a new instance on every call)."""
     import whisper
 
+    model_size = model_size or WHISPER_MODEL_SIZE
+    logger.info(f"Loading Whisper model ({model_size})")
+    return whisper.load_model(model_size)
+
+
+def get_whisper_model():
+    """Return this process's shared Whisper model, loading it exactly once."""
     global _WHISPER_MODEL
 
-    language_code = _resolve_language_code(language)
     if _WHISPER_MODEL is None:
-        logger.info("Loading Whisper model (base)")
-        _WHISPER_MODEL = whisper.load_model("base")
+        with _WHISPER_MODEL_LOCK:
+            if _WHISPER_MODEL is None:
+                _WHISPER_MODEL = load_whisper_model()
+    return _WHISPER_MODEL
+
+
+def preload_whisper_model():
+    """
+    Load the in-process Whisper model ahead of the first voice request.
+
+    Returns:
+        True when a model is ready (or transcription is delegated to STT_SERVER_URL)
+    """
+    if STT_SERVER_URL:
+        return True
+    try:
+        get_whisper_model()
+        return True
+    except ImportError:
+        logger.info("Whisper not installed; voice input will use Google SpeechRecognition")
+    except Exception as e:
+        logger.warning(f"Whisper preload failed: {str(e)[:120]}")
+    return False
+
+
+def load_audio_buffer(source):
+    """
+    Decode a clip once into Whisper's input format (float32 mono at 16 kHz).
+
+    Args:
+        source: File path, raw bytes, file object, or an already decoded array
+
+    Returns:
+        NumPy float32 array
+
+    Raises:
+        AudioDecodeError: When the audio cannot be decoded
+    """
+    if hasattr(source, "dtype"):
+        return source
+    return decode_audio(source)
 
-    model = _WHISPER_MODEL
-    transcribe_lang = None if auto_detect else language_code
 
-    logger.info(f"Transcribing audio from: {audio_path}")
+def detect_spoken_language(model, audio):
+    """Run Whisper's language identification on the first 30 s of the clip; returns {code: probability}."""
+    import whisper
+
+    segment = whisper.pad_or_trim(audio)
+    mel = whisper.log_mel_spectrogram(segment, n_mels=model.dims.n_mels).to(model.device)
+    _, probabilities = model.detect_language(mel)
+    return probabilities
+
+
+def resolve_transcription_language(probabilities, preferred_language=None):
+    """
+    Choose the decoding language from language-ID probabilities.
+
+    The user's selected language wins unless the clip is clearly something
+    else, so code-mixed speech is still written in the selected script.
+
+    Returns:
+        (language code, probability)
+    """
+    detected = max(probabilities, key=probabilities.get)
+    preferred = _resolve_language_code(preferred_language) if preferred_language else None
+    if preferred and probabilities.get(preferred, 0.0) >= STT_PREFERRED_LANGUAGE_MIN_PROB:
+        return preferred, probabilities[preferred]
+    return detected, probabilities[detected]
+
+
+def transcribe_with_model(model, audio, language=None, preferred_language=None):
+    """
+    Language-ID plus a single transcription pass.
+
+    Args:
+        model: Loaded Whisper model
+        audio: Decoded clip from load_audio_buffer
+        language: ISO code to force; skips language identification
+        preferred_language: Code or name the user selected, used as a tie-breaker
+
+    Returns:
+        {'text': str, 'language': str, 'language_probability': float | None, 'detected_language': str | None}
+    """
+    probability = None
+    detected = None
+    if not language:
+        probabilities = detect_spoken_language(model, audio)
+        detected = max(probabilities, key=probabilities.get)
+        language, probability = resolve_transcription_language(probabilities, preferred_language)
+
     result = model.transcribe(
-        audio_path,
-        language=transcribe_lang,
+        audio,
+        language=language,
         fp16=False
     )
+    return {
+        'text': result.get("text", "").strip(),
+        'language': language,
+        'language_probability': round(float(probability), 3) if probability is not None else None,
+        'detected_language': detected,
+    }
 
-    text = result.get("text", "").strip()
-    detected_lang = result.get("language", "unknown")
 
-    if not text:
+def _transcribe_via_server(audio, language=None, preferred_language=None):
+    """Send decoded PCM to the shared STT server; raises on connection or server errors."""
+    query = urllib.parse.urlencode({
+        'language': language or '',
+        'preferred_language': _resolve_language_code(preferred_language) if preferred_language else '',
+    })
+    request = urllib.request.Request(
+        f"{STT_SERVER_URL}/transcribe?{query}",
+        data=audio.astype("<f4", copy=False).tobytes(),
+        headers={'Content-Type': PCM_CONTENT_TYPE},
+        method='POST',
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=STT_SERVER_TIMEOUT_SECONDS) as response:
+            return json.loads(response.read().decode("utf-8"))
+    except urllib.error.HTTPError as e:
+        detail = e.read().decode("utf-8", errors="replace")[:200]
+        raise RuntimeError(f"STT server returned {e.code}: {detail}") from e
+
+
+def _speech_to_text_whisper(audio, language=None, preferred_language=None):
+    """Primary STT engine: OpenAI Whisper (in-process, or via STT_SERVER_URL) on a decoded buffer."""
+    logger.info(f"Transcribing {len(audio) / TARGET_SAMPLE_RATE:.1f}s of audio")
+    if STT_SERVER_URL:
+        result = _transcribe_via_server(audio, language=language, preferred_language=preferred_language)
+    else:
+        model = get_whisper_model()
+        with _WHISPER_TRANSCRIBE_LOCK:
+            result = transcribe_with_model(
+                model,
+                audio,
+                language=language,
+                preferred_language=preferred_language,
+            )
+
+    if not result.get("text"):
         logger.warning("No speech detected in audio file")
-        return "Error: Could not understand the audio. Please speak more clearly."
+        return {**result, 'text': "Error: Could not understand the audio. Please speak more clearly."}
+
+    logger.info(
+        f"Whisper transcription successful (language: {result.get('language')}, "
+        f"detected: {result.get('detected_language')}, p={result.get('language_probability')})"
+    )
+    logger.debug(f"Transcribed text: {result['text'][:100]}...")
+    return result
+
 
-    logger.info(f"Whisper transcription successful (detected: {detected_lang})")
-    logger.debug(f"Transcribed text: {text[:100]}...")
-    return text
+def _pcm16_audio_data(audio):
+    """Wrap a decoded float32 16 kHz buffer as SpeechRecognition AudioData."""
+    import numpy as np
+    import speech_recognition as sr
 
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+    return sr.AudioData(pcm, TARGET_SAMPLE_RATE, 2)
 
-def _speech_to_text_google(audio_path, language='en'):
-    """Fallback STT engine: Google SpeechRecognition API."""
+
+def _speech_to_text_google(audio, language='en'):
+    """Fallback STT engine: Google SpeechRecognition API on a decoded buffer."""
     try:
         import speech_recognition as sr
     except ImportError:
@@ -77,25 +245,9 @@ def _speech_to_text_google(audio_path, language='en'):
 
     language_code = _resolve_language_code(language)
     recognizer = sr.Recognizer()
-    temp_wav_path = None
 
     try:
-        source_path = audio_path
-        ext = os.path.splitext(audio_path)[1].lower()
-        if ext not in {".wav", ".aiff", ".aif", ".flac"}:
-            temp_wav = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
-            temp_wav_path = temp_wav.name
-            temp_wav.close()
-            cmd = ["ffmpeg", "-y", "-i", audio_path, temp_wav_path]
-            logger.info("Converting audio for Google STT via ffmpeg: %s", " ".join(cmd))
-            conversion = subprocess.run(cmd, capture_output=True, text=True, check=False)
-            if conversion.returncode != 0:
-                logger.error("ffmpeg conversion failed: %s", conversion.stderr[:300])
-                return "Error: Could not process audio format. Please try recording again."
-            source_path = temp_wav_path
-
-        with sr.AudioFile(source_path) as source:
-            audio_data = recognizer.record(source)
+        audio_data = _pcm16_audio_data(audio)
         text = recognizer.recognize_google(audio_data, language=language_code)
         text = (text or "").strip()
         if not text:
@@ -106,12 +258,138 @@ def _speech_to_text_google(audio_path, language='en'):
         return "Error: Could not understand the audio. Please speak more clearly."
     except Exception as exc:
         return f"Error: Could not process audio. {str(exc)[:100]}"
-    finally:
-        if temp_wav_path and os.path.exists(temp_wav_path):
-            try:
-                os.remove(temp_wav_path)
-            except OSError:
-                pass
+
+
+def _transcribe_segments(segments, language=None, preferred_language=None, on_partial=None):
+    """
+    Whisper over speech segments: language-ID on the first, the rest in parallel.
+
+    Parallel requests only help with the model server (one replica per slot);
+    an in-process model transcribes one segment at a time. on_partial, when
+    given, receives the transcript so far after each segment (in order).
+    """
+    first = _speech_to_text_whisper(segments[0], language=language, preferred_language=preferred_language)
+    texts = [] if first['text'].startswith("Error:") else [first['text']]
+    if len(segments) == 1:
+        return first
+    if on_partial and texts:
+        on_partial(" ".join(texts))
+
+    resolved_language = language or first.get('language')
+    workers = STT_SEGMENT_WORKERS if STT_SERVER_URL else 1
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(
+            lambda segment: _speech_to_text_whisper(segment, language=resolved_language),
+            segments[1:],
+        ):
+            if part['text'].startswith("Error:"):
+                continue
+            texts.append(part['text'])
+            if on_partial:
+                on_partial(" ".join(texts))
+    if not texts:
+        return first
+    return {**first, 'text': " ".join(texts), 'language': resolved_language}
+
+
+def transcribe_audio(source, language=None, preferred_language=None, on_partial=None):
+    """
+    Decode once, drop silence, identify the language, transcribe once, fall back to Google on failure.
+
+    Clips without speech are rejected before any recognizer runs; long
+    recordings are split at pauses into segments of at most 30 s.
+
+    Args:
+        source: Path to audio file, raw bytes, file object, or a decoded
+                float32 16 kHz mono array
+        language: Code or name to force (skips language identification)
+        preferred_language: Code or name the user selected
+        on_partial: Optional callback receiving the transcript so far as
+                    segments of a long recording finish
+
+    Returns:
+        {'text': str (or "Error: ..."), 'language': str | None,
+         'language_probability': float | None, 'detected_language': str | None,
+         'engine': 'whisper' | 'google' | None, 'decoder': str, 'decode_ms': float,
+         'audio_seconds': float, 'speech_seconds': float (audio actually sent), 'segments': int}
+    """
+    if isinstance(source, str) and not os.path.exists(source):
+        logger.error(f"Audio file not found: {source}")
+        return {'text': "Error: Audio file not found.", 'language': None, 'engine': None}
+
+    decode_started = time.perf_counter()
+    try:
+        if hasattr(source, "dtype"):
+            audio, decoder = source, "array"
+        else:
+            audio, decoder = decode_audio_with_info(source)
+    except AudioDecodeError as e:
+        logger.error(f"Audio decode failed: {str(e)[:300]}")
+        return {
+            'text': "Error: Could not process audio format. Please try recording again.",
+            'language': None,
+            'engine': None,
+        }
+    decode_info = {
+        'decoder': decoder,
+        'decode_ms': round((time.perf_counter() - decode_started) * 1000, 2),
+        'audio_seconds': round(len(audio) / TARGET_SAMPLE_RATE, 3),
+    }
+
+    if STT_VAD_ENABLED:
+        analysis = detect_speech(audio)
+        if not analysis.has_speech:
+            logger.info(f"No speech found in {analysis.total_seconds:.1f}s clip; skipping recognition")
+            return {
+                'text': "Error: No speech detected. Please speak closer to the microphone and try again.",
+                'language': None,
+                'engine': None,
+                'speech_seconds': 0.0,
+                'segments': 0,
+                **decode_info,
+            }
+        if analysis.whole_clip:
+            logger.info(f"No pauses to locate speech in {analysis.total_seconds:.1f}s clip; recognizing all of it")
+        segments = [build_segment_audio(audio, regions) for regions in plan_segments(analysis)]
+        if len(segments) > 1:
+            audio = build_segment_audio(audio, analysis.regions)
+        else:
+            audio = segments[0]
+    else:
+        segments = [audio]
+    decode_info['speech_seconds'] = round(sum(len(segment) for segment in segments) / TARGET_SAMPLE_RATE, 3)
+    decode_info['segments'] = len(segments)
+
+    forced_code = _resolve_language_code(language) if language else None
+    try:
+        result = _transcribe_segments(
+            segments,
+            language=forced_code,
+            preferred_language=preferred_language,
+            on_partial=on_partial,
+        )
+        if not result['text'].startswith("Error:"):
+            return {**result, 'engine': 'whisper', **decode_info}
+        fallback_language = result.get('language') or forced_code or preferred_language or 'en'
+        logger.warning("Whisper returned no speech; trying Google fallback once")
+    except ImportError:
+        logger.warning("Whisper not installed; attempting Google SpeechRecognition fallback")
+        fallback_language = forced_code or preferred_language or 'en'
+    except Exception as e:
+        logger.warning(f"Whisper failed: {str(e)[:120]}. Trying Google fallback...")
+        fallback_language = forced_code or preferred_language or 'en'
+
+    text = _speech_to_text_google(audio, language=fallback_language)
+    if text.startswith("Error:"):
+        logger.error(f"Speech recognition failed: {text}")
+    return {
+        'text': text,
+        'language': _resolve_language_code(fallback_language),
+        'language_probability': None,
+        'detected_language': None,
+        'engine': 'google',
+        **decode_info,
+    }
 
 
 def speech_to_text(audio_path, language='en', auto_detect=True):
@@ -120,69 +398,38 @@ def speech_to_text(audio_path, language='en', auto_detect=True):
     Supports multilingual recognition with proper language handling.
     
     Args:
-        audio_path: Path to audio file (.wav, .mp3, .m4a, etc.)
+        audio_path: Path to audio file (.wav, .mp3, .m4a, etc.), raw bytes,
+                    or a decoded float32 16 kHz mono array
         language: Language code (en, hi, te, ta, kn, etc.) or language name
-                 (English, Hindi, Telugu, etc.). Default: 'en'
-        auto_detect: If True, Whisper auto-detects language. Default: True
+                 (English, Hindi, etc.). Default: 'en'
+        auto_detect: If True, Whisper identifies the language; otherwise
+                     `language` is forced. Default: True
     
     Returns:
         Transcribed text string
     """
-    
-    # Validate audio file exists
-    if not os.path.exists(audio_path):
-        logger.error(f"Audio file not found: {audio_path}")
-        return "Error: Audio file not found."
-    
-    try:
-        return _speech_to_text_whisper(audio_path, language=language, auto_detect=auto_detect)
-    except ImportError:
-        logger.warning("Whisper not installed; attempting Google SpeechRecognition fallback")
-        return _speech_to_text_google(audio_path, language=language)
-    except Exception as e:
-        error_msg = str(e)
-        logger.warning(f"Whisper failed: {error_msg[:120]}. Trying Google fallback...")
-        fallback = _speech_to_text_google(audio_path, language=language)
-        if not fallback.startswith("Error:"):
-            return fallback
-        logger.error(f"Speech recognition error: {error_msg}", exc_info=True)
-        return fallback
+    if auto_detect:
+        return transcribe_audio(audio_path)['text']
+    return transcribe_audio(audio_path, language=language)['text']
 
 
 def speech_to_text_with_retry(audio_path, language='en', max_retries=1):
     """
-    Convert speech to text with retry logic for better reliability.
+    Convert speech to text, preferring the user's selected language.
+    
+    Language identification on the first 30 s decides between the selected
+    language and what was actually spoken, so the clip is transcribed once
+    instead of once per language guess.
     
     Args:
-        audio_path: Path to audio file
-        language: Language code or name
-        max_retries: Number of retry attempts (default: 1)
+        audio_path: Path to audio file, raw bytes or decoded array
+        language: Language code or name the user selected
+        max_retries: Kept for compatibility; Whisper runs once and Google is the only fallback
     
     Returns:
         Transcribed text or error message
     """
-    for attempt in range(max_retries + 1):
-        logger.info(f"Speech recognition attempt {attempt + 1}/{max_retries + 1}")
-
-        # Prefer user's selected language first for multilingual accuracy, then fall back to auto-detect.
-        language_code = _resolve_language_code(language)
-        prefer_explicit_language = language_code not in {"", "en"}
-        auto_detect = not prefer_explicit_language if attempt == 0 else prefer_explicit_language
-
-        result = speech_to_text(audio_path, language=language, auto_detect=auto_detect)
-        
-        # If successful, return result
-        if not result.startswith("Error:"):
-            return result
-        
-        # If last attempt or no retries left, return error
-        if attempt >= max_retries:
-            logger.error(f"Speech recognition failed after {max_retries + 1} attempts")
-            return result
-        
-        logger.warning(f"Attempt {attempt + 1} failed, retrying with different settings...")
-    
-    return result
+    return transcribe_audio(audio_path, preferred_language=language)['text']
 
 
 def record_audio(duration=5, output_file="user_input.wav", language='en'):
@@ -0,0 +1,163 @@
+"""
+Whisper model server.
+One long-lived process per host that loads Whisper once at startup and serves
+transcription requests from every API worker over local HTTP, so workers do
+not each hold a model copy and no request pays the cold-load cost.
+
+Run:
+    python -m voice.stt_server
+Then point the API workers at it:
+    STT_SERVER_URL=http://127.0.0.1:8765
+"""
+
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from fastapi import FastAPI, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+
+from voice.audio_io import AudioDecodeError, decode_audio
+from voice.stt import WHISPER_MODEL_SIZE, load_whisper_model, transcribe_with_model
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+logger = logging.getLogger("stt_server")
+
+STT_SERVER_HOST = os.getenv("STT_SERVER_HOST", "127.0.0.1")
+STT_SERVER_PORT = int(os.getenv("STT_SERVER_PORT", "8765"))
+# Clips transcribed at once. Whisper decoding is not safe to run concurrently
+# on one model instance, so each parallel slot holds its own model replica.
+STT_SERVER_PARALLELISM = max(1, int(os.getenv("STT_SERVER_PARALLELISM", "1")))
+# Requests allowed to wait for a free model before new ones get 503.
+STT_SERVER_MAX_QUEUE = int(os.getenv("STT_SERVER_MAX_QUEUE", "16"))
+STT_SERVER_QUEUE_TIMEOUT_SECONDS = float(os.getenv("STT_SERVER_QUEUE_TIMEOUT_SECONDS", "60"))
+STT_SERVER_MAX_AUDIO_MB = int(os.getenv("STT_SERVER_MAX_AUDIO_MB", "25"))
+
+app = FastAPI(title="ClaimFlow STT Server")
+
+_models: "queue.Queue[object]" = queue.Queue()
+_pending_lock = threading.Lock()
+_pending = 0
+_stats = {"requests": 0, "rejected": 0, "failed": 0, "transcribe_ms_total": 0.0}
+
+
+@app.on_event("startup")
+def load_models() -> None:
+    started = time.perf_counter()
+    for _ in range(STT_SERVER_PARALLELISM):
+        _models.put(load_whisper_model(WHISPER_MODEL_SIZE))
+    logger.info(
+        json.dumps(
+            {
+                "event": "stt_models_loaded",
+                "model_size": WHISPER_MODEL_SIZE,
+                "replicas": STT_SERVER_PARALLELISM,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            }
+        )
+    )
+
+
+def _transcribe(body: bytes, is_pcm: bool, language: str | None, preferred_language: str | None) -> tuple[dict, float]:
+    global _pending
+
+    try:
+        # Decoding does not need a model, so it happens before taking one.
+        audio = np.frombuffer(body, dtype="<f4") if is_pcm else decode_audio(body)
+        queued_at = time.perf_counter()
+        model = _models.get(timeout=STT_SERVER_QUEUE_TIMEOUT_SECONDS)
+    except AudioDecodeError as e:
+        raise HTTPException(status_code=415, detail=f"Could not decode audio: {str(e)[:100]}")
+    except queue.Empty:
+        raise HTTPException(status_code=503, detail="STT server busy.")
+    finally:
+        with _pending_lock:
+            _pending -= 1
+    queue_ms = (time.perf_counter() - queued_at) * 1000
+    try:
+        return transcribe_with_model(model, audio, language=language, preferred_language=preferred_language), queue_ms
+    finally:
+        _models.put(model)
+
+
+@app.post("/transcribe")
+async def transcribe(request: Request, language: str = "", preferred_language: str = "") -> dict:
+    global _pending
+
+    body = await request.body()
+    if not body:
+        raise HTTPException(status_code=400, detail="Empty audio.")
+    if len(body) > STT_SERVER_MAX_AUDIO_MB * 1024 * 1024:
+        raise HTTPException(status_code=413, detail="Audio too large.")
+
+    # Workers send already decoded float32 PCM; other clients may send an encoded file.
+    is_pcm = request.headers.get("content-type", "").startswith("audio/x-f32le")
+    if is_pcm and len(body) % 4:
+        raise HTTPException(status_code=400, detail="PCM body is not a whole number of float32 samples.")
+
+    # _transcribe releases the pending slot once it has a model (or gives up).
+    with _pending_lock:
+        if _pending >= STT_SERVER_PARALLELISM + STT_SERVER_MAX_QUEUE:
+            _stats["rejected"] += 1
+            raise HTTPException(status_code=503, detail="STT server queue is full.")
+        _pending += 1
+
+    started = time.perf_counter()
+    try:
+        result, queue_ms = await run_in_threadpool(
+            _transcribe,
+            body,
+            is_pcm,
+            language or None,
+            preferred_language or None,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        _stats["failed"] += 1
+        logger.exception(json.dumps({"event": "stt_transcribe_error"}))
+        raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)[:100]}")
+    duration_ms = (time.perf_counter() - started) * 1000
+    _stats["requests"] += 1
+    _stats["transcribe_ms_total"] += duration_ms - queue_ms
+    logger.info(
+        json.dumps(
+            {
+                "event": "stt_transcribed",
+                "language": result["language"],
+                "language_probability": result["language_probability"],
+                "audio_bytes": len(body),
+                "queue_ms": round(queue_ms, 2),
+                "transcribe_ms": round(duration_ms - queue_ms, 2),
+            }
+        )
+    )
+    return {**result, "queue_ms": round(queue_ms, 2), "transcribe_ms": round(duration_ms - queue_ms, 2)}
+
+
+@app.get("/health")
+def health() -> dict:
+    with _pending_lock:
+        pending = _pending
+    return {
+        "status": "ok",
+        "model_size": WHISPER_MODEL_SIZE,
+        "replicas": STT_SERVER_PARALLELISM,
+        "idle_replicas": _models.qsize(),
+        "pending": pending,
+        **_stats,
+    }
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host=STT_SERVER_HOST, port=STT_SERVER_PORT, workers=1)
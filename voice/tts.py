@@ -1,9 +1,275 @@
 """
-Text-to-Speech module using gTTS (Google Text-to-Speech).
-Converts AI responses to voice output.
+Text-to-Speech module.
+Converts AI responses to voice output with a local engine where one is
+installed for the language and gTTS (Google Text-to-Speech) otherwise (see
+voice/tts_backends.py). Answers are split on sentence and step
+boundaries and the segments are synthesized concurrently, then joined as MP3
+frames without re-encoding, so the first sentence is playable long before the
+whole answer is. Each segment goes through a content-addressed cache
+(voice/tts_cache.py), so repeated replies, canned fallbacks and sentences
+shared between answers are served without calling gTTS.
 """
 
+import logging
 import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from voice.tts_backends import TTSBackend, backends_for
+from voice.tts_cache import get_tts_cache, make_tts_cache_key
+
+logger = logging.getLogger(__name__)
+
+# Segments synthesized at once across all requests (each is one or two gTTS calls).
+TTS_SEGMENT_WORKERS = max(1, int(os.getenv("TTS_SEGMENT_WORKERS", "4")))
+# Longest segment; longer sentences are cut at commas or spaces.
+TTS_SEGMENT_MAX_CHARS = int(os.getenv("TTS_SEGMENT_MAX_CHARS", "200"))
+# Shorter fragments (headings, "Rs.") are joined to the next segment.
+TTS_SEGMENT_MIN_CHARS = 40
+
+# Sentence ends (Latin and Devanagari danda) not preceded by a digit, so "1. Retry" stays whole.
+_SENTENCE_BREAK = re.compile(r"(?<=[^\d\s][.!?\u0964\u0965])\s+|\s*\n+\s*")
+_CLAUSE_BREAK = re.compile(r"(?<=[,;:])\s+")
+
+_segment_pool: Optional[ThreadPoolExecutor] = None
+_segment_pool_lock = threading.Lock()
+
+
+def _get_segment_pool() -> ThreadPoolExecutor:
+    global _segment_pool
+
+    if _segment_pool is None:
+        with _segment_pool_lock:
+            if _segment_pool is None:
+                _segment_pool = ThreadPoolExecutor(max_workers=TTS_SEGMENT_WORKERS, thread_name_prefix="tts")
+    return _segment_pool
+
+
+def _split_long(piece: str, max_chars: int) -> List[str]:
+    """Cut a piece longer than max_chars at clause breaks, then at spaces."""
+    if len(piece) <= max_chars:
+        return [piece]
+    clauses = _CLAUSE_BREAK.split(piece)
+    units = clauses if len(clauses) > 1 else piece.split()
+    parts: List[str] = []
+    current = ""
+    for unit in units:
+        if len(unit) > max_chars and len(clauses) > 1:
+            # A clause that is itself too long falls back to word wrapping.
+            if current:
+                parts.append(current)
+                current = ""
+            parts.extend(_split_long(unit, max_chars))
+            continue
+        candidate = f"{current} {unit}" if current else unit
+        if len(candidate) <= max_chars or not current:
+            current = candidate
+        else:
+            parts.append(current)
+            current = unit
+    if current:
+        parts.append(current)
+    return parts
+
+
+def split_tts_segments(text: str, max_chars: int = TTS_SEGMENT_MAX_CHARS) -> List[str]:
+    """
+    Split a response into sentence/step-sized segments for synthesis.
+
+    Args:
+        text: Response text
+        max_chars: Upper bound on segment length
+
+    Returns:
+        Non-empty segments in reading order
+    """
+    pieces = [piece.strip() for piece in _SENTENCE_BREAK.split(text or "")]
+    segments: List[str] = []
+    pending = ""
+    for piece in pieces:
+        if not piece:
+            continue
+        piece = f"{pending} {piece}" if pending else piece
+        pending = ""
+        if len(piece) < TTS_SEGMENT_MIN_CHARS:
+            pending = piece
+            continue
+        segments.extend(_split_long(piece, max_chars))
+    if pending:
+        if segments and len(segments[-1]) + len(pending) < max_chars:
+            segments[-1] = f"{segments[-1]} {pending}"
+        else:
+            segments.append(pending)
+    return segments
+
+
+def _synthesize_segment(text: str, language: str, backend: TTSBackend) -> Tuple[Optional[bytes], str]:
+    """
+    One segment with one backend, through the cache.
+
+    Source is "memory", "disk", "engine" or "error".
+    """
+    cache = get_tts_cache()
+    key = make_tts_cache_key(text, language, **backend.voice_settings(language))
+    if cache is not None:
+        audio, tier = cache.lookup(key)
+        if audio is not None:
+            return audio, tier
+    try:
+        audio = backend.synthesize(text, language)
+    except Exception as e:
+        logger.warning(f"Text-to-speech error ({backend.name}): {str(e)[:200]}")
+        return None, "error"
+    if not audio:
+        return None, "error"
+    if cache is not None:
+        cache.put(key, audio)
+    return audio, "engine"
+
+
+def _strip_id3(audio: bytes, keep_header: bool, keep_trailer: bool) -> bytes:
+    """
+    Drop ID3 tags so segments join into one MP3 stream.
+
+    MPEG audio frames are self-contained, so byte concatenation plays back
+    seamlessly; only the tag at the start (ID3v2) and end (ID3v1) of each
+    segment has to go.
+    """
+    if not keep_header and audio[:3] == b"ID3" and len(audio) >= 10:
+        size = (audio[6] << 21) | (audio[7] << 14) | (audio[8] << 7) | audio[9]
+        footer = 10 if audio[5] & 0x10 else 0
+        audio = audio[10 + size + footer:]
+    if not keep_trailer and len(audio) >= 128 and audio[-128:-125] == b"TAG":
+        audio = audio[:-128]
+    return audio
+
+
+def iter_speech_segments(text: str, language: str = "en", sources: Optional[List[str]] = None) -> Iterator[bytes]:
+    """
+    Yield MP3 bytes segment by segment, in order, as soon as each is ready.
+
+    All segments are submitted to the bounded TTS pool at once, so later
+    segments are synthesized while earlier ones are being sent or played.
+    Concatenating the yielded chunks gives one valid MP3 stream: every
+    segment comes from the same backend, and a backend that fails on the
+    first segment is replaced by the next one for the whole reply. Stops
+    early if a later segment fails, rather than silently skipping part of
+    the answer.
+
+    Args:
+        text: Text to convert to speech
+        language: Language code (en, hi, te, etc.)
+        sources: Optional list that receives each segment's source
+    """
+    segments = split_tts_segments(text)
+    if not segments:
+        return
+    backends = backends_for(language)
+    if not backends:
+        logger.error(f"No TTS backend available for '{language}'. Run: pip install gtts")
+        if sources is not None:
+            sources.append("error")
+        return
+
+    # One backend speaks the whole reply: local engines and gTTS encode MP3 at
+    # different sample rates, and frames of both in one stream mis-play. The
+    # next backend is tried only while nothing has been yielded yet.
+    for backend in backends:
+        if len(segments) == 1:
+            futures = None
+            first = _synthesize_segment(segments[0], language, backend)
+        else:
+            pool = _get_segment_pool()
+            futures = [pool.submit(_synthesize_segment, segment, language, backend) for segment in segments]
+            first = futures[0].result()
+        try:
+            audio, source = first
+            if not audio:
+                continue
+            if sources is not None:
+                sources.append(source)
+            last = len(segments) - 1
+            yield _strip_id3(audio, keep_header=True, keep_trailer=last == 0)
+            for index in range(1, len(segments)):
+                audio, source = futures[index].result()
+                if sources is not None:
+                    sources.append(source)
+                if not audio:
+                    return
+                yield _strip_id3(audio, keep_header=False, keep_trailer=index == last)
+            return
+        finally:
+            for future in futures or ():
+                future.cancel()
+
+    if sources is not None:
+        sources.append("error")
+
+
+def _summarize_sources(sources: List[str]) -> str:
+    if not sources or "error" in sources:
+        return "error"
+    for source in ("engine", "disk"):
+        if source in sources:
+            return source
+    return "memory"
+
+
+def synthesize_speech_with_info(text: str, language: str = "en") -> Tuple[Optional[bytes], str]:
+    """
+    Synthesize text to MP3 bytes, serving repeated segments from the TTS cache.
+
+    Args:
+        text: Text to convert to speech
+        language: Language code (en, hi, te, etc.)
+
+    Returns:
+        (MP3 bytes or None on failure, source) where source is "memory" or
+        "disk" when every segment was cached, "engine" when any was
+        synthesized, or "error"
+    """
+    if not text or not text.strip():
+        return None, "error"
+
+    sources: List[str] = []
+    audio = b"".join(iter_speech_segments(text, language, sources))
+    source = _summarize_sources(sources)
+    if source == "error":
+        return None, source
+    return audio, source
+
+
+def synthesize_speech(text: str, language: str = "en") -> Optional[bytes]:
+    """Synthesize text to MP3 bytes through the TTS cache (see synthesize_speech_with_info)."""
+    audio, _ = synthesize_speech_with_info(text, language)
+    return audio
+
+
+def prerender_speech(items: Iterable[Tuple[str, str]]) -> dict:
+    """
+    Warm the TTS cache with fixed (text, language) pairs such as canned fallbacks.
+
+    Entries already on disk are only loaded into memory, so restarts do not
+    call gTTS again.
+
+    Returns:
+        Counts of rendered, cached and failed items plus the elapsed time
+    """
+    started = time.perf_counter()
+    counts = {"rendered": 0, "cached": 0, "failed": 0}
+    for text, language in items:
+        _, source = synthesize_speech_with_info(text, language)
+        if source == "engine":
+            counts["rendered"] += 1
+        elif source == "error":
+            counts["failed"] += 1
+        else:
+            counts["cached"] += 1
+    counts["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return counts
 
 
 def text_to_speech(text, output_file="response.mp3", language='en'):
@@ -24,30 +290,22 @@ def text_to_speech(text, output_file="response.mp3", language='en'):
         print("Error: No text provided for TTS.")
         return None
     
-    try:
-        # Import gTTS (lazy import)
-        from gtts import gTTS
-        
-        print(f"Converting text to speech ({language})...")
-        
-        # Create TTS object
-        tts = gTTS(text=text, lang=language, slow=False)
-        
-        # Save to file
-        tts.save(output_file)
-        
-        print(f"Audio saved to: {output_file}")
-        return output_file
-    
-    except ImportError:
-        print("Error: gTTS not installed. Run: pip install gtts")
+    print(f"Converting text to speech ({language})...")
+    audio = synthesize_speech(text, language)
+    if audio is None:
+        print("Error: Text-to-speech failed.")
         return None
-    
-    except Exception as e:
-        error_msg = str(e)
-        print(f"Text-to-speech error: {error_msg}")
+
+    try:
+        with open(output_file, "wb") as audio_file:
+            audio_file.write(audio)
+    except OSError as e:
+        print(f"Text-to-speech error: {e}")
         return None
 
+    print(f"Audio saved to: {output_file}")
+    return output_file
+
 
 def play_audio(audio_file):
     """
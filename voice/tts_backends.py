@@ -0,0 +1,216 @@
+"""
+Pluggable text-to-speech backends.
+Each backend turns one text segment into MP3 bytes. Backends are tried in
+TTS_BACKENDS order, skipping ones that are not installed or do not speak the
+requested language, so a local engine answers when it can and gTTS (network)
+stays the fallback.
+
+Backends:
+- piper: neural voices run locally with ONNX (piper-tts). Voices are
+  configured per language, e.g.
+  PIPER_VOICES=en:models/en_US-lessac-medium.onnx,hi:models/hi_IN-pratham-medium.onnx
+- espeak: espeak-ng formant synthesizer; tiny and fast, robotic, speaks
+  en/hi/te/ta/kn with no downloads
+- gtts: Google Translate TTS over HTTP
+"""
+
+import io
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import wave
+from typing import Dict, List, Optional
+
+from voice.audio_io import FFMPEG_TIMEOUT_SECONDS, encode_mp3, wav_to_pcm16
+
+logger = logging.getLogger(__name__)
+
+TTS_BACKENDS = [
+    name.strip().lower()
+    for name in os.getenv("TTS_BACKENDS", "piper,gtts").split(",")
+    if name.strip()
+]
+PIPER_VOICES = os.getenv("PIPER_VOICES", "")
+ESPEAK_VOICES = {"en": "en-us", "hi": "hi", "te": "te", "ta": "ta", "kn": "kn"}
+ESPEAK_WORDS_PER_MINUTE = int(os.getenv("ESPEAK_WORDS_PER_MINUTE", "165"))
+TTS_TLD = os.getenv("TTS_TLD", "com")
+
+
+class TTSBackend:
+    """One synthesis engine. Subclasses implement synthesize and describe their voice."""
+
+    name = ""
+    # True when synthesis calls out over the network.
+    remote = False
+
+    def supports(self, language: str) -> bool:
+        return True
+
+    def available(self) -> bool:
+        return True
+
+    def voice_settings(self, language: str) -> Dict[str, str]:
+        """Everything that changes the audio besides text and language; part of the cache key."""
+        return {"engine": self.name}
+
+    def synthesize(self, text: str, language: str) -> bytes:
+        """Return MP3 bytes for text, raising on failure."""
+        raise NotImplementedError
+
+
+class GTTSBackend(TTSBackend):
+    name = "gtts"
+    remote = True
+
+    def available(self) -> bool:
+        try:
+            import gtts  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def voice_settings(self, language: str) -> Dict[str, str]:
+        return {"engine": self.name, "slow": "False", "tld": TTS_TLD}
+
+    def synthesize(self, text: str, language: str) -> bytes:
+        from gtts import gTTS
+
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=language, slow=False, tld=TTS_TLD).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+def _parse_voice_map(raw: str) -> Dict[str, str]:
+    voices = {}
+    for item in raw.split(","):
+        language, _, path = item.partition(":")
+        if language.strip() and path.strip():
+            voices[language.strip().lower()] = path.strip()
+    return voices
+
+
+class PiperBackend(TTSBackend):
+    name = "piper"
+
+    def __init__(self, voices: Dict[str, str]):
+        self.voice_paths = {language: path for language, path in voices.items() if os.path.exists(path)}
+        self._voices = {}
+        self._lock = threading.Lock()
+
+    def supports(self, language: str) -> bool:
+        return language in self.voice_paths
+
+    def available(self) -> bool:
+        if not self.voice_paths:
+            return False
+        try:
+            import piper  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def voice_settings(self, language: str) -> Dict[str, str]:
+        return {"engine": self.name, "voice": os.path.basename(self.voice_paths.get(language, ""))}
+
+    def _voice(self, language: str):
+        voice = self._voices.get(language)
+        if voice is None:
+            with self._lock:
+                voice = self._voices.get(language)
+                if voice is None:
+                    from piper.voice import PiperVoice
+
+                    logger.info(f"Loading Piper voice for {language}: {self.voice_paths[language]}")
+                    voice = PiperVoice.load(self.voice_paths[language])
+                    self._voices[language] = voice
+        return voice
+
+    def preload(self) -> None:
+        for language in self.voice_paths:
+            self._voice(language)
+
+    def synthesize(self, text: str, language: str) -> bytes:
+        voice = self._voice(language)
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav_file:
+            # piper-tts >= 1.3 renamed the WAV writer; older releases write WAV from synthesize().
+            if hasattr(voice, "synthesize_wav"):
+                voice.synthesize_wav(text, wav_file)
+            else:
+                voice.synthesize(text, wav_file)
+        pcm16, rate = wav_to_pcm16(buffer.getvalue())
+        return encode_mp3(pcm16, rate)
+
+
+class EspeakBackend(TTSBackend):
+    name = "espeak"
+
+    def __init__(self):
+        self.binary = shutil.which("espeak-ng") or shutil.which("espeak")
+
+    def supports(self, language: str) -> bool:
+        return language in ESPEAK_VOICES
+
+    def available(self) -> bool:
+        return self.binary is not None
+
+    def voice_settings(self, language: str) -> Dict[str, str]:
+        return {"engine": self.name, "voice": ESPEAK_VOICES.get(language, ""), "wpm": str(ESPEAK_WORDS_PER_MINUTE)}
+
+    def synthesize(self, text: str, language: str) -> bytes:
+        completed = subprocess.run(
+            [self.binary, "-v", ESPEAK_VOICES[language], "-s", str(ESPEAK_WORDS_PER_MINUTE), "--stdout", "--", text],
+            capture_output=True,
+            timeout=FFMPEG_TIMEOUT_SECONDS,
+            check=False,
+        )
+        if completed.returncode != 0 or not completed.stdout:
+            raise RuntimeError(completed.stderr.decode("utf-8", errors="replace")[:200] or "espeak-ng failed")
+        pcm16, rate = wav_to_pcm16(completed.stdout)
+        return encode_mp3(pcm16, rate)
+
+
+def create_backend(name: str) -> Optional[TTSBackend]:
+    if name == "gtts":
+        return GTTSBackend()
+    if name == "piper":
+        return PiperBackend(_parse_voice_map(PIPER_VOICES))
+    if name == "espeak":
+        return EspeakBackend()
+    logger.warning(f"Unknown TTS backend: {name}")
+    return None
+
+
+_backends: Optional[List[TTSBackend]] = None
+_backends_lock = threading.Lock()
+
+
+def get_backends() -> List[TTSBackend]:
+    """Installed backends in TTS_BACKENDS order; gTTS is always kept as the last resort."""
+    global _backends
+
+    if _backends is None:
+        with _backends_lock:
+            if _backends is None:
+                names = list(dict.fromkeys(TTS_BACKENDS + ["gtts"]))
+                backends = [backend for backend in map(create_backend, names) if backend and backend.available()]
+                logger.info(f"TTS backends: {[backend.name for backend in backends] or 'none'}")
+                _backends = backends
+    return _backends
+
+
+def backends_for(language: str) -> List[TTSBackend]:
+    """Backends able to speak language, in preference order."""
+    return [backend for backend in get_backends() if backend.supports(language)]
+
+
+def preload_backends() -> None:
+    """Load local voice models up front so the first reply does not pay for it."""
+    for backend in get_backends():
+        if isinstance(backend, PiperBackend):
+            try:
+                backend.preload()
+            except Exception as e:
+                logger.warning(f"Piper preload failed: {str(e)[:120]}")
@@ -0,0 +1,223 @@
+"""
+Content-addressed cache for synthesized speech.
+MP3 bytes are keyed on a SHA-256 of the text, language and voice settings and
+kept in two size-bounded tiers: an in-memory LRU for the hottest replies and an
+on-disk directory that survives restarts and is shared by API workers on the
+same host. A hit in either tier skips the TTS engine entirely.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TTS_CACHE_ENABLED = os.getenv("TTS_CACHE_ENABLED", "true").strip().lower() in {"1", "true", "yes", "on"}
+TTS_CACHE_MEMORY_MB = float(os.getenv("TTS_CACHE_MEMORY_MB", "32"))
+TTS_CACHE_DISK_MB = float(os.getenv("TTS_CACHE_DISK_MB", "256"))
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join(tempfile.gettempdir(), "claimflow_tts_cache"))
+
+
+def normalize_tts_text(text: str) -> str:
+    """Collapse whitespace; it does not change what the engine says."""
+    return " ".join((text or "").split())
+
+
+def make_tts_cache_key(text: str, language: str, **voice_settings) -> str:
+    """
+    SHA-256 over the normalized text, language and every voice setting.
+
+    Args:
+        text: Text to be spoken
+        language: TTS language code
+        **voice_settings: Engine name, speed, accent and anything else that changes the audio
+
+    Returns:
+        Hex digest used as the cache key and the on-disk file name
+    """
+    settings = "|".join(f"{name}={voice_settings[name]}" for name in sorted(voice_settings))
+    material = f"{(language or '').lower()}|{settings}|{normalize_tts_text(text)}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """Thread-safe two-tier (memory LRU + disk) cache of MP3 bytes bounded by total size."""
+
+    def __init__(self, memory_bytes: int, disk_bytes: int, cache_dir: Optional[str]):
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.cache_dir = cache_dir if disk_bytes > 0 else None
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_used = 0
+        self._disk_used: Optional[int] = None
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # Memory tier
+
+    def _remember(self, key: str, audio: bytes) -> None:
+        if len(audio) > self.memory_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._memory_used -= len(previous)
+            self._entries[key] = audio
+            self._memory_used += len(audio)
+            while self._entries and self._memory_used > self.memory_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._memory_used -= len(evicted)
+                self.evictions += 1
+
+    # Disk tier
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.mp3")
+
+    def _touch_disk(self, key: str) -> None:
+        if not self.cache_dir:
+            return
+        try:
+            os.utime(self._path(key), None)
+        except OSError:
+            pass
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as audio_file:
+                audio = audio_file.read()
+            # mtime doubles as the last-used time for eviction.
+            os.utime(path, None)
+            return audio or None
+        except OSError:
+            return None
+
+    def _scan_disk(self) -> list:
+        entries = []
+        with os.scandir(self.cache_dir) as listing:
+            for entry in listing:
+                if entry.is_file() and entry.name.endswith(".mp3"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _write_disk(self, key: str, audio: bytes) -> None:
+        if not self.cache_dir or len(audio) > self.disk_bytes:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._path(key)
+            # Write then rename so a concurrent reader never sees a partial file.
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".part")
+            with os.fdopen(fd, "wb") as temp_file:
+                temp_file.write(audio)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"TTS cache write failed: {e}")
+            return
+
+        with self._disk_lock:
+            if self._disk_used is None:
+                self._disk_used = sum(size for _, size, _ in self._scan_disk())
+            else:
+                self._disk_used += len(audio)
+            if self._disk_used <= self.disk_bytes:
+                return
+            # Over budget: rescan (other workers share the directory) and drop the oldest files.
+            entries = sorted(self._scan_disk())
+            self._disk_used = sum(size for _, size, _ in entries)
+            for _, size, entry_path in entries:
+                if self._disk_used <= self.disk_bytes:
+                    break
+                try:
+                    os.remove(entry_path)
+                    self._disk_used -= size
+                    self.evictions += 1
+                except OSError:
+                    continue
+
+    # Public API
+
+    def lookup(self, key: str) -> Tuple[Optional[bytes], Optional[str]]:
+        """Return (audio, tier) where tier is "memory" or "disk", or (None, None) on a miss."""
+        with self._lock:
+            audio = self._entries.get(key)
+            if audio is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+        if audio is not None:
+            # Keep the disk copy's last-used time current so hot replies are not evicted there.
+            self._touch_disk(key)
+            return audio, "memory"
+
+        audio = self._read_disk(key)
+        if audio is not None:
+            self.disk_hits += 1
+            self._remember(key, audio)
+            return audio, "disk"
+
+        self.misses += 1
+        return None, None
+
+    def get(self, key: str) -> Optional[bytes]:
+        audio, _ = self.lookup(key)
+        return audio
+
+    def put(self, key: str, audio: bytes) -> None:
+        if not audio:
+            return
+        self._remember(key, audio)
+        self._write_disk(key, audio)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._memory_used = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_entries": len(self._entries),
+                "memory_bytes": self._memory_used,
+                "max_memory_bytes": self.memory_bytes,
+                "disk_bytes": self._disk_used,
+                "max_disk_bytes": self.disk_bytes if self.cache_dir else 0,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+_tts_cache: Optional[TTSCache] = None
+_tts_cache_lock = threading.Lock()
+
+
+def get_tts_cache() -> Optional[TTSCache]:
+    """Process-wide cache, or None when TTS_CACHE_ENABLED is off."""
+    global _tts_cache
+
+    if not TTS_CACHE_ENABLED:
+        return None
+    if _tts_cache is None:
+        with _tts_cache_lock:
+            if _tts_cache is None:
+                _tts_cache = TTSCache(
+                    memory_bytes=int(TTS_CACHE_MEMORY_MB * 1024 * 1024),
+                    disk_bytes=int(TTS_CACHE_DISK_MB * 1024 * 1024),
+                    cache_dir=TTS_CACHE_DIR,
+                )
+    return _tts_cache
@@ -0,0 +1,180 @@
+"""
+Energy-based voice activity detection.
+Finds speech in a decoded 16 kHz clip with vectorized frame energies so
+silence can be trimmed before STT, empty clips rejected without running a
+model, and long recordings split at pauses into pieces that fit Whisper's
+30 s window.
+"""
+
+import os
+from typing import List, NamedTuple, Tuple
+
+from voice.audio_io import TARGET_SAMPLE_RATE
+
+VAD_FRAME_MS = 30
+# A frame is speech when it is this many dB above the clip's noise floor...
+VAD_MARGIN_DB = float(os.getenv("VAD_MARGIN_DB", "12"))
+# ...and louder than this absolute level (dBFS), so near-silent clips are empty.
+VAD_MIN_SPEECH_DBFS = float(os.getenv("VAD_MIN_SPEECH_DBFS", "-45"))
+# Padding kept around speech so word onsets and trailing consonants survive.
+VAD_PADDING_MS = 200
+# Speech runs shorter than this (clicks, taps) are ignored.
+VAD_MIN_SPEECH_MS = 120
+# Longest piece sent to the recognizer in one call (Whisper's window).
+MAX_SEGMENT_SECONDS = 30.0
+# Silence left between speech regions joined into one segment; longer pauses are cut to this.
+VAD_JOIN_GAP_MS = 300
+
+
+class SpeechAnalysis(NamedTuple):
+    regions: List[Tuple[int, int]]   # speech regions as (start, end) sample offsets
+    total_seconds: float
+    speech_seconds: float
+    # True when the clip is loud enough but has no pauses to measure a noise
+    # floor against (continuous or noisy speech); the whole clip is one region.
+    whole_clip: bool = False
+
+    @property
+    def has_speech(self) -> bool:
+        return bool(self.regions)
+
+
+def frame_energies_db(audio, frame_length: int):
+    """RMS level in dBFS for each non-overlapping frame (a trailing partial frame is dropped)."""
+    import numpy as np
+
+    frame_count = len(audio) // frame_length
+    if frame_count == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = audio[: frame_count * frame_length].reshape(frame_count, frame_length)
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+    return (20.0 * np.log10(np.maximum(rms, 1e-10))).astype(np.float32)
+
+
+def _runs(mask) -> List[Tuple[int, int]]:
+    """(start, end) frame indices of consecutive True values."""
+    import numpy as np
+
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def detect_speech(audio, sample_rate: int = TARGET_SAMPLE_RATE) -> SpeechAnalysis:
+    """
+    Locate speech regions in a mono float32 clip.
+
+    Args:
+        audio: Decoded samples in [-1, 1]
+        sample_rate: Sample rate of audio
+
+    Only the absolute VAD_MIN_SPEECH_DBFS level can reject a clip. The
+    relative noise-floor test just locates speech; when it finds none in a
+    clip that is loud enough (speech without pauses, or low SNR), the whole
+    clip is returned as one region for the recognizer to judge.
+
+    Returns:
+        SpeechAnalysis with padded, merged speech regions in sample offsets
+    """
+    import numpy as np
+
+    total_seconds = len(audio) / sample_rate
+    frame_length = max(1, int(sample_rate * VAD_FRAME_MS / 1000))
+    energies = frame_energies_db(audio, frame_length)
+    if energies.size == 0:
+        return SpeechAnalysis([], round(total_seconds, 3), 0.0)
+
+    min_frames = max(1, VAD_MIN_SPEECH_MS // VAD_FRAME_MS)
+
+    def drop_short_runs(frame_mask):
+        for start, end in _runs(frame_mask):
+            if end - start < min_frames:
+                frame_mask[start:end] = False
+        return frame_mask
+
+    audible = drop_short_runs(energies > VAD_MIN_SPEECH_DBFS)
+    if not audible.any():
+        return SpeechAnalysis([], round(total_seconds, 3), 0.0)
+
+    # The quietest tenth of the clip approximates the background noise level.
+    noise_floor = float(np.percentile(energies, 10))
+    mask = drop_short_runs(audible & (energies > noise_floor + VAD_MARGIN_DB))
+    if not mask.any():
+        return SpeechAnalysis([(0, len(audio))], round(total_seconds, 3), round(total_seconds, 3), whole_clip=True)
+
+    # Dilate by the padding on both sides; this also bridges short pauses.
+    pad_frames = max(1, VAD_PADDING_MS // VAD_FRAME_MS)
+    kernel = np.ones(2 * pad_frames + 1, dtype=np.int32)
+    padded = np.convolve(mask.astype(np.int32), kernel, mode="same") > 0
+
+    regions = [
+        (start * frame_length, min(len(audio), end * frame_length))
+        for start, end in _runs(padded)
+    ]
+    # The dropped partial frame at the end belongs to the last region if speech runs to the end.
+    if regions and regions[-1][1] == len(energies) * frame_length:
+        regions[-1] = (regions[-1][0], len(audio))
+    speech_samples = sum(end - start for start, end in regions)
+    return SpeechAnalysis(regions, round(total_seconds, 3), round(speech_samples / sample_rate, 3))
+
+
+def plan_segments(
+    analysis: SpeechAnalysis,
+    sample_rate: int = TARGET_SAMPLE_RATE,
+    max_segment_seconds: float = MAX_SEGMENT_SECONDS,
+) -> List[List[Tuple[int, int]]]:
+    """
+    Group speech regions into recognizer-sized segments, cutting only at pauses.
+
+    Regions are packed in order while the segment (speech plus one
+    VAD_JOIN_GAP_MS gap per join) stays under max_segment_seconds; a single
+    region longer than that is cut into equal pieces.
+
+    Returns:
+        Segments, each a list of (start, end) sample offsets in clip order
+    """
+    max_samples = int(max_segment_seconds * sample_rate)
+    gap_samples = int(sample_rate * VAD_JOIN_GAP_MS / 1000)
+    segments: List[List[Tuple[int, int]]] = []
+    current_length = 0
+    for start, end in analysis.regions:
+        length = end - start
+        if segments and current_length + gap_samples + length <= max_samples:
+            segments[-1].append((start, end))
+            current_length += gap_samples + length
+            continue
+        if length <= max_samples:
+            segments.append([(start, end)])
+            current_length = length
+            continue
+        pieces = -(-length // max_samples)
+        step = -(-length // pieces)
+        for offset in range(start, end, step):
+            segments.append([(offset, min(end, offset + step))])
+        current_length = max_samples
+    return segments
+
+
+def build_segment_audio(audio, regions: List[Tuple[int, int]], sample_rate: int = TARGET_SAMPLE_RATE):
+    """Concatenate speech regions, replacing each pause between them with a short silent gap."""
+    import numpy as np
+
+    if len(regions) == 1:
+        start, end = regions[0]
+        return audio[start:end]
+    gap = np.zeros(int(sample_rate * VAD_JOIN_GAP_MS / 1000), dtype=audio.dtype)
+    parts = []
+    for index, (start, end) in enumerate(regions):
+        if index:
+            parts.append(gap)
+        parts.append(audio[start:end])
+    return np.concatenate(parts)
+
+
+def trim_silence(audio, sample_rate: int = TARGET_SAMPLE_RATE):
+    """Return audio cut to the first..last speech region (empty when there is no speech)."""
+    analysis = detect_speech(audio, sample_rate)
+    if not analysis.has_speech:
+        return audio[:0]
+    return audio[analysis.regions[0][0]:analysis.regions[-1][1]]